@@ -1,7 +1,35 @@
 from django.contrib import admin
+from performance.paginator import EstimatedCountPaginator
 from .models import User,Restaurant,OneTimePassword
 
 # Register your models here.
-admin.site.register(User)
-admin.site.register(Restaurant)
-admin.site.register(OneTimePassword)
+@admin.register(User)
+class UserAdmin(admin.ModelAdmin):
+    """
+    Users are looked up by email; the restaurant is entered by id instead of a select box of every restaurant.
+    """
+    list_display = ['email', 'first_name', 'last_name', 'role', 'restaurant', 'is_active', 'date_joined']
+    list_select_related = ['restaurant']
+    list_filter = ['role', 'is_active']
+    search_fields = ['^email']
+    ordering = ['id']
+    raw_id_fields = ['restaurant']
+    filter_horizontal = ['groups', 'user_permissions']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(Restaurant)
+class RestaurantAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'location', 'owner']
+    list_select_related = ['owner']
+    search_fields = ['name']
+    ordering = ['id']
+    autocomplete_fields = ['owner']
+
+
+@admin.register(OneTimePassword)
+class OneTimePasswordAdmin(admin.ModelAdmin):
+    list_display = ['user', 'code']
+    list_select_related = ['user']
+    raw_id_fields = ['user']
@@ -1,4 +1,5 @@
 from django.contrib.auth.models import BaseUserManager
+from django.db import models
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email
 
@@ -58,4 +59,10 @@ class UserManager(BaseUserManager):
         
         user =self.create_user(email,first_name,last_name,phone,password,**extra_fields)
         user.save(using=self._db)
-        return user
\ No newline at end of file
+        return user
+"""
+Manager that hides soft-deleted rows. Deleted rows are removed later by `manage.py purge_deleted`.
+"""
+class SoftDeleteManager(models.Manager):
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-19 17:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0003_remove_restaurant_restaurant_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurant',
+            name='is_deleted',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+    ]
@@ -0,0 +1,125 @@
+# Generated by Django 5.1.1 on 2026-10-19 18:20
+
+from importlib import import_module
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Cast, Coalesce
+from account.user_ids import point_at_ids, rebuild_column, user_foreign_keys
+
+
+def number_users(apps, schema_editor):
+    User = apps.get_model('account', 'User')
+    users = User.objects.using(schema_editor.connection.alias)
+    emails = users.order_by('date_joined', 'email').values_list('email', flat=True)
+    batch = []
+    for number, email in enumerate(emails.iterator(chunk_size=2000), start=1):
+        batch.append(User(email=email, id=number))
+        if len(batch) == 1000:
+            users.bulk_update(batch, ['id'])
+            batch = []
+    users.bulk_update(batch, ['id'])
+
+
+def point_references_at_ids(apps, schema_editor):
+    """
+    Rewrite every reference to a user on this database from the email to the new id.
+    Order tables on the shards are handled by the orders migration.
+    """
+    alias = schema_editor.connection.alias
+    User = apps.get_model('account', 'User')
+    for field in user_foreign_keys(apps):
+        point_at_ids(schema_editor, field, User._meta.db_table, 'email', 'id')
+
+    def user_id(column):
+        # Ids of users that are gone stay as they are, the same as for other deleted objects
+        user = User.objects.filter(email=models.OuterRef(column)).values('id')[:1]
+        return Coalesce(Cast(models.Subquery(user), models.TextField()), models.F(column))
+
+    AuditEvent = apps.get_model('audit', 'AuditEvent')
+    AuditEvent.objects.using(alias).filter(target_type='user').update(target_id=user_id('target_id'))
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    LogEntry = apps.get_model('admin', 'LogEntry')
+    LogEntry.objects.using(alias).filter(
+        content_type__in=ContentType.objects.using(alias).filter(app_label='account', model='user'),
+    ).update(object_id=user_id('object_id'))
+
+    # Logged-in sessions store the primary key of their user; sessions of users that are gone are dropped
+    Session = apps.get_model('sessions', 'Session')
+    store = import_module(settings.SESSION_ENGINE).SessionStore()
+    ids = dict(User.objects.using(alias).values_list('email', 'id'))
+    changed, dropped = [], []
+    for session in Session.objects.using(alias).iterator(chunk_size=2000):
+        data = store.decode(session.session_data)
+        if '_auth_user_id' not in data:
+            continue
+        if data['_auth_user_id'] not in ids:
+            dropped.append(session.session_key)
+            continue
+        data['_auth_user_id'] = str(ids[data['_auth_user_id']])
+        session.session_data = store.encode(data)
+        changed.append(session)
+    Session.objects.using(alias).bulk_update(changed, ['session_data'], batch_size=1000)
+    for start in range(0, len(dropped), 1000):
+        Session.objects.using(alias).filter(session_key__in=dropped[start:start + 1000]).delete()
+
+
+def rebuild_tables(apps, schema_editor):
+    """
+    Make id the primary key of the user table. Django rebuilds the tables with foreign keys and M2M
+    tables pointing at users along with it; references without a reverse relation are rebuilt here.
+    """
+    User = apps.get_model('account', 'User')
+    old_id = models.BigIntegerField(null=True)
+    old_id.set_attributes_from_name('id')
+    old_id.model = User
+    schema_editor.alter_field(User, old_id, User._meta.get_field('id'))
+    for relation in User._meta.get_fields(include_hidden=True):
+        if relation.auto_created and not relation.concrete and relation.hidden and not relation.many_to_many \
+                and not relation.related_model._meta.auto_created:
+            rebuild_column(schema_editor, relation.field)
+
+
+class Migration(migrations.Migration):
+    """
+    Replace the email primary key of users by an integer id and keep email as a unique column.
+    Users are numbered by join date. Every reference to a user is rewritten, including auth tokens,
+    admin log entries, group and permission tables, audit events and logged-in sessions.
+    Order tables on shard databases are rewritten by orders.0008 when each shard is migrated; migrate
+    'default' first. This cannot be reversed, back up the databases before running it.
+    """
+
+    dependencies = [
+        ('account', '0004_restaurant_is_deleted'),
+        ('admin', '0003_logentry_add_action_flag_choices'),
+        ('audit', '0001_initial'),
+        ('authtoken', '0004_alter_tokenproxy_options'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('orders', '0007_item_pair'),
+        ('restaurant', '0007_item_stock'),
+        ('sessions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='id',
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.RunPython(number_users),
+        migrations.RunPython(point_references_at_ids),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='user',
+                    name='id',
+                    field=models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID'),
+                ),
+                migrations.AlterField(
+                    model_name='user',
+                    name='email',
+                    field=models.CharField(max_length=255, unique=True, verbose_name='Email Address'),
+                ),
+            ],
+        ),
+        migrations.RunPython(rebuild_tables),
+    ]
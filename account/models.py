@@ -2,7 +2,7 @@ import random
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser,PermissionsMixin
 from django.utils.translation import gettext_lazy as _
-from .managers import UserManager
+from .managers import UserManager,SoftDeleteManager
 from .constants import ROLES
 
 # Create your models here.
@@ -13,6 +13,11 @@ class Restaurant(models.Model):
     name = models.CharField(max_length=100)
     location=models.CharField(max_length=255)
     owner=models.ForeignKey("User",on_delete=models.CASCADE,related_name='restaurants')
+    # Deleted restaurants are hidden at once and purged in the background by `manage.py purge_deleted`.
+    is_deleted=models.BooleanField(default=False, db_index=True)
+
+    objects=SoftDeleteManager()
+    all_objects=models.Manager()
 
     def __str__(self):
         return self.name
@@ -21,11 +26,12 @@ class Restaurant(models.Model):
 class User(AbstractBaseUser,PermissionsMixin):
     """
     This model extends Django's AbstractBaseUser and PermissionsMixin to create a custom user model. 
-    It uses email as the primary identifier and supports role-based access control. 
+    Users log in with their email and have an integer id as primary key, so the many tables pointing at users
+    store and index a number instead of an email. It supports role-based access control.
     Users can be linked to restaurants (for employees or owners) and have fields like phone, role, etc.
     official documentation for custom user model: https://docs.djangoproject.com/en/5.1/topics/auth/customizing/
     """
-    email=models.CharField(max_length=255,unique=True,primary_key=True,verbose_name=_("Email Address"))
+    email=models.CharField(max_length=255,unique=True,verbose_name=_("Email Address"))
     first_name=models.CharField(max_length=50,verbose_name="First Name")
     last_name=models.CharField(max_length=50,verbose_name="Last Name")
     phone=models.CharField(max_length=20,verbose_name="Phone Number")
@@ -41,6 +47,10 @@ class User(AbstractBaseUser,PermissionsMixin):
     USERNAME_FIELD='email'
     REQUIRED_FIELDS=['first_name','last_name','phone']
     objects=UserManager()
+
+    class Meta:
+        # Filters of the admin user list
+        indexes=[models.Index(fields=['role','is_active'])]
     
     def __str__(self) -> str:
         return f'{self.email}'
@@ -1,3 +1,90 @@
-from django.test import TestCase
+import os
+import tempfile
+from datetime import datetime, timezone
+from importlib import import_module
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase
 
-# Create your tests here.
+USER_ID_MIGRATION = ('account', '0005_user_id')
+
+
+class UserIdMigrationTests(SimpleTestCase):
+    """
+    Runs account.0005 on a separate SQLite file migrated up to the state just before it.
+    """
+    alias = 'user_id_migration'
+
+    @classmethod
+    def setUpClass(cls):
+        # The test databases are fully migrated, so the migration runs on a database of its own
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.directory.name, 'db.sqlite3')
+        connections.settings[cls.alias] = {**connections.settings[DEFAULT_DB_ALIAS], 'NAME': cls.path}
+        cls.databases = {cls.alias}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[cls.alias].close()
+        del connections[cls.alias]
+        del connections.settings[cls.alias]
+        cls.directory.cleanup()
+
+    def setUp(self):
+        connections[self.alias].close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        executor = MigrationExecutor(connections[self.alias])
+        before = [parent.key for parent in executor.loader.graph.node_map[USER_ID_MIGRATION].parents]
+        executor.migrate(before)
+        self.apps = executor.loader.project_state(before).apps
+
+    def migrate(self):
+        executor = MigrationExecutor(connections[self.alias])
+        executor.migrate([USER_ID_MIGRATION])
+        return executor.loader.project_state([USER_ID_MIGRATION]).apps
+
+    def create_user(self, email, joined):
+        User = self.apps.get_model('account', 'User')
+        users = User.objects.using(self.alias)
+        users.create(email=email, first_name='Test', last_name='User', phone='0100', role='customer', password='!')
+        users.filter(email=email).update(date_joined=joined)
+
+    def test_users_are_numbered_by_join_date_and_references_follow(self):
+        self.create_user('late@example.com', datetime(2024, 5, 1, tzinfo=timezone.utc))
+        self.create_user('early@example.com', datetime(2023, 1, 1, tzinfo=timezone.utc))
+        Restaurant = self.apps.get_model('account', 'Restaurant')
+        Order = self.apps.get_model('orders', 'Order')
+        Token = self.apps.get_model('authtoken', 'Token')
+        AuditEvent = self.apps.get_model('audit', 'AuditEvent')
+        restaurant = Restaurant.objects.using(self.alias).create(name='Test', location='Cairo', owner_id='late@example.com')
+        Order.objects.using(self.alias).create(customer_id='early@example.com', restaurant_id=restaurant.id, total_price='10.00')
+        Token.objects.using(self.alias).create(key='a' * 40, user_id='late@example.com')
+        AuditEvent.objects.using(self.alias).create(restaurant_id=restaurant.id, action='update', target_type='user', target_id='early@example.com')
+
+        apps = self.migrate()
+
+        User = apps.get_model('account', 'User')
+        ids = dict(User.objects.using(self.alias).values_list('email', 'id'))
+        self.assertEqual(ids, {'early@example.com': 1, 'late@example.com': 2})
+        self.assertEqual(apps.get_model('account', 'Restaurant').objects.using(self.alias).get().owner_id, 2)
+        self.assertEqual(apps.get_model('orders', 'Order').objects.using(self.alias).get().customer_id, 1)
+        self.assertEqual(apps.get_model('authtoken', 'Token').objects.using(self.alias).get().user_id, 2)
+        self.assertEqual(apps.get_model('audit', 'AuditEvent').objects.using(self.alias).get().target_id, '1')
+
+    def test_sessions_are_kept_for_existing_users_only(self):
+        self.create_user('customer@example.com', datetime(2023, 1, 1, tzinfo=timezone.utc))
+        Session = self.apps.get_model('sessions', 'Session')
+        store = import_module(settings.SESSION_ENGINE).SessionStore()
+        sessions = Session.objects.using(self.alias)
+        sessions.create(session_key='kept', session_data=store.encode({'_auth_user_id': 'customer@example.com'}), expire_date=datetime(2100, 1, 1, tzinfo=timezone.utc))
+        sessions.create(session_key='dropped', session_data=store.encode({'_auth_user_id': 'gone@example.com'}), expire_date=datetime(2100, 1, 1, tzinfo=timezone.utc))
+
+        apps = self.migrate()
+
+        sessions = apps.get_model('sessions', 'Session').objects.using(self.alias)
+        self.assertEqual(list(sessions.values_list('session_key', flat=True)), ['kept'])
+        self.assertEqual(store.decode(sessions.get().session_data)['_auth_user_id'], '1')
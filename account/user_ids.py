@@ -0,0 +1,52 @@
+"""
+Helpers for the migrations that move users from their email to an integer id as primary key.
+Columns pointing at users are first rewritten in place from emails to ids, then rebuilt with the
+integer type. Both steps follow Django's SQLite table rebuild, the databases this project runs on.
+"""
+from django.db import models
+
+
+def user_foreign_keys(apps, labels=None):
+    """
+    Return every concrete foreign key to the user model, including those of auto-created M2M tables.
+    With `labels`, only fields of models whose label is in it.
+    """
+    User = apps.get_model('account', 'User')
+    fields = []
+    for model in apps.get_models(include_auto_created=True):
+        if model._meta.proxy or not model._meta.managed:
+            continue
+        if labels is not None and model._meta.label_lower not in labels:
+            continue
+        for field in model._meta.local_fields:
+            if field.is_relation and field.related_model is User:
+                fields.append(field)
+    return fields
+
+
+def point_at_ids(schema_editor, field, mapping_table, email_column, id_column):
+    """
+    Replace the emails stored in `field` with user ids looked up in `mapping_table`.
+    References to users that no longer exist become NULL, or abort the migration when the column cannot be NULL.
+    """
+    quote = schema_editor.quote_name
+    table, column = quote(field.model._meta.db_table), quote(field.column)
+    lookup = f'SELECT {quote(id_column)} FROM {quote(mapping_table)} WHERE {quote(email_column)} = {table}.{column}'
+    if not field.null:
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {table} WHERE NOT EXISTS ({lookup})')
+            missing = cursor.fetchone()[0]
+        if missing:
+            raise ValueError(f"{missing} rows of {field.model._meta.db_table}.{field.column} point at users that do not exist.")
+    schema_editor.execute(f'UPDATE {table} SET {column} = ({lookup}) WHERE {column} IS NOT NULL')
+
+
+def rebuild_column(schema_editor, field):
+    """
+    Rebuild the column of `field` with the type of the current user primary key.
+    The column still has the text type of the email key; the rebuild copies the ids over as integers.
+    """
+    old_field = models.CharField(max_length=255, null=field.null, db_column=field.column)
+    old_field.set_attributes_from_name(field.name)
+    old_field.model = field.model
+    schema_editor.alter_field(field.model, old_field, field)
@@ -9,6 +9,7 @@ from rest_framework.authtoken.models import Token
 from .models import User,OneTimePassword,Restaurant
 from .serializers import (OwnerRegistrationSerializer,EmployeeRegistrationSerializer,LoginSerializer,CustomerRegistrationSerializer)
 from .utils import send_otp_to_user
+from audit.buffer import record
 
 # View for owner registration.
 class OwnerRegistrationView(APIView):
@@ -82,9 +83,11 @@ class VerifyEmployee(APIView):
             employee=User.objects.get(email=employee_email,restaurant=restaurant)
         except User.DoesNotExist:
             return Response({"message":"Employee not found or not associated with your restaurant."}, status=status.HTTP_404_NOT_FOUND)
+        before = {'is_active': employee.is_active, 'is_verified': employee.is_verified}
         employee.is_active = True
         employee.is_verified=True
         employee.save()
+        record(request.user, restaurant, 'employee.verify', employee, {field: [old, True] for field, old in before.items() if not old})
         return Response({"message": "Employee verified."}, status=status.HTTP_200_OK)
     
     
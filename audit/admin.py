@@ -0,0 +1,12 @@
+from django.contrib import admin
+from performance.paginator import EstimatedCountPaginator
+from .models import AuditEvent
+
+# Register your models here.
+@admin.register(AuditEvent)
+class AuditEventAdmin(admin.ModelAdmin):
+    list_display = ['id', 'restaurant', 'actor', 'action', 'target_type', 'target_id', 'created_at']
+    list_select_related = ['restaurant', 'actor']
+    raw_id_fields = ['restaurant', 'actor']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
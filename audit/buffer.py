@@ -0,0 +1,115 @@
+"""
+In-process buffer for audit events.
+Events are inserted with one bulk_create when AUDIT_FLUSH_SIZE events are waiting, every AUDIT_FLUSH_INTERVAL
+seconds from a background thread, and at interpreter exit. A process killed without running exit handlers
+loses at most the events of the last interval. Forked children, such as workers of a preloading server,
+start with an empty buffer and their own flush thread.
+"""
+import atexit
+import logging
+import os
+import threading
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class AuditBuffer:
+    """
+    Thread-safe list of unsaved AuditEvent instances.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.events = []
+        self.timer = None
+
+    def add(self, event):
+        with self.lock:
+            self.events.append(event)
+            full = len(self.events) >= settings.AUDIT_FLUSH_SIZE
+            self.start_timer()
+        if full:
+            self.flush()
+
+    def start_timer(self):
+        if self.timer is None:
+            self.timer = threading.Thread(target=self.run, name='audit-flush', daemon=True)
+            self.timer.start()
+
+    def after_fork(self):
+        """
+        Reset the buffer in a forked child. Only the forking thread survives a fork, so the inherited timer
+        is gone and the locks may be held by threads that no longer exist. Events still waiting belong to
+        the parent, which writes them itself.
+        """
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.events = []
+        self.timer = None
+
+    def run(self):
+        stopped = threading.Event()
+        while not stopped.wait(settings.AUDIT_FLUSH_INTERVAL):
+            self.flush()
+            # This thread's connection is only needed while flushing
+            connections.close_all()
+
+    def flush(self):
+        """
+        Insert every waiting event in one batch. Returns the number of events written.
+        Events that fail to insert are put back and retried on the next flush.
+        """
+        with self.flush_lock:
+            with self.lock:
+                events, self.events = self.events, []
+            if not events:
+                return 0
+            from .models import AuditEvent
+            try:
+                AuditEvent.objects.bulk_create(events, batch_size=500)
+            except Exception:
+                logger.exception("Could not write %d audit events, will retry.", len(events))
+                with self.lock:
+                    self.events = (events + self.events)[-settings.AUDIT_MAX_PENDING:]
+                return 0
+            return len(events)
+
+
+buffer = AuditBuffer()
+atexit.register(buffer.flush)
+os.register_at_fork(after_in_child=buffer.after_fork)
+
+
+def record(actor, restaurant, action, target, changes=None):
+    """
+    Queue an audit event for a change `actor` made to `target`, a model instance of `restaurant`.
+    Call after the change is committed.
+    """
+    from .models import AuditEvent
+    buffer.add(AuditEvent(
+        restaurant_id=getattr(restaurant, 'pk', restaurant),
+        actor_id=actor.pk if actor is not None and actor.is_authenticated else None,
+        action=action,
+        target_type=target._meta.model_name,
+        target_id=str(target.pk),
+        changes=changes or {},
+        created_at=timezone.now(),
+    ))
+
+
+def snapshot(instance):
+    """
+    Return the concrete field values of a model instance as strings, to diff before and after a change.
+    """
+    return {field.name: field.value_to_string(instance) for field in instance._meta.concrete_fields if not field.primary_key}
+
+
+def diff(before, after):
+    """
+    Return {field: [old, new]} for the fields that differ between two snapshots.
+    """
+    return {name: [before.get(name), after.get(name)] for name in {**before, **after} if before.get(name) != after.get(name)}
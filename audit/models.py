@@ -0,0 +1,24 @@
+from django.db import models
+from django.utils import timezone
+from account.models import Restaurant, User
+
+
+class AuditEvent(models.Model):
+    """
+    One change made through the API: who did what to which object of a restaurant.
+    Rows are only ever inserted, and keep their restaurant and actor ids after those are deleted.
+    `created_at` is the time of the change, not of the buffered insert.
+    """
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    actor = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False, null=True, related_name='+')
+    action = models.CharField(max_length=50)
+    target_type = models.CharField(max_length=50)
+    target_id = models.CharField(max_length=255)
+    changes = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=['restaurant', '-created_at'])]
+
+    def __str__(self):
+        return f"{self.action} {self.target_type} {self.target_id} by {self.actor_id}"
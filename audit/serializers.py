@@ -0,0 +1,11 @@
+from rest_framework import serializers
+from .models import AuditEvent
+
+
+class AuditEventSerializer(serializers.ModelSerializer):
+    """
+    Serializes an audit event with the actor, the changed object and the field changes.
+    """
+    class Meta:
+        model = AuditEvent
+        fields = ['id', 'restaurant', 'actor', 'action', 'target_type', 'target_id', 'changes', 'created_at']
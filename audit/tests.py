@@ -0,0 +1,70 @@
+import os
+import unittest
+from unittest import mock
+from django.test import TestCase, override_settings
+from account.models import Restaurant, User
+from .buffer import AuditBuffer, buffer
+from .models import AuditEvent
+
+
+@override_settings(AUDIT_FLUSH_SIZE=3, AUDIT_FLUSH_INTERVAL=3600, AUDIT_MAX_PENDING=4)
+class AuditBufferTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner@example.com', 'Owner', 'Test', '0100', 'pass', role='owner')
+        cls.restaurant = Restaurant.objects.create(name='Test', location='Cairo', owner=cls.owner)
+
+    def setUp(self):
+        self.buffer = AuditBuffer()
+
+    def event(self, target_id='1'):
+        return AuditEvent(restaurant=self.restaurant, actor=self.owner, action='update', target_type='item', target_id=target_id)
+
+    def test_events_wait_until_flush_size(self):
+        self.buffer.add(self.event())
+        self.buffer.add(self.event())
+        self.assertEqual(AuditEvent.objects.count(), 0)
+        self.assertEqual(len(self.buffer.events), 2)
+
+        self.buffer.add(self.event())
+        self.assertEqual(AuditEvent.objects.count(), 3)
+        self.assertEqual(self.buffer.events, [])
+
+    def test_flush_writes_waiting_events(self):
+        self.buffer.add(self.event())
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(self.buffer.flush(), 0)
+        self.assertEqual(AuditEvent.objects.count(), 1)
+
+    def test_failed_flush_keeps_events_for_retry(self):
+        self.buffer.add(self.event('1'))
+        self.buffer.add(self.event('2'))
+        with mock.patch.object(AuditEvent.objects, 'bulk_create', side_effect=Exception('database is down')), self.assertLogs('audit.buffer', 'ERROR'):
+            self.assertEqual(self.buffer.flush(), 0)
+        self.assertEqual([event.target_id for event in self.buffer.events], ['1', '2'])
+
+        self.assertEqual(self.buffer.flush(), 2)
+        self.assertEqual(AuditEvent.objects.count(), 2)
+
+    def test_failed_flush_keeps_at_most_max_pending(self):
+        self.buffer.events = [self.event(str(n)) for n in range(6)]
+        with mock.patch.object(AuditEvent.objects, 'bulk_create', side_effect=Exception('database is down')), self.assertLogs('audit.buffer', 'ERROR'):
+            self.buffer.flush()
+        self.assertEqual([event.target_id for event in self.buffer.events], ['2', '3', '4', '5'])
+
+    def test_after_fork_resets_timer_and_events(self):
+        self.buffer.add(self.event())
+        self.assertIsNotNone(self.buffer.timer)
+        self.buffer.after_fork()
+        self.assertIsNone(self.buffer.timer)
+        self.assertEqual(self.buffer.events, [])
+
+    @unittest.skipUnless(hasattr(os, 'fork'), "needs os.fork")
+    def test_forked_child_starts_with_a_fresh_buffer(self):
+        buffer.start_timer()
+        pid = os.fork()
+        if pid == 0:
+            os._exit(0 if buffer.timer is None and buffer.events == [] else 1)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
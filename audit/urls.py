@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import AuditLogView
+
+urlpatterns = [
+    path('<int:restaurant_id>/', AuditLogView.as_view()),
+]
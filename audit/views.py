@@ -0,0 +1,57 @@
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+from account.models import Restaurant
+from .buffer import buffer
+from .models import AuditEvent
+from .serializers import AuditEventSerializer
+
+
+def parse_time(value):
+    """
+    Parse an ISO 8601 query parameter, treating naive values as the current time zone.
+    """
+    parsed = parse_datetime(value)
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+# View for the audit log of a restaurant.
+class AuditLogView(APIView):
+    """
+    API for owners to read the audit log of their restaurant, newest first.
+    Filter with `since` and `until` (ISO 8601) and `action`; page with `limit`.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, restaurant_id):
+        try:
+            restaurant = Restaurant.objects.get(id=restaurant_id, owner=request.user)
+        except Restaurant.DoesNotExist:
+            return Response({"error": "Restaurant not found or not owned by you."}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            limit = min(int(request.query_params.get('limit', 100)), 500)
+        except ValueError:
+            return Response({"error": "limit must be a number."}, status=status.HTTP_400_BAD_REQUEST)
+        if limit <= 0:
+            return Response({"error": "limit must be positive."}, status=status.HTTP_400_BAD_REQUEST)
+
+        events = AuditEvent.objects.filter(restaurant=restaurant)
+        for param, lookup in (('since', 'created_at__gte'), ('until', 'created_at__lt')):
+            value = request.query_params.get(param)
+            if value:
+                parsed = parse_time(value)
+                if parsed is None:
+                    return Response({"error": f"{param} must be an ISO 8601 date and time."}, status=status.HTTP_400_BAD_REQUEST)
+                events = events.filter(**{lookup: parsed})
+        if request.query_params.get('action'):
+            events = events.filter(action=request.query_params['action'])
+
+        # Make this process's own recent changes visible
+        buffer.flush()
+        events = events.order_by('-created_at', '-id')[:limit]
+        return Response(AuditEventSerializer(events, many=True).data, status=status.HTTP_200_OK)
@@ -14,3 +14,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bdfood.settings')
 
 application = get_asgi_application()
+
+# Build URL patterns, serializer fields and model metadata now instead of on the first request,
+# and check the databases can be reached. Connections are not kept open.
+if os.environ.get('BDFOOD_WARMUP', '1') == '1':
+    from performance.warmup import warm_up
+    warm_up()
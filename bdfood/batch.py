@@ -0,0 +1,111 @@
+"""
+Batch endpoint that runs several GET requests against the /api/v1/ routes in one round-trip.
+Sub-requests reuse the batch request's authentication instead of authenticating again, identical
+sub-requests run once, and all of them read from one transaction. Lookups are not shared between
+different sub-requests beyond that: each view still runs its own queries.
+"""
+import io
+import json
+import logging
+from urllib.parse import urlsplit
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import transaction
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+BATCH_PATH_PREFIX = '/api/v1/'
+
+
+def sub_request(request, path, query):
+    """
+    Build a GET request for `path` that carries the headers and the authenticated user of `request`.
+    """
+    environ = request.META.copy()
+    environ.update({
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'CONTENT_LENGTH': '0',
+        'wsgi.input': io.BytesIO(b''),
+    })
+    environ.pop('CONTENT_TYPE', None)
+    sub = WSGIRequest(environ)
+    # DRF skips its authenticators for requests carrying these
+    sub._force_auth_user = request.user
+    sub._force_auth_token = request.auth
+    if hasattr(request._request, 'session'):
+        sub.session = request._request.session
+    return sub
+
+
+def response_body(response):
+    """
+    Return the body of a sub-response as data to embed in the batch response.
+    """
+    if hasattr(response, 'data'):
+        return response.data
+    if response.get('Content-Type', '').startswith('application/json'):
+        return json.loads(response.content)
+    return response.content.decode(response.charset or 'utf-8', errors='replace')
+
+
+class BatchView(APIView):
+    """
+    API for authenticated users to run up to BATCH_MAX_REQUESTS read-only /api/v1/ requests in one call.
+    Body: {"requests": [{"id": "menu", "path": "/api/v1/restaurant/1/categories/"}, ...]}.
+    Each sub-request gets its own status code in the response; one failing does not fail the batch.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        requests = request.data.get('requests')
+        if not isinstance(requests, list) or not requests:
+            return Response({"error": "requests must be a non-empty list."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(requests) > settings.BATCH_MAX_REQUESTS:
+            return Response({"error": f"A batch can hold at most {settings.BATCH_MAX_REQUESTS} requests."}, status=status.HTTP_400_BAD_REQUEST)
+        if not all(isinstance(entry, dict) and isinstance(entry.get('path'), str) for entry in requests):
+            return Response({"error": "Every request needs a path."}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = {}
+        responses = []
+        with transaction.atomic():
+            for index, entry in enumerate(requests):
+                method = str(entry.get('method', 'GET')).upper()
+                key = (method, entry['path'])
+                if key not in results:
+                    results[key] = self.run(request, method, entry['path'])
+                code, body = results[key]
+                responses.append({"id": entry.get('id', index), "status": code, "body": body})
+        return Response({"responses": responses}, status=status.HTTP_200_OK)
+
+    def run(self, request, method, url):
+        """
+        Return (status code, body) of one sub-request.
+        """
+        if method != 'GET':
+            return status.HTTP_405_METHOD_NOT_ALLOWED, {"error": "Only GET requests can be batched."}
+        parts = urlsplit(url)
+        # Only API routes; the admin, /metrics and anything else outside the API cannot be batched
+        if not parts.path.startswith(BATCH_PATH_PREFIX):
+            return status.HTTP_404_NOT_FOUND, {"error": "Not found."}
+        try:
+            match = resolve(parts.path)
+        except Resolver404:
+            return status.HTTP_404_NOT_FOUND, {"error": "Not found."}
+        if getattr(match.func, 'view_class', None) is type(self):
+            return status.HTTP_400_BAD_REQUEST, {"error": "Batches cannot be nested."}
+
+        try:
+            # A failing sub-request must not roll back the reads of the others
+            with transaction.atomic():
+                response = match.func(sub_request(request, parts.path, parts.query), *match.args, **match.kwargs)
+        except Exception:
+            logger.exception("Batched request to %s failed.", parts.path)
+            return status.HTTP_500_INTERNAL_SERVER_ERROR, {"error": "Internal server error."}
+        return response.status_code, response_body(response)
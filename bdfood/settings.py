@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,15 +43,21 @@ INSTALLED_APPS = [
     'account',
     'restaurant',
     'orders',
+    'payment',
+    'performance',
+    'audit',
+    'promotions',
 ]
 AUTH_USER_MODEL = 'account.User'
 
 MIDDLEWARE = [
+    'performance.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'performance.middleware.ProfilerMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -91,6 +98,81 @@ DATABASES = {
     }
 }
 
+# Order sharding
+# Order and OrderItem rows are placed on ORDER_SHARD_COUNT extra SQLite files by restaurant id.
+# With 0 shards everything stays on 'default'. See orders/routers.py.
+ORDER_SHARD_COUNT = int(os.environ.get('BDFOOD_ORDER_SHARDS', 0))
+ORDER_SHARD_ALIASES = [f'orders_shard_{index}' for index in range(ORDER_SHARD_COUNT)]
+for alias in ORDER_SHARD_ALIASES:
+    DATABASES[alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / f'{alias}.sqlite3',
+    }
+
+DATABASE_ROUTERS = ['orders.routers.OrderShardRouter']
+
+# Orders older than this many days are moved to the archive by `manage.py archive_orders`.
+ORDER_ARCHIVE_AFTER_DAYS = 180
+
+# Carts without activity for this many days are removed by `manage.py sweep_carts`.
+CART_IDLE_DAYS = 30
+
+# Responses to requests with an Idempotency-Key header are kept this many seconds for replay.
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+# Seconds a retry waits for the first request with the same key to finish.
+IDEMPOTENCY_LOCK_TIMEOUT = 10
+# Seconds a request holds its key before a retry may take it over, e.g. after the process died.
+IDEMPOTENCY_LEASE = 60
+
+# Menu changes older than this many days are dropped by `manage.py compact_menu_changes`.
+MENU_CHANGE_RETENTION_DAYS = 30
+
+# Seconds an owner's dashboard summary is cached.
+OWNER_DASHBOARD_CACHE_TTL = 30
+
+# "Frequently ordered together" pairs kept per item, as orders are placed and by `manage.py build_item_pairs`.
+ITEM_PAIRS_TOP_K = 20
+
+# Audit events are buffered in each process and inserted in batches of up to AUDIT_FLUSH_SIZE,
+# at least every AUDIT_FLUSH_INTERVAL seconds. At most AUDIT_MAX_PENDING events are kept while inserts fail.
+AUDIT_FLUSH_SIZE = 100
+AUDIT_FLUSH_INTERVAL = 2.0
+AUDIT_MAX_PENDING = 10000
+
+# Most sub-requests one call to /api/v1/batch/ may carry.
+BATCH_MAX_REQUESTS = 20
+
+# Admin changelists of tables with at least this many rows show an estimated count instead of running COUNT(*).
+ADMIN_ESTIMATED_COUNT_THRESHOLD = 10000
+
+# Seconds a process keeps the promotions it compiled for a restaurant before reloading them, even when
+# their version has not changed. Covers changes made without signals, such as queryset.update().
+PROMOTION_EVALUATOR_TTL = 60
+
+# Request metrics, exposed at /metrics to staff and to scrapers sending METRICS_TOKEN as a bearer token.
+# Each worker process writes its own file to METRICS_DIR.
+METRICS_DIR = os.environ.get('BDFOOD_METRICS_DIR', BASE_DIR / '.metrics')
+METRICS_FLUSH_INTERVAL = 1.0
+METRICS_TOKEN = os.environ.get('BDFOOD_METRICS_TOKEN')
+
+# Per-request profiling for staff (X-Profile: 1 header or ?profile=1), see performance/profiling.py.
+# PROFILER_SAMPLE_RATE = N also profiles one in every N requests, 0 disables sampling.
+PROFILER_DIR = os.environ.get('BDFOOD_PROFILER_DIR', BASE_DIR / '.profiles')
+PROFILER_QUERY_PARAM = 'profile'
+PROFILER_SAMPLE_RATE = int(os.environ.get('BDFOOD_PROFILER_SAMPLE_RATE', 0))
+
+# Extra warm-up steps run at worker start after the built-in ones, as import paths. See performance/warmup.py.
+WARMUP_CALLABLES = []
+
+# Payment gateways by name, see payment/gateways.py.
+PAYMENT_GATEWAYS = {
+    'stub': 'payment.gateways.StubGateway',
+}
+PAYMENT_DEFAULT_GATEWAY = 'stub'
+# The stub gateway only accepts webhooks carrying this secret and leaves reconciled payments open.
+PAYMENT_STUB_WEBHOOK_SECRET = os.environ.get('BDFOOD_PAYMENT_STUB_WEBHOOK_SECRET', '')
+PAYMENT_STUB_SETTLED_STATUS = 'processing'
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.TokenAuthentication',  
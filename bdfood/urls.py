@@ -16,10 +16,17 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path,include
+from performance.views import metrics_view
+from .batch import BatchView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/v1/user/',include('account.urls')),
     path('api/v1/restaurant/',include('restaurant.urls')),
     path('api/v1/order/',include('orders.urls')),
+    path('api/v1/payment/',include('payment.urls')),
+    path('api/v1/audit/',include('audit.urls')),
+    path('api/v1/promotions/',include('promotions.urls')),
+    path('api/v1/batch/',BatchView.as_view()),
+    path('metrics', metrics_view),
 ]
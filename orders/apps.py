@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_migrate
 
 
 class OrdersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'orders'
+
+    def ready(self):
+        from account.models import Restaurant, User
+        from .sharding import delete_from_shards, reserve_id_range
+        post_migrate.connect(reserve_id_range, sender=self)
+        post_delete.connect(delete_from_shards, sender=User)
+        post_delete.connect(delete_from_shards, sender=Restaurant)
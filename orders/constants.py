@@ -0,0 +1,9 @@
+ORDER_STATUSES = [
+        ('Pending', 'Pending'),
+        ('Preparing', 'Preparing'),
+        ('Ready', 'Ready'),
+        ('Completed', 'Completed'),
+    ]
+
+# Statuses an order never leaves; only these are archived.
+FINAL_ORDER_STATUSES = ['Completed']
@@ -0,0 +1,91 @@
+"""
+Idempotency-Key support for API views.
+The first request with a key inserts a placeholder record, which acts as the lock. Retries replay the stored
+response, or wait for the placeholder to be filled when the first request is still running. A placeholder only
+holds the key for IDEMPOTENCY_LEASE seconds, so a request whose process died does not block its retries for long.
+"""
+import time
+from datetime import timedelta
+from functools import wraps
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from .models import IdempotencyRecord
+
+POLL_INTERVAL = 0.05
+
+
+def idempotent(endpoint):
+    """
+    Decorator for APIView methods. Requests without an Idempotency-Key header run as usual.
+    Server errors are not stored so the client can retry them.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            key = request.headers.get('Idempotency-Key')
+            if not key:
+                return method(view, request, *args, **kwargs)
+            if len(key) > 255:
+                return Response({"error": "Idempotency-Key is too long."}, status=status.HTTP_400_BAD_REQUEST)
+
+            record, owned = claim(request.user, key, endpoint)
+            if not owned:
+                return replay(record)
+
+            try:
+                response = method(view, request, *args, **kwargs)
+            except Exception:
+                release(record)
+                raise
+            if response.status_code >= 500:
+                release(record)
+            else:
+                # Only while this request still holds the placeholder, not after a retry took it over
+                IdempotencyRecord.objects.filter(id=record.id, status_code__isnull=True).update(
+                    status_code=response.status_code, response=response.data,
+                    expires_at=timezone.now() + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+                )
+            return response
+        return wrapper
+    return decorator
+
+
+def claim(user, key, endpoint):
+    """
+    Return (placeholder, True) when this request owns the key, otherwise (record, False) with the record to replay.
+    Finished records and placeholders whose lease ran out are taken over once they expire.
+    """
+    records = IdempotencyRecord.objects.filter(user=user, key=key, endpoint=endpoint)
+    deadline = time.monotonic() + settings.IDEMPOTENCY_LOCK_TIMEOUT
+    while True:
+        record = records.first()
+        if record is not None and record.expires_at <= timezone.now():
+            records.filter(id=record.id).delete()
+            record = None
+        if record is None:
+            try:
+                with transaction.atomic():
+                    record = IdempotencyRecord.objects.create(
+                        user=user, key=key, endpoint=endpoint,
+                        expires_at=timezone.now() + timedelta(seconds=settings.IDEMPOTENCY_LEASE),
+                    )
+                return record, True
+            except IntegrityError:
+                # A concurrent request inserted the key first
+                continue
+        if record.status_code is not None or time.monotonic() >= deadline:
+            return record, False
+        time.sleep(POLL_INTERVAL)
+
+
+def release(record):
+    IdempotencyRecord.objects.filter(id=record.id, status_code__isnull=True).delete()
+
+
+def replay(record):
+    if record.status_code is None:
+        return Response({"error": "A request with this Idempotency-Key is still in progress."}, status=status.HTTP_409_CONFLICT)
+    return Response(record.response, status=record.status_code, headers={'Idempotent-Replayed': 'true'})
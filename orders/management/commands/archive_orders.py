@@ -0,0 +1,83 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from orders.constants import FINAL_ORDER_STATUSES
+from orders.models import ArchivedOrder, Order, OrderItem, RestaurantShard
+from orders.sharding import order_aliases
+from payment.constants import FINAL_PAYMENT_STATUSES
+from payment.models import PaymentIntent
+
+
+class Command(BaseCommand):
+    """
+    Move old completed orders into the archive table in bounded batches.
+    Orders still in the kitchen queue or with a payment in progress are left in place, and so are the orders
+of restaurants being moved to another shard.
+    Each batch is copied and deleted in one short transaction, so the hot tables stay writable.
+    """
+    help = "Archive completed orders older than ORDER_ARCHIVE_AFTER_DAYS."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.ORDER_ARCHIVE_AFTER_DAYS)
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--max-batches', type=int, default=None, help='Stop after this many batches per database.')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        total = 0
+        for using in order_aliases():
+            archived = self.archive(using, cutoff, options['batch_size'], options['max_batches'])
+            if archived:
+                self.stdout.write(f"{using}: archived {archived} orders")
+            total += archived
+        self.stdout.write(self.style.SUCCESS(f"Archived {total} completed orders created before {cutoff:%Y-%m-%d}."))
+
+    def archive(self, using, cutoff, batch_size, max_batches):
+        archived = 0
+        batches = 0
+        last = None
+        while max_batches is None or batches < max_batches:
+            moving = RestaurantShard.objects.filter(moving=True).values_list('restaurant_id', flat=True)
+            candidates = Order.objects.using(using).filter(created_at__lt=cutoff, status__in=FINAL_ORDER_STATUSES).exclude(restaurant_id__in=list(moving))
+            if last is not None:
+                candidates = candidates.filter(Q(created_at__gt=last.created_at) | Q(created_at=last.created_at, id__gt=last.id))
+            candidates = list(candidates.order_by('created_at', 'id')[:batch_size])
+            if not candidates:
+                break
+            last = candidates[-1]
+            batches += 1
+            # Orders with a payment still in progress stay until the payment settles
+            open_payments = set(
+                PaymentIntent.objects.filter(order_id__in=[order.id for order in candidates])
+                .exclude(status__in=FINAL_PAYMENT_STATUSES).values_list('order_id', flat=True)
+            )
+            orders = [order for order in candidates if order.id not in open_payments]
+            if not orders:
+                continue
+            order_ids = [order.id for order in orders]
+            lines = {}
+            for line in OrderItem.objects.using(using).filter(order_id__in=order_ids).order_by('id'):
+                lines.setdefault(line.order_id, []).append({'item': line.item_id, 'quantity': line.quantity, 'price': str(line.price)})
+
+            rows = [
+                ArchivedOrder(
+                    id=order.id,
+                    customer_id=order.customer_id,
+                    restaurant_id=order.restaurant_id,
+                    total_price=order.total_price,
+                    discount=order.discount,
+                    status=order.status,
+                    created_at=order.created_at,
+                    items=lines.get(order.id, []),
+                )
+                for order in orders
+            ]
+            with transaction.atomic(using=using):
+                ArchivedOrder.objects.using(using).bulk_create(rows, ignore_conflicts=True)
+                OrderItem.objects.using(using).filter(order_id__in=order_ids).delete()
+                Order.objects.using(using).filter(id__in=order_ids).delete()
+            archived += len(orders)
+        return archived
@@ -0,0 +1,64 @@
+import heapq
+from collections import Counter, defaultdict
+from itertools import groupby
+from operator import itemgetter
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from orders.models import ItemPair, OrderItem
+from orders.recommendations import item_pairs
+from orders.sharding import order_aliases
+from restaurant.models import Item
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the item co-occurrence table from order lines on every order database.
+    Lines are streamed in order id order and counted per order in memory instead of self-joining OrderItem.
+    Only the top pairs of each item are kept. Orders placed while this runs may be counted twice or missed.
+    """
+    help = "Rebuild \"frequently ordered together\" pair counts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=settings.ITEM_PAIRS_TOP_K, help='Pairs kept per item.')
+        parser.add_argument('--restaurant', type=int, default=None, help='Only rebuild this restaurant.')
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        items = Item.objects.all()
+        if options['restaurant'] is not None:
+            items = items.filter(restaurant_id=options['restaurant'])
+        restaurant_of = dict(items.values_list('id', 'restaurant_id'))
+
+        counts = Counter()
+        orders = 0
+        for using in order_aliases():
+            lines = OrderItem.objects.using(using).order_by('order_id').values_list('order_id', 'item_id')
+            if options['restaurant'] is not None:
+                lines = lines.filter(order__restaurant_id=options['restaurant'])
+            for _, order_lines in groupby(lines.iterator(chunk_size=options['batch_size']), key=itemgetter(0)):
+                # Lines of items that no longer exist are skipped; items are only paired within a restaurant
+                by_restaurant = defaultdict(list)
+                for _, item_id in order_lines:
+                    if item_id in restaurant_of:
+                        by_restaurant[restaurant_of[item_id]].append(item_id)
+                for item_ids in by_restaurant.values():
+                    counts.update(item_pairs(item_ids))
+                orders += 1
+
+        by_item = defaultdict(list)
+        for (item_id, other_id), count in counts.items():
+            by_item[item_id].append((count, other_id))
+        rows = [
+            ItemPair(restaurant_id=restaurant_of[item_id], item_id=item_id, other_id=other_id, count=count)
+            for item_id, pairs in by_item.items()
+            for count, other_id in heapq.nlargest(options['top_k'], pairs)
+        ]
+
+        with transaction.atomic():
+            existing = ItemPair.objects.all()
+            if options['restaurant'] is not None:
+                existing = existing.filter(restaurant_id=options['restaurant'])
+            existing.delete()
+            ItemPair.objects.bulk_create(rows, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Counted {orders} orders, kept {len(rows)} item pairs."))
@@ -0,0 +1,144 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Case, When
+from account.models import Restaurant
+from orders.models import ArchivedOrder, Order, OrderItem, RestaurantShard
+from orders.sharding import shard_aliases, shard_for_restaurant
+
+
+class Command(BaseCommand):
+    """
+    Move the order data of one restaurant to another shard.
+    Rows are copied in batches while the restaurant keeps taking orders. Then its order writes are refused
+    for a short while: after --drain seconds the orders written meanwhile are copied, changed orders are
+    updated, the directory entry is switched and writes are allowed again. The source rows are removed last.
+    """
+    help = "Move a restaurant's orders and order items to another shard."
+
+    def add_arguments(self, parser):
+        parser.add_argument('restaurant_id', type=int)
+        parser.add_argument('target', help='Target shard alias, e.g. orders_shard_1.')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--drain', type=float, default=5.0, help='Seconds to wait after blocking writes for requests already writing.')
+        parser.add_argument('--source', help="Source alias, defaults to the restaurant's current shard. Use 'default' when first enabling sharding.")
+
+    def handle(self, *args, **options):
+        restaurant_id = options['restaurant_id']
+        target = options['target']
+        batch_size = options['batch_size']
+
+        if target not in shard_aliases():
+            raise CommandError(f"Unknown shard alias '{target}'. Configured shards: {', '.join(shard_aliases()) or 'none'}.")
+        if not Restaurant.objects.filter(id=restaurant_id).exists():
+            raise CommandError(f"Restaurant {restaurant_id} does not exist.")
+
+        source = options['source'] or shard_for_restaurant(restaurant_id)
+        if source not in shard_aliases() + [DEFAULT_DB_ALIAS]:
+            raise CommandError(f"Unknown source alias '{source}'.")
+        if source == target:
+            self.stdout.write(f"Restaurant {restaurant_id} is already on {target}.")
+            return
+
+        copied = self.copy_orders(restaurant_id, source, target, batch_size)
+        directory = RestaurantShard.objects.using(DEFAULT_DB_ALIAS)
+        directory.update_or_create(restaurant_id=restaurant_id, defaults={'moving': True}, create_defaults={'alias': source, 'moving': True})
+        try:
+            time.sleep(options['drain'])
+            copied += self.copy_orders(restaurant_id, source, target, batch_size)
+            self.refresh_orders(restaurant_id, source, target, batch_size)
+            directory.filter(restaurant_id=restaurant_id).update(alias=target, moving=False)
+        except BaseException:
+            directory.filter(restaurant_id=restaurant_id).update(moving=False)
+            raise
+        removed = self.delete_orders(restaurant_id, source, target, batch_size)
+        archived = self.move_archived_orders(restaurant_id, source, target, batch_size)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Moved restaurant {restaurant_id} from {source} to {target}: {copied} orders copied, {removed} removed from source, {archived} archived orders moved."
+        ))
+
+    def copy_orders(self, restaurant_id, source, target, batch_size):
+        """
+        Copy orders not yet present on the target, keeping their primary keys.
+        """
+        copied = 0
+        last_id = 0
+        while True:
+            orders = list(Order.objects.using(source).filter(restaurant_id=restaurant_id, id__gt=last_id).order_by('id')[:batch_size])
+            if not orders:
+                return copied
+            last_id = orders[-1].id
+            order_ids = [order.id for order in orders]
+            existing = set(Order.objects.using(target).filter(id__in=order_ids).values_list('id', flat=True))
+            orders = [order for order in orders if order.id not in existing]
+            if not orders:
+                continue
+            items = list(OrderItem.objects.using(source).filter(order_id__in=[order.id for order in orders]))
+            with transaction.atomic(using=target):
+                created_at = {order.id: order.created_at for order in orders}
+                Order.objects.using(target).bulk_create(orders, batch_size=batch_size)
+                OrderItem.objects.using(target).bulk_create(items, batch_size=batch_size)
+                # bulk_create stamps auto_now_add fields, put the original timestamps back
+                Order.objects.using(target).filter(id__in=created_at).update(
+                    created_at=Case(*[When(id=order_id, then=value) for order_id, value in created_at.items()])
+                )
+            copied += len(orders)
+            self.stdout.write(f"  copied {copied} orders")
+
+    def refresh_orders(self, restaurant_id, source, target, batch_size):
+        """
+        Bring the copies on the target up to date with the source: orders changed since they were copied
+        are updated, orders archived on the source since are removed from the target.
+        """
+        fields = [field for field in Order._meta.concrete_fields if not field.primary_key and field.name != 'created_at']
+        last_id = 0
+        while True:
+            copies = {order.id: order for order in Order.objects.using(target).filter(restaurant_id=restaurant_id, id__gt=last_id).order_by('id')[:batch_size]}
+            if not copies:
+                return
+            last_id = max(copies)
+            originals = Order.objects.using(source).in_bulk(list(copies))
+            changed = [
+                order for order in originals.values()
+                if any(getattr(order, field.attname) != getattr(copies[order.id], field.attname) for field in fields)
+            ]
+            gone = [order_id for order_id in copies if order_id not in originals]
+            with transaction.atomic(using=target):
+                if changed:
+                    Order.objects.using(target).bulk_update(changed, [field.name for field in fields], batch_size=batch_size)
+                OrderItem.objects.using(target).filter(order_id__in=gone).delete()
+                Order.objects.using(target).filter(id__in=gone).delete()
+
+    def delete_orders(self, restaurant_id, source, target, batch_size):
+        """
+        Remove the restaurant's orders from the source shard in batches.
+        Only rows already present on the target are removed.
+        """
+        removed = 0
+        last_id = 0
+        while True:
+            order_ids = list(Order.objects.using(source).filter(restaurant_id=restaurant_id, id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size])
+            if not order_ids:
+                return removed
+            last_id = order_ids[-1]
+            order_ids = list(Order.objects.using(target).filter(id__in=order_ids).values_list('id', flat=True))
+            with transaction.atomic(using=source):
+                OrderItem.objects.using(source).filter(order_id__in=order_ids).delete()
+                Order.objects.using(source).filter(id__in=order_ids).delete()
+            removed += len(order_ids)
+
+    def move_archived_orders(self, restaurant_id, source, target, batch_size):
+        """
+        Move the restaurant's archived orders, one batch per transaction on each side.
+        """
+        moved = 0
+        while True:
+            rows = list(ArchivedOrder.objects.using(source).filter(restaurant_id=restaurant_id).order_by('id')[:batch_size])
+            if not rows:
+                return moved
+            with transaction.atomic(using=target):
+                ArchivedOrder.objects.using(target).bulk_create(rows, ignore_conflicts=True)
+            with transaction.atomic(using=source):
+                ArchivedOrder.objects.using(source).filter(id__in=[row.id for row in rows]).delete()
+            moved += len(rows)
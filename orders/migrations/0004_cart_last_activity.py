@@ -0,0 +1,25 @@
+# Generated by Django 5.1.1 on 2026-10-19 17:27
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def backfill_last_activity(apps, schema_editor):
+    Cart = apps.get_model('orders', 'Cart')
+    Cart.objects.using(schema_editor.connection.alias).update(last_activity=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_archived_order'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='last_activity',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(backfill_last_activity, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.1 on 2026-10-19 17:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0003_remove_restaurant_restaurant_id'),
+        ('orders', '0006_idempotency_record'),
+        ('restaurant', '0003_menu_change_log'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemPair',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='restaurant.item')),
+                ('other', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='restaurant.item')),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='account.restaurant')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['item', '-count'], name='orders_item_item_id_2f8542_idx')],
+                'constraints': [models.UniqueConstraint(fields=('item', 'other'), name='unique_item_pair')],
+            },
+        ),
+    ]
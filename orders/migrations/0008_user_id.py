@@ -0,0 +1,36 @@
+# Generated by Django 5.1.1 on 2026-10-19 18:20
+
+from django.db import DEFAULT_DB_ALIAS, migrations
+from account.user_ids import point_at_ids, rebuild_column, user_foreign_keys
+from orders.sharding import SHARDED_MODELS
+
+
+def point_shard_references_at_ids(apps, schema_editor):
+    """
+    Rewrite the user references of order tables on a shard from emails to ids.
+    The ids are read from 'default', which account.0005 has already migrated; on 'default' itself there is nothing left to do.
+    """
+    alias = schema_editor.connection.alias
+    if alias == DEFAULT_DB_ALIAS:
+        return
+    User = apps.get_model('account', 'User')
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('CREATE TEMP TABLE user_ids (email varchar(255) PRIMARY KEY, id bigint NOT NULL)')
+        rows = User.objects.using(DEFAULT_DB_ALIAS).values_list('email', 'id')
+        cursor.executemany('INSERT INTO user_ids (email, id) VALUES (%s, %s)', list(rows.iterator(chunk_size=5000)))
+    for field in user_foreign_keys(apps, SHARDED_MODELS):
+        point_at_ids(schema_editor, field, 'user_ids', 'email', 'id')
+        rebuild_column(schema_editor, field)
+    schema_editor.execute('DROP TABLE user_ids')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0005_user_id'),
+        ('orders', '0007_item_pair'),
+    ]
+
+    operations = [
+        migrations.RunPython(point_shard_references_at_ids, hints={'model_name': 'order'}),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-19 18:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0011_order_status_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurantshard',
+            name='moving',
+            field=models.BooleanField(default=False),
+        ),
+    ]
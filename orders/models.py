@@ -1,6 +1,13 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models import ExpressionWrapper, F, Sum
+from django.utils import timezone
 from account.models import User
 from restaurant.models import Item,Restaurant
+from .constants import ORDER_STATUSES
+
+# Price of one cart line, computed in SQL
+LINE_TOTAL = ExpressionWrapper(F('quantity') * F('item__price'), output_field=models.DecimalField(max_digits=12, decimal_places=2))
 
 class Cart(models.Model):
     """
@@ -8,10 +15,40 @@ class Cart(models.Model):
     """
     customer = models.ForeignKey(User, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
+    last_activity = models.DateTimeField(default=timezone.now, db_index=True)
 
     def __str__(self):
         return f"Cart of {self.customer.email}"
 
+    def touch(self):
+        """
+        Record a cart mutation. Idle carts are removed by `manage.py sweep_carts`.
+        """
+        self.last_activity = timezone.now()
+        Cart.objects.filter(pk=self.pk).update(last_activity=self.last_activity)
+
+    def lines(self):
+        """
+        Cart items with their item, category and restaurant joined in and `line_total` computed by the database.
+        """
+        return (
+            self.items
+            .select_related('item__restaurant')
+            .annotate(line_total=LINE_TOTAL)
+            .order_by('item__restaurant_id', 'id')
+        )
+
+    def totals_by_restaurant(self):
+        """
+        Subtotal and item count per restaurant in the cart, summed by the database.
+        """
+        return (
+            self.items
+            .values(restaurant_id=F('item__restaurant_id'), restaurant_name=F('item__restaurant__name'))
+            .annotate(subtotal=Sum(LINE_TOTAL), quantity=Sum('quantity'))
+            .order_by('restaurant_id')
+        )
+
 class CartItem(models.Model):
     """
     CartItem model to represent individual items in the cart.
@@ -27,11 +64,27 @@ class Order(models.Model):
     """
     Order model to represent an order placed by a customer.
     """
-    customer = models.ForeignKey(User, on_delete=models.CASCADE)
-    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE)
+    customer = models.ForeignKey(User, on_delete=models.CASCADE, db_constraint=False)
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, db_constraint=False)
     total_price = models.DecimalField(max_digits=10, decimal_places=2)
-    status = models.CharField(max_length=50, default="Pending")
+    # Taken off the cart subtotal by promotions; total_price is what remains to be paid.
+    discount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    status = models.CharField(max_length=50, choices=ORDER_STATUSES, default="Pending")
     created_at = models.DateTimeField(auto_now_add=True)
+    # Kitchen queue: higher priority is served first, then oldest first.
+    priority = models.IntegerField(default=0)
+    claimed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, db_constraint=False, related_name='claimed_orders')
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    ready_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['restaurant', 'status', '-priority', 'created_at']),
+            # Date browsing and the status filter in the admin
+            models.Index(fields=['created_at']),
+            models.Index(fields=['status', 'created_at']),
+        ]
 
     def __str__(self):
         return f"Order {self.id} by {self.customer.email}"
@@ -41,9 +94,80 @@ class OrderItem(models.Model):
     OrderItem model to represent individual items in an order.
     """
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
-    item = models.ForeignKey(Item, on_delete=models.CASCADE)
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, db_constraint=False)
     quantity = models.PositiveIntegerField()
     price = models.DecimalField(max_digits=6, decimal_places=2)
 
     def __str__(self):
-        return f"{self.item.name} (Order {self.order.id})"
+        return f"{self.item.name} (Order {self.order_id})"
+
+class ArchivedOrder(models.Model):
+    """
+    ArchivedOrder model to keep an old order out of the hot order tables.
+    The order lines are stored with the order as a JSON list, ids are kept from the original order.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    customer = models.ForeignKey(User, on_delete=models.CASCADE, db_constraint=False, related_name='archived_orders')
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, db_constraint=False, related_name='archived_orders')
+    total_price = models.DecimalField(max_digits=10, decimal_places=2)
+    discount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    status = models.CharField(max_length=50)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    items = models.JSONField(default=list)
+
+    class Meta:
+        indexes = [models.Index(fields=['customer', '-created_at'])]
+
+    def __str__(self):
+        return f"Archived order {self.id}"
+
+class IdempotencyRecord(models.Model):
+    """
+    Stores the first response of a request sent with an Idempotency-Key header so retries can replay it.
+    A record without a response marks a request that is still running.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='idempotency_records')
+    key = models.CharField(max_length=255)
+    endpoint = models.CharField(max_length=100)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['user', 'key', 'endpoint'], name='unique_idempotency_key')]
+
+    def __str__(self):
+        return f"{self.endpoint} {self.key}"
+
+class RestaurantShard(models.Model):
+    """
+    Directory entry pinning a restaurant's order data to a shard database alias.
+    Restaurants without an entry are placed by restaurant id modulo the shard count.
+    Order writes of a restaurant are refused while `moving` is set by `manage.py move_restaurant_shard`.
+    """
+    restaurant = models.OneToOneField(Restaurant, on_delete=models.CASCADE, primary_key=True)
+    alias = models.CharField(max_length=50)
+    moving = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f"{self.restaurant_id} on {self.alias}"
+
+class ItemPair(models.Model):
+    """
+    How many orders contained both `item` and `other`. Each pair is stored in both directions
+    so the add-ons for a set of items are one lookup on `item`.
+    Rebuilt by `manage.py build_item_pairs` and bumped as orders are placed; each item keeps its ITEM_PAIRS_TOP_K best pairs.
+    """
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='+')
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='+')
+    other = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='+')
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['item', 'other'], name='unique_item_pair')]
+        indexes = [models.Index(fields=['item', '-count'])]
+
+    def __str__(self):
+        return f"{self.item_id} with {self.other_id}: {self.count}"
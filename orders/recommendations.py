@@ -0,0 +1,58 @@
+"""
+"Frequently ordered together" suggestions from item co-occurrence in orders.
+Counts live in the ItemPair table on the default database, next to the menu, whatever shard the orders are on.
+"""
+from collections import defaultdict
+from itertools import permutations
+from django.conf import settings
+from django.db.models import F, Q, Subquery, Sum
+from .models import ItemPair
+
+
+def item_pairs(item_ids):
+    """
+    Return every ordered pair of distinct items in an order.
+    """
+    return permutations(sorted(set(item_ids)), 2)
+
+
+def record_order(items):
+    """
+    Count one more order for every pair of items in it. `items` maps item id to restaurant id;
+    only items of the same restaurant are paired.
+    Missing pairs are inserted at zero first, then all pairs are incremented in one UPDATE,
+    so concurrent orders never lose a count. Each item then keeps only its ITEM_PAIRS_TOP_K best pairs.
+    """
+    by_restaurant = defaultdict(set)
+    for item_id, restaurant_id in items.items():
+        by_restaurant[restaurant_id].add(item_id)
+    for restaurant_id, item_ids in by_restaurant.items():
+        pairs = list(item_pairs(item_ids))
+        if not pairs:
+            continue
+        ItemPair.objects.bulk_create(
+            [ItemPair(restaurant_id=restaurant_id, item_id=item_id, other_id=other_id) for item_id, other_id in pairs],
+            ignore_conflicts=True,
+        )
+        ItemPair.objects.filter(item_id__in=item_ids, other_id__in=item_ids).update(count=F('count') + 1)
+        for item_id in item_ids:
+            # On ties the newer pair stays, so new pairs can climb into the table
+            top = ItemPair.objects.filter(item_id=item_id).order_by('-count', '-id').values('id')[:settings.ITEM_PAIRS_TOP_K]
+            ItemPair.objects.filter(item_id=item_id).exclude(id__in=Subquery(top)).delete()
+
+
+def suggest(item_ids, limit=5):
+    """
+    Return the items most often ordered with any of `item_ids`, best first, leaving out those items.
+    Only items that can be ordered from the same restaurant as the item they pair with are suggested.
+    """
+    item_ids = list(item_ids)
+    return list(
+        ItemPair.objects
+        .filter(item_id__in=item_ids, other__restaurant_id=F('restaurant_id'), other__is_deleted=False, other__is_available=True)
+        .filter(Q(other__stock__isnull=True) | Q(other__stock__gt=0))
+        .exclude(other_id__in=item_ids)
+        .values('other_id', 'other__name', 'other__price')
+        .annotate(score=Sum('count'))
+        .order_by('-score', 'other_id')[:limit]
+    )
@@ -0,0 +1,52 @@
+from .sharding import SHARDED_MODELS, shard_aliases, shard_for_restaurant
+
+
+class OrderShardRouter:
+    """
+    Database router that keeps order data of each restaurant on its shard alias.
+    Everything else stays on 'default'. Does nothing while ORDER_SHARD_COUNT is 0.
+    Querysets without an instance hint are not routed, use .using(shard_for_restaurant(...)) for them.
+    """
+
+    def _is_sharded(self, model):
+        return model._meta.label_lower in SHARDED_MODELS
+
+    def _shard_for_instance(self, instance):
+        """
+        Find the alias of an order or order line from the instance itself.
+        """
+        label = instance._meta.label_lower
+        if label == 'orders.order':
+            if instance._state.adding and instance.restaurant_id:
+                return shard_for_restaurant(instance.restaurant_id)
+            return instance._state.db
+        if label == 'orders.orderitem':
+            order_descriptor = type(instance).order
+            if order_descriptor.is_cached(instance):
+                return self._shard_for_instance(instance.order)
+            return instance._state.db
+        return None
+
+    def db_for_read(self, model, **hints):
+        if not shard_aliases() or not self._is_sharded(model):
+            return None
+        instance = hints.get('instance')
+        if instance is not None:
+            return self._shard_for_instance(instance)
+        return None
+
+    def db_for_write(self, model, **hints):
+        return self.db_for_read(model, **hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Order data points at users, restaurants and items on 'default' without db constraints.
+        if shard_aliases() and (self._is_sharded(type(obj1)) or self._is_sharded(type(obj2))):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db not in shard_aliases():
+            return None
+        if model_name is None:
+            return False
+        return f'{app_label}.{model_name}' in SHARDED_MODELS
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Cart, CartItem, Order, OrderItem
+from .models import Cart, CartItem, Order, OrderItem, ArchivedOrder
 
 class CartItemSerializer(serializers.ModelSerializer):
     """
@@ -19,6 +19,28 @@ class CartSerializer(serializers.ModelSerializer):
         model = Cart
         fields = ['customer', 'items', 'created_at']
 
+class CartLineSerializer(serializers.ModelSerializer):
+    """
+    A cart item with the item's name and unit price, and the line total computed by Cart.lines().
+    """
+    name = serializers.CharField(source='item.name', read_only=True)
+    unit_price = serializers.DecimalField(source='item.price', max_digits=6, decimal_places=2, read_only=True)
+    restaurant = serializers.IntegerField(source='item.restaurant_id', read_only=True)
+    line_total = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = CartItem
+        fields = ['item', 'name', 'restaurant', 'quantity', 'unit_price', 'line_total']
+
+class CartRestaurantTotalSerializer(serializers.Serializer):
+    """
+    Subtotal of the cart lines from one restaurant.
+    """
+    restaurant = serializers.IntegerField(source='restaurant_id')
+    name = serializers.CharField(source='restaurant_name')
+    quantity = serializers.IntegerField()
+    subtotal = serializers.DecimalField(max_digits=12, decimal_places=2)
+
 class OrderItemSerializer(serializers.ModelSerializer):
     """
     Handles serialization and deserialization of order items, including item, quantity, and price.
@@ -36,4 +58,22 @@ class OrderSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Order
-        fields = ['id', 'customer', 'restaurant', 'total_price', 'status', 'created_at', 'items']
+        fields = ['id', 'customer', 'restaurant', 'total_price', 'discount', 'status', 'created_at', 'items']
+
+class ArchivedOrderSerializer(serializers.ModelSerializer):
+    """
+    Serializes an archived order in the same shape as OrderSerializer.
+    """
+    class Meta:
+        model = ArchivedOrder
+        fields = ['id', 'customer', 'restaurant', 'total_price', 'discount', 'status', 'created_at', 'items']
+
+class KitchenOrderSerializer(serializers.ModelSerializer):
+    """
+    Serializes an order for the kitchen queue, including who claimed it and when it changed state.
+    """
+    items = OrderItemSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Order
+        fields = ['id', 'customer', 'status', 'priority', 'total_price', 'created_at', 'claimed_by', 'claimed_at', 'ready_at', 'completed_at', 'items']
@@ -0,0 +1,114 @@
+"""
+Helpers for placing order data on shard databases.
+Order and OrderItem rows of a restaurant live on one shard alias. The alias is taken from the
+RestaurantShard directory when the restaurant has been moved, otherwise restaurant id modulo shard count.
+Deletes only cascade on the alias they run on, so rows on the shards that point at a deleted user or
+restaurant are removed by `delete_from_shards` once the delete commits.
+"""
+import heapq
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+# Models whose rows are stored on the order shards.
+SHARDED_MODELS = {'orders.order', 'orders.orderitem', 'orders.archivedorder'}
+
+# Each shard hands out primary keys from its own range so ids stay unique across shards
+# and rows can be copied between shards verbatim.
+SHARD_ID_RANGE = 10 ** 12
+
+
+def shard_aliases():
+    """
+    Return the configured shard aliases, empty when sharding is disabled.
+    """
+    return list(getattr(settings, 'ORDER_SHARD_ALIASES', []))
+
+
+def order_aliases():
+    """
+    Return every database alias that can hold order data.
+    """
+    return shard_aliases() or [DEFAULT_DB_ALIAS]
+
+
+def shard_for_restaurant(restaurant_id):
+    """
+    Return the database alias holding the order data of a restaurant.
+    """
+    aliases = shard_aliases()
+    if not aliases:
+        return DEFAULT_DB_ALIAS
+    from .models import RestaurantShard
+    alias = RestaurantShard.objects.using(DEFAULT_DB_ALIAS).filter(restaurant_id=restaurant_id).values_list('alias', flat=True).first()
+    if alias in aliases:
+        return alias
+    return aliases[int(restaurant_id) % len(aliases)]
+
+
+def is_moving(restaurant_id):
+    """
+    Return True while the restaurant's order data is being moved to another shard and must not be written.
+    """
+    if not shard_aliases():
+        return False
+    from .models import RestaurantShard
+    return RestaurantShard.objects.using(DEFAULT_DB_ALIAS).filter(restaurant_id=restaurant_id, moving=True).exists()
+
+
+def fan_out(queryset, key, reverse=False, limit=None):
+    """
+    Run the queryset on every order alias and merge the results by key.
+    Each shard queryset must already be ordered by the same key.
+    """
+    results = []
+    for alias in order_aliases():
+        shard_queryset = queryset.using(alias)
+        if limit is not None:
+            shard_queryset = shard_queryset[:limit]
+        results.append(list(shard_queryset))
+    merged = heapq.merge(*results, key=key, reverse=reverse)
+    if limit is not None:
+        return [row for row, _ in zip(merged, range(limit))]
+    return list(merged)
+
+
+def get_order(order_id, **filters):
+    """
+    Find an order by id on whichever alias holds it. Raises Order.DoesNotExist when missing.
+    """
+    from .models import Order
+    for alias in order_aliases():
+        order = Order.objects.using(alias).filter(id=order_id, **filters).first()
+        if order is not None:
+            return order
+    raise Order.DoesNotExist
+
+
+def reserve_id_range(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    post_migrate handler that starts the sqlite id sequences of each shard in its own range.
+    """
+    aliases = shard_aliases()
+    if using not in aliases or connections[using].vendor != 'sqlite':
+        return
+    start = (aliases.index(using) + 1) * SHARD_ID_RANGE
+    with connections[using].cursor() as cursor:
+        for table in ('orders_order', 'orders_orderitem'):
+            cursor.execute("UPDATE sqlite_sequence SET seq = %s WHERE name = %s AND seq < %s", [start, table, start])
+            cursor.execute(
+                "INSERT INTO sqlite_sequence (name, seq) SELECT %s, %s "
+                "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = %s)",
+                [table, start, table],
+            )
+
+
+def delete_from_shards(sender, instance, using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    post_delete handler for users and restaurants that removes or detaches their order data on every shard.
+    """
+    aliases = shard_aliases()
+    if not aliases or using != DEFAULT_DB_ALIAS:
+        return
+    from restaurant.purge import purge_shard_dependents
+    pk = instance.pk
+    transaction.on_commit(lambda: purge_shard_dependents(sender, [pk], aliases), using=using)
@@ -1,3 +1,267 @@
-from django.test import TestCase
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from account.models import Restaurant, User
+from restaurant.models import Category, Item
+from .models import Cart, CartItem, IdempotencyRecord, Order, OrderItem, RestaurantShard
+from .sharding import SHARD_ID_RANGE, shard_for_restaurant
 
-# Create your tests here.
+CONFIRM_URL = '/api/v1/order/cart/confirm/'
+
+
+class OrderTestCase(TestCase):
+    """
+    A customer and two restaurants with one stocked item each.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner@example.com', 'Owner', 'Test', '0100', 'pass', role='owner')
+        cls.customer = User.objects.create_user('customer@example.com', 'Customer', 'Test', '0101', 'pass', role='customer')
+        cls.restaurant = Restaurant.objects.create(name='First', location='Cairo', owner=cls.owner)
+        cls.other_restaurant = Restaurant.objects.create(name='Second', location='Giza', owner=cls.owner)
+        cls.item = cls.create_item(cls.restaurant, 'Koshary')
+        cls.other_item = cls.create_item(cls.other_restaurant, 'Falafel')
+
+    @staticmethod
+    def create_item(restaurant, name, price='10.00', stock=5):
+        category = Category.objects.create(name=name, slug=name.lower(), restaurant=restaurant)
+        return Item.objects.create(category=category, restaurant=restaurant, name=name, details=name, price=price, stock=stock)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
+        self.cart = Cart.objects.create(customer=self.customer)
+
+    def add(self, item, quantity=1):
+        CartItem.objects.create(cart=self.cart, item=item, quantity=quantity)
+
+
+class ConfirmCartTests(OrderTestCase):
+
+    def test_order_is_placed_and_stock_taken(self):
+        self.add(self.item, 2)
+        response = self.client.post(CONFIRM_URL)
+        self.assertEqual(response.status_code, 201)
+        order = Order.objects.get()
+        self.assertEqual(order.restaurant_id, self.restaurant.id)
+        self.assertEqual(str(order.total_price), '20.00')
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.stock, 3)
+        self.assertFalse(self.cart.items.exists())
+
+    def test_cart_with_several_restaurants_is_rejected(self):
+        self.add(self.item)
+        self.add(self.other_item)
+        response = self.client.post(CONFIRM_URL)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['restaurants'], sorted([self.restaurant.id, self.other_restaurant.id]))
+        self.assertFalse(Order.objects.exists())
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.stock, 5)
+        self.assertEqual(self.cart.items.count(), 2)
+
+
+class OrderPriorityTests(OrderTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.owner)
+        self.first = Order.objects.create(customer=self.customer, restaurant=self.restaurant, total_price='10.00')
+        self.second = Order.objects.create(customer=self.customer, restaurant=self.restaurant, total_price='10.00')
+
+    def url(self, order):
+        return f'/api/v1/order/queue/{self.restaurant.id}/{order.id}/priority/'
+
+    def test_higher_priority_is_claimed_first(self):
+        response = self.client.post(self.url(self.second), {'priority': 5}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['data']['priority'], 5)
+
+        response = self.client.post(f'/api/v1/order/queue/{self.restaurant.id}/claim/')
+        self.assertEqual(response.data['data']['id'], self.second.id)
+
+    def test_only_pending_orders_can_be_changed(self):
+        Order.objects.filter(id=self.first.id).update(status='Preparing')
+        response = self.client.post(self.url(self.first), {'priority': 5}, format='json')
+        self.assertEqual(response.status_code, 409)
+
+    def test_priority_must_be_a_bounded_number(self):
+        self.assertEqual(self.client.post(self.url(self.first), {'priority': 'high'}, format='json').status_code, 400)
+        self.assertEqual(self.client.post(self.url(self.first), {'priority': 10 ** 6}, format='json').status_code, 400)
+
+    def test_customers_cannot_change_priority(self):
+        self.client.force_authenticate(self.customer)
+        response = self.client.post(self.url(self.first), {'priority': 5}, format='json')
+        self.assertEqual(response.status_code, 403)
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.priority, 0)
+
+
+@override_settings(IDEMPOTENCY_LOCK_TIMEOUT=0)
+class IdempotentCheckoutTests(OrderTestCase):
+
+    def confirm(self, key):
+        return self.client.post(CONFIRM_URL, HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_the_first_response(self):
+        self.add(self.item, 2)
+        first = self.confirm('order-1')
+        self.assertEqual(first.status_code, 201)
+
+        # The cart is empty now, a second run would answer 400
+        retry = self.confirm('order-1')
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(Order.objects.count(), 1)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.stock, 3)
+
+    def test_keys_are_per_user(self):
+        self.add(self.item)
+        self.assertEqual(self.confirm('order-1').status_code, 201)
+        self.client.force_authenticate(self.owner)
+        Cart.objects.create(customer=self.owner).items.create(item=self.item)
+        response = self.confirm('order-1')
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_request_still_running_is_not_run_twice(self):
+        self.add(self.item)
+        IdempotencyRecord.objects.create(user=self.customer, key='order-1', endpoint='cart-confirm', expires_at=timezone.now() + timedelta(minutes=1))
+        response = self.confirm('order-1')
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Order.objects.exists())
+
+    def test_placeholder_of_a_dead_request_is_taken_over_after_its_lease(self):
+        self.add(self.item)
+        IdempotencyRecord.objects.create(user=self.customer, key='order-1', endpoint='cart-confirm', expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.confirm('order-1').status_code, 201)
+        record = IdempotencyRecord.objects.get()
+        self.assertEqual(record.status_code, 201)
+        self.assertGreater(record.expires_at, timezone.now() + timedelta(hours=1))
+
+    def test_failed_request_can_be_retried(self):
+        self.add(self.item)
+        with mock.patch.object(OrderItem, 'save', side_effect=RuntimeError('disk full')):
+            with self.assertRaises(RuntimeError):
+                self.confirm('order-1')
+        self.assertFalse(IdempotencyRecord.objects.exists())
+        response = self.confirm('order-1')
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('Idempotent-Replayed', response)
+
+
+SHARDS = ['orders_shard_test_0', 'orders_shard_test_1']
+
+
+@override_settings(ORDER_SHARD_ALIASES=SHARDS)
+class ShardRoutingTests(OrderTestCase):
+    """
+    Runs with two order shards on SQLite files of their own; the two restaurants land on different shards.
+    The shards are added at class setup, after the test runner has checked and created its databases.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        for alias in SHARDS:
+            connections.settings[alias] = {**connections.settings[DEFAULT_DB_ALIAS], 'NAME': os.path.join(cls.directory.name, f'{alias}.sqlite3')}
+        with override_settings(ORDER_SHARD_ALIASES=SHARDS):
+            for alias in SHARDS:
+                call_command('migrate', database=alias, verbosity=0)
+        cls.databases = {DEFAULT_DB_ALIAS, *SHARDS}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        for alias in SHARDS:
+            connections[alias].close()
+            del connections[alias]
+            del connections.settings[alias]
+        cls.directory.cleanup()
+
+    def place(self, restaurant, customer=None, **fields):
+        # Saving an instance lets the router pick the shard; Order.objects.create() would write to 'default'
+        order = Order(customer=customer or self.customer, restaurant=restaurant, total_price='10.00', **fields)
+        order.save()
+        return order
+
+    def test_restaurants_are_spread_by_id_unless_pinned(self):
+        self.assertEqual(shard_for_restaurant(self.restaurant.id), SHARDS[self.restaurant.id % 2])
+        self.assertEqual(shard_for_restaurant(self.other_restaurant.id), SHARDS[self.other_restaurant.id % 2])
+        RestaurantShard.objects.create(restaurant=self.restaurant, alias=SHARDS[(self.restaurant.id + 1) % 2])
+        self.assertEqual(shard_for_restaurant(self.restaurant.id), SHARDS[(self.restaurant.id + 1) % 2])
+
+    def test_checkout_writes_the_order_to_its_shard(self):
+        self.add(self.item, 2)
+        response = self.client.post(CONFIRM_URL)
+        self.assertEqual(response.status_code, 201)
+        alias = shard_for_restaurant(self.restaurant.id)
+        order = Order.objects.using(alias).get()
+        self.assertEqual(order.id // SHARD_ID_RANGE, SHARDS.index(alias) + 1)
+        self.assertEqual(OrderItem.objects.using(alias).get().order_id, order.id)
+        self.assertFalse(Order.objects.using(DEFAULT_DB_ALIAS).exists())
+        # Stock stays on 'default'
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.stock, 3)
+
+    def test_instances_are_routed_to_their_shard(self):
+        order = self.place(self.other_restaurant)
+        alias = shard_for_restaurant(self.other_restaurant.id)
+        self.assertEqual(order._state.db, alias)
+        order.status = 'Preparing'
+        order.save()
+        line = order.items.create(item=self.other_item, quantity=1, price='10.00')
+        self.assertEqual(line._state.db, alias)
+        self.assertEqual(Order.objects.using(alias).get().status, 'Preparing')
+
+    def test_history_merges_every_shard(self):
+        first = self.place(self.restaurant)
+        second = self.place(self.other_restaurant)
+        self.assertNotEqual(first._state.db, second._state.db)
+        response = self.client.get('/api/v1/order/history/')
+        self.assertEqual([order['id'] for order in response.data], [second.id, first.id])
+
+    def test_moving_a_restaurant_blocks_writes_until_its_orders_are_moved(self):
+        source = shard_for_restaurant(self.restaurant.id)
+        target = SHARDS[(SHARDS.index(source) + 1) % 2]
+        order = self.place(self.restaurant)
+        order.items.create(item=self.item, quantity=1, price='10.00')
+        self.add(self.item)
+
+        def drain(seconds):
+            # Writes are refused while the move is under way
+            self.assertEqual(self.client.post(CONFIRM_URL).status_code, 503)
+            Order.objects.using(source).filter(id=order.id).update(status='Preparing')
+
+        with mock.patch('orders.management.commands.move_restaurant_shard.time.sleep', drain):
+            call_command('move_restaurant_shard', self.restaurant.id, target, stdout=StringIO())
+
+        self.assertEqual(shard_for_restaurant(self.restaurant.id), target)
+        self.assertFalse(Order.objects.using(source).exists())
+        self.assertFalse(OrderItem.objects.using(source).exists())
+        self.assertEqual(Order.objects.using(target).get().status, 'Preparing')
+        self.assertEqual(OrderItem.objects.using(target).get().order_id, order.id)
+        self.assertEqual(self.client.post(CONFIRM_URL).status_code, 201)
+
+    def test_deleting_a_user_removes_their_orders_from_every_shard(self):
+        for restaurant in (self.restaurant, self.other_restaurant):
+            self.place(restaurant)
+        self.place(self.restaurant, customer=self.owner, claimed_by=self.customer)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.customer.delete()
+        for alias in SHARDS:
+            self.assertFalse(Order.objects.using(alias).filter(customer_id=self.customer.id).exists())
+        claimed = Order.objects.using(shard_for_restaurant(self.restaurant.id)).get(customer_id=self.owner.id)
+        self.assertIsNone(claimed.claimed_by_id)
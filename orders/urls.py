@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import AddToCartView,ViewCartView,RemoveFromCartView,UpdateCartItemView,ConfirmCartView
+from .views import AddToCartView,ViewCartView,RemoveFromCartView,UpdateCartItemView,ConfirmCartView,CartSuggestionsView,OrderHistoryView,KitchenQueueView,ClaimOrderView,OrderStatusView,OrderPriorityView,KitchenMetricsView
 
 urlpatterns = [
     path('cart/add/',AddToCartView.as_view()),
@@ -7,4 +7,11 @@ urlpatterns = [
     path('cart/update/', UpdateCartItemView.as_view()),
     path('cart/', ViewCartView.as_view()),
     path('cart/confirm/', ConfirmCartView.as_view()),  #for order
+    path('cart/suggestions/', CartSuggestionsView.as_view()),
+    path('history/', OrderHistoryView.as_view()),
+    path('queue/<int:restaurant_id>/', KitchenQueueView.as_view()),
+    path('queue/<int:restaurant_id>/claim/', ClaimOrderView.as_view()),
+    path('queue/<int:restaurant_id>/metrics/', KitchenMetricsView.as_view()),
+    path('queue/<int:restaurant_id>/<int:order_id>/priority/', OrderPriorityView.as_view()),
+    path('queue/<int:restaurant_id>/<int:order_id>/<str:action>/', OrderStatusView.as_view()),
 ]
@@ -1,10 +1,21 @@
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Min, Q
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+from datetime import timedelta
+from decimal import Decimal
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
-from .models import Cart, CartItem,Order,OrderItem
-from .serializers import CartSerializer, CartItemSerializer,OrderSerializer,OrderItemSerializer
-from restaurant.models import Item
+from .models import Cart, CartItem,Order,OrderItem,ArchivedOrder
+from .serializers import CartSerializer, CartItemSerializer,CartLineSerializer,CartRestaurantTotalSerializer,OrderSerializer,OrderItemSerializer,ArchivedOrderSerializer,KitchenOrderSerializer
+from .sharding import fan_out,is_moving,shard_for_restaurant
+from .idempotency import idempotent
+from .recommendations import record_order,suggest
+from account.models import Restaurant
+from promotions.engine import CouponUnavailable,evaluator_for,find_coupon,redeem,release
+from restaurant.models import Item,EmployeePermission
+from restaurant.utils import OutOfStock,release_stock,reserve_stock
 
 # View for Add to Cart 
 class AddToCartView(APIView):
@@ -21,6 +32,8 @@ class AddToCartView(APIView):
             item = Item.objects.get(id=item_id)
         except Item.DoesNotExist:
             return Response({"error": "Item not found."}, status=status.HTTP_404_NOT_FOUND)
+        if not item.is_available or item.stock == 0:
+            return Response({"error": "Item is sold out."}, status=status.HTTP_409_CONFLICT)
 
         # Get or create the cart for the current customer
         cart, created = Cart.objects.get_or_create(customer=request.user)
@@ -30,13 +43,15 @@ class AddToCartView(APIView):
         if not created:
             cart_item.quantity += quantity
             cart_item.save()
+        cart.touch()
 
         return Response({"message": "Item added to cart."}, status=status.HTTP_201_CREATED)
     
 # View for showing the cart.
 class ViewCartView(APIView):
     """
-    API to view the cart and its items.
+    API to view the cart with item names, unit prices, line totals, per-restaurant subtotals and the total.
+    Totals are computed by the database.
     """
     permission_classes = [IsAuthenticated]
 
@@ -45,9 +60,16 @@ class ViewCartView(APIView):
             cart = Cart.objects.get(customer=request.user)
         except Cart.DoesNotExist:
             return Response({"error": "Cart not found."}, status=status.HTTP_404_NOT_FOUND)
-        
-        serializer = CartSerializer(cart)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+
+        restaurants = list(cart.totals_by_restaurant())
+        data = {
+            "customer": cart.customer_id,
+            "created_at": cart.created_at,
+            "items": CartLineSerializer(cart.lines(), many=True).data,
+            "restaurants": CartRestaurantTotalSerializer(restaurants, many=True).data,
+            "total": str(sum((row['subtotal'] for row in restaurants), Decimal('0.00'))),
+        }
+        return Response(data, status=status.HTTP_200_OK)
 
 # View for remove items from cart.
 class RemoveFromCartView(APIView):
@@ -67,6 +89,7 @@ class RemoveFromCartView(APIView):
         try:
             cart_item = CartItem.objects.get(cart=cart, item_id=item_id)
             cart_item.delete()
+            cart.touch()
             return Response({"message": "Item removed from cart."}, status=status.HTTP_200_OK)
         except CartItem.DoesNotExist:
             return Response({"error": "Item not found in cart."}, status=status.HTTP_404_NOT_FOUND)
@@ -102,39 +125,352 @@ class UpdateCartItemView(APIView):
         # ensure the quantity not negative or zero)
         if quantity <= 0:
             cart_item.delete()  # If quantity is 0 or less, remove the item from the cart
+            cart.touch()
             return Response({"message": "Item removed from cart due to zero or negative quantity."}, status=status.HTTP_200_OK)
         
         cart_item.quantity = quantity
         cart_item.save()
+        cart.touch()
 
         return Response({"message": "Cart item quantity updated.", "item": {"id": cart_item.item.id, "quantity": cart_item.quantity}}, status=status.HTTP_200_OK)
     
+# View for add-on suggestions for the cart.
+class CartSuggestionsView(APIView):
+    """
+    API to suggest items frequently ordered together with what is in the cart.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit', 5)), 20)
+        except ValueError:
+            return Response({"error": "limit must be a number."}, status=status.HTTP_400_BAD_REQUEST)
+        if limit <= 0:
+            return Response({"error": "limit must be positive."}, status=status.HTTP_400_BAD_REQUEST)
+
+        item_ids = CartItem.objects.filter(cart__customer=request.user).values_list('item_id', flat=True)
+        suggestions = [
+            {"item": row['other_id'], "name": row['other__name'], "price": str(row['other__price']), "score": row['score']}
+            for row in suggest(item_ids, limit)
+        ]
+        return Response(suggestions, status=status.HTTP_200_OK)
+
 # View for checkout the cart and creating an order.
 class ConfirmCartView(APIView):
     """
-    API to confirm the cart and create an order.
+    API to confirm the cart and create an order. Every item must come from the same restaurant.
+    Send an Idempotency-Key header to make retries safe: a retry replays the first response.
+    Active promotions of the restaurant are applied to its items; send "coupon" to use a coupon code.
     """
     permission_classes = [IsAuthenticated]
 
+    @idempotent('cart-confirm')
     def post(self, request):
         try:
             cart = Cart.objects.get(customer=request.user)
         except Cart.DoesNotExist:
             return Response({"error": "Cart not found."}, status=status.HTTP_404_NOT_FOUND)
         
-        items = cart.items.all()
-        if not items.exists():
+        items = list(cart.items.select_related('item__restaurant'))
+        if not items:
             return Response({"error": "Cart is empty."}, status=status.HTTP_400_BAD_REQUEST)
+        # Cart lines keep pointing at items whose category or restaurant was deleted since
+        removed = sorted({item.item_id for item in items if item.item.is_deleted or item.item.restaurant.is_deleted})
+        if removed:
+            return Response({"error": "Some items are no longer on the menu.", "items": removed}, status=status.HTTP_409_CONFLICT)
 
-        total_price = sum(item.quantity * item.item.price for item in items)
-        order = Order.objects.create(customer=request.user, restaurant=items.first().item.category.restaurant, total_price=total_price)
+        # An order, its shard, promotions and coupon all belong to one restaurant
+        restaurants = {item.item.restaurant_id for item in items}
+        if len(restaurants) > 1:
+            return Response({"error": "All cart items must come from the same restaurant.", "restaurants": sorted(restaurants)}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Add items to the order
+        total_price = sum(item.quantity * item.item.price for item in items)
+        restaurant = items[0].item.restaurant
+        error = shard_move_response(restaurant.id)
+        if error:
+            return error
+        # Order data lives on the restaurant's shard
+        using = shard_for_restaurant(restaurant.id)
+        quantities = {}
         for item in items:
-            OrderItem.objects.create(order=order, item=item.item, quantity=item.quantity, price=item.item.price)
-        
-        # Clear the cart after order placement
-        cart.items.all().delete()
+            quantities[item.item_id] = quantities.get(item.item_id, 0) + item.quantity
+
+        coupon = None
+        if request.data.get('coupon'):
+            coupon = find_coupon(str(request.data['coupon']), restaurant.id)
+            if coupon is None:
+                return Response({"error": "Coupon not found."}, status=status.HTTP_404_NOT_FOUND)
+        lines = [(item.item_id, item.item.category_id, item.quantity, item.item.price) for item in items]
+        discount, applied = evaluator_for(restaurant.id).evaluate(lines, coupon.promotion_id if coupon else None)
+        if coupon and coupon.promotion_id not in {promotion['promotion'] for promotion in applied}:
+            return Response({"error": "Coupon does not apply to this cart."}, status=status.HTTP_400_BAD_REQUEST)
+
+        menu_items = list({item.item_id: item.item for item in items}.values())
+
+        def place_order():
+            order = Order.objects.using(using).create(customer=request.user, restaurant=restaurant, total_price=total_price - discount, discount=discount)
+            # Add items to the order
+            for item in items:
+                OrderItem.objects.using(using).create(order=order, item=item.item, quantity=item.quantity, price=item.item.price)
+            return order
+
+        try:
+            # Stock and the coupon are taken in one transaction on 'default', with the order too when it is stored there
+            with transaction.atomic():
+                reserve_stock(menu_items, quantities)
+                if coupon:
+                    redeem(coupon)
+                if using == DEFAULT_DB_ALIAS:
+                    order = place_order()
+                    cart.items.all().delete()
+        except OutOfStock as error:
+            return Response({"error": "Some items are sold out or short of stock.", "items": error.items}, status=status.HTTP_409_CONFLICT)
+        except CouponUnavailable as error:
+            return Response({"error": str(error)}, status=status.HTTP_409_CONFLICT)
+
+        if using != DEFAULT_DB_ALIAS:
+            # A shard cannot join the transaction on 'default', which has committed by now. When the order
+            # fails the stock and coupon are given back; a crash right here leaves them taken without an order.
+            try:
+                with transaction.atomic(using=using):
+                    order = place_order()
+            except Exception:
+                with transaction.atomic():
+                    release_stock(menu_items, quantities)
+                    if coupon:
+                        release(coupon)
+                raise
+            cart.items.all().delete()
+
+        record_order({item.item_id: item.item.restaurant_id for item in items})
+        cart.touch()
         
         serializer = OrderSerializer(order)
-        return Response({"message": "Order placed successfully.", "data": serializer.data}, status=status.HTTP_201_CREATED)
+        promotions = [{**promotion, "discount": str(promotion["discount"])} for promotion in applied]
+        return Response({"message": "Order placed successfully.", "data": serializer.data, "promotions": promotions}, status=status.HTTP_201_CREATED)
+
+# View for the customer's order history.
+class OrderHistoryView(APIView):
+    """
+    API to list the orders of the authenticated customer, newest first.
+    Orders are read from every shard and merged. When the recent orders do not fill
+    the page, older orders are read from the archive.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit', 50)), 200)
+        except ValueError:
+            return Response({"error": "limit must be a number."}, status=status.HTTP_400_BAD_REQUEST)
+        if limit <= 0:
+            return Response({"error": "limit must be positive."}, status=status.HTTP_400_BAD_REQUEST)
+
+        orders = Order.objects.filter(customer=request.user).prefetch_related('items').order_by('-created_at', '-id')
+        orders = fan_out(orders, key=lambda order: (order.created_at, order.id), reverse=True, limit=limit)
+        data = OrderSerializer(orders, many=True).data
+
+        # Fall back to the archive for anything older than the hot tables hold
+        if len(orders) < limit:
+            archived = ArchivedOrder.objects.filter(customer=request.user).order_by('-created_at', '-id')
+            if orders:
+                archived = archived.filter(created_at__lte=orders[-1].created_at).exclude(id__in=[order.id for order in orders])
+            archived = fan_out(archived, key=lambda order: (order.created_at, order.id), reverse=True, limit=limit - len(orders))
+            data += ArchivedOrderSerializer(archived, many=True).data
+        return Response(data, status=status.HTTP_200_OK)
+
+
+def has_kitchen_permission(user, restaurant):
+    """
+    Owners can always work the kitchen queue. Employees need the can_manage_orders permission.
+    """
+    if user == restaurant.owner:
+        return True
+    return EmployeePermission.objects.filter(employee=user, restaurant=restaurant, can_manage_orders=True).exists()
+
+
+def get_kitchen_restaurant(request, restaurant_id):
+    """
+    Return (restaurant, error response) for a kitchen queue request.
+    """
+    try:
+        restaurant = Restaurant.objects.get(id=restaurant_id)
+    except Restaurant.DoesNotExist:
+        return None, Response({"error": "Restaurant not found."}, status=status.HTTP_404_NOT_FOUND)
+    if not has_kitchen_permission(request.user, restaurant):
+        return None, Response({"error": "You do not have permission to manage orders of this restaurant."}, status=status.HTTP_403_FORBIDDEN)
+    return restaurant, None
+
+
+def shard_move_response(restaurant_id):
+    """
+    Return an error response while the restaurant's orders are being moved to another shard, otherwise None.
+    """
+    if is_moving(restaurant_id):
+        return Response({"error": "Orders of this restaurant are being moved, please retry shortly."}, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={"Retry-After": "5"})
+    return None
+
+
+# View for the kitchen order queue.
+class KitchenQueueView(APIView):
+    """
+    API to list the open orders of a restaurant in the order they will be served.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, restaurant_id):
+        restaurant, error = get_kitchen_restaurant(request, restaurant_id)
+        if error:
+            return error
+        orders = (
+            Order.objects.using(shard_for_restaurant(restaurant.id))
+            .filter(restaurant=restaurant, status__in=['Pending', 'Preparing', 'Ready'])
+            .prefetch_related('items')
+            .order_by('-priority', 'created_at')
+        )
+        serializer = KitchenOrderSerializer(orders, many=True)
+        depth = sum(1 for order in orders if order.status == 'Pending')
+        return Response({"depth": depth, "orders": serializer.data}, status=status.HTTP_200_OK)
+
+
+# View for claiming the next order in the kitchen queue.
+class ClaimOrderView(APIView):
+    """
+    API to claim the next pending order of a restaurant.
+    The claim is a conditional UPDATE on the pending status, so two staff never take the same order.
+    """
+    permission_classes = [IsAuthenticated]
+    max_attempts = 5
+
+    def post(self, request, restaurant_id):
+        restaurant, error = get_kitchen_restaurant(request, restaurant_id)
+        if error:
+            return error
+        error = shard_move_response(restaurant.id)
+        if error:
+            return error
+        orders = Order.objects.using(shard_for_restaurant(restaurant.id))
+        pending = orders.filter(restaurant=restaurant, status='Pending').order_by('-priority', 'created_at')
+
+        for _ in range(self.max_attempts):
+            order_id = pending.values_list('id', flat=True).first()
+            if order_id is None:
+                return Response({"message": "No pending orders."}, status=status.HTTP_200_OK)
+            claimed = orders.filter(id=order_id, status='Pending').update(status='Preparing', claimed_by=request.user, claimed_at=timezone.now())
+            if claimed:
+                order = orders.prefetch_related('items').get(id=order_id)
+                return Response({"message": "Order claimed.", "data": KitchenOrderSerializer(order).data}, status=status.HTTP_200_OK)
+            # Someone else claimed it first, try the next one
+
+        return Response({"error": "Could not claim an order, please retry."}, status=status.HTTP_409_CONFLICT)
+
+
+# View for moving a claimed order forward.
+class OrderStatusView(APIView):
+    """
+    API to mark an order ready or completed.
+    The change only applies if the order is still in the expected state.
+    """
+    permission_classes = [IsAuthenticated]
+    transitions = {
+        'ready': ('Preparing', 'Ready', 'ready_at'),
+        'complete': ('Ready', 'Completed', 'completed_at'),
+    }
+
+    def post(self, request, restaurant_id, order_id, action):
+        restaurant, error = get_kitchen_restaurant(request, restaurant_id)
+        if error:
+            return error
+        if action not in self.transitions:
+            return Response({"error": "Unknown action."}, status=status.HTTP_404_NOT_FOUND)
+        error = shard_move_response(restaurant.id)
+        if error:
+            return error
+
+        from_status, to_status, timestamp_field = self.transitions[action]
+        orders = Order.objects.using(shard_for_restaurant(restaurant.id)).filter(id=order_id, restaurant=restaurant)
+        updated = orders.filter(status=from_status).update(status=to_status, **{timestamp_field: timezone.now()})
+        if not updated:
+            if not orders.exists():
+                return Response({"error": "Order not found."}, status=status.HTTP_404_NOT_FOUND)
+            return Response({"error": f"Order is not {from_status.lower()}."}, status=status.HTTP_409_CONFLICT)
+
+        order = orders.prefetch_related('items').get()
+        return Response({"message": f"Order marked {to_status.lower()}.", "data": KitchenOrderSerializer(order).data}, status=status.HTTP_200_OK)
+
+
+# View for reordering the kitchen queue.
+class OrderPriorityView(APIView):
+    """
+    API to set the priority of a pending order. Higher priorities are claimed first.
+    Only pending orders can be changed, as claimed orders have already left the queue.
+    """
+    permission_classes = [IsAuthenticated]
+    max_priority = 1000
+
+    def post(self, request, restaurant_id, order_id):
+        restaurant, error = get_kitchen_restaurant(request, restaurant_id)
+        if error:
+            return error
+        try:
+            priority = int(request.data.get('priority'))
+        except (TypeError, ValueError):
+            return Response({"error": "priority must be a number."}, status=status.HTTP_400_BAD_REQUEST)
+        if abs(priority) > self.max_priority:
+            return Response({"error": f"priority must be between -{self.max_priority} and {self.max_priority}."}, status=status.HTTP_400_BAD_REQUEST)
+        error = shard_move_response(restaurant.id)
+        if error:
+            return error
+
+        orders = Order.objects.using(shard_for_restaurant(restaurant.id)).filter(id=order_id, restaurant=restaurant)
+        updated = orders.filter(status='Pending').update(priority=priority)
+        if not updated:
+            if not orders.exists():
+                return Response({"error": "Order not found."}, status=status.HTTP_404_NOT_FOUND)
+            return Response({"error": "Order is not pending."}, status=status.HTTP_409_CONFLICT)
+
+        order = orders.prefetch_related('items').get()
+        return Response({"message": "Order priority updated.", "data": KitchenOrderSerializer(order).data}, status=status.HTTP_200_OK)
+
+
+# View for kitchen queue metrics.
+class KitchenMetricsView(APIView):
+    """
+    API to report queue depth per status and the average time orders spend in each state.
+    Latencies cover orders created in the last `hours` hours (default 24) and are in seconds.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, restaurant_id):
+        restaurant, error = get_kitchen_restaurant(request, restaurant_id)
+        if error:
+            return error
+        try:
+            hours = int(request.query_params.get('hours', 24))
+        except ValueError:
+            return Response({"error": "hours must be a number."}, status=status.HTTP_400_BAD_REQUEST)
+
+        orders = Order.objects.using(shard_for_restaurant(restaurant.id)).filter(restaurant=restaurant)
+        depth = {
+            row['status']: row['count']
+            for row in orders.filter(status__in=['Pending', 'Preparing', 'Ready']).values('status').annotate(count=Count('id')).order_by()
+        }
+
+        def duration(end, start):
+            return Avg(ExpressionWrapper(F(end) - F(start), output_field=DurationField()))
+
+        since = timezone.now() - timedelta(hours=hours)
+        latency = orders.filter(created_at__gte=since).aggregate(
+            waiting=duration('claimed_at', 'created_at'),
+            preparing=duration('ready_at', 'claimed_at'),
+            ready=duration('completed_at', 'ready_at'),
+            oldest_pending=Min('created_at', filter=Q(status='Pending')),
+        )
+        oldest_pending = latency.pop('oldest_pending')
+        return Response({
+            "restaurant": restaurant.id,
+            "depth": {state: depth.get(state, 0) for state in ['Pending', 'Preparing', 'Ready']},
+            "oldest_pending_seconds": (timezone.now() - oldest_pending).total_seconds() if oldest_pending else None,
+            "average_seconds": {state: value.total_seconds() if value is not None else None for state, value in latency.items()},
+        }, status=status.HTTP_200_OK)
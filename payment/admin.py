@@ -1,3 +1,16 @@
 from django.contrib import admin
+from performance.paginator import EstimatedCountPaginator
+from .models import PaymentIntent,WebhookEvent
 
 # Register your models here.
+@admin.register(PaymentIntent)
+class PaymentIntentAdmin(admin.ModelAdmin):
+    list_display = ['id', 'order_id', 'customer', 'restaurant', 'amount', 'currency', 'status', 'gateway', 'created_at']
+    list_select_related = ['customer', 'restaurant']
+    list_filter = ['status']
+    raw_id_fields = ['order', 'customer', 'restaurant']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+admin.site.register(WebhookEvent)
@@ -0,0 +1,16 @@
+PAYMENT_STATUSES = [
+        ('processing', 'Processing'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+        ('canceled', 'Canceled'),
+    ]
+
+# Statuses a payment intent never leaves.
+FINAL_PAYMENT_STATUSES = ['succeeded', 'failed', 'canceled']
+
+WEBHOOK_STATUSES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('processed', 'Processed'),
+        ('failed', 'Failed'),
+    ]
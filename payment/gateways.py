@@ -0,0 +1,93 @@
+"""
+Payment gateway abstraction.
+A gateway starts payments, turns webhook requests into events and reports the status of many payments at once.
+Gateways are configured by name in settings.PAYMENT_GATEWAYS.
+"""
+import hmac
+import json
+import uuid
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class InvalidWebhook(Exception):
+    """
+    Raised when a webhook request cannot be verified or parsed.
+    """
+
+
+class PaymentGateway:
+    """
+    Base class for payment gateways.
+    """
+    name = None
+
+    def create_payment(self, intent):
+        """
+        Start collecting the payment of an intent and return the gateway reference.
+        """
+        raise NotImplementedError
+
+    def parse_webhook(self, request):
+        """
+        Verify a webhook request and return (event_id, event_type, payload).
+        Raise InvalidWebhook when the request is not genuine.
+        """
+        raise NotImplementedError
+
+    def event_status(self, payload):
+        """
+        Return (gateway_reference, payment status) described by a webhook payload,
+        or (None, None) when the event does not change a payment.
+        """
+        raise NotImplementedError
+
+    def fetch_statuses(self, references):
+        """
+        Return {gateway_reference: payment status} for many payments in one call.
+        """
+        raise NotImplementedError
+
+
+class StubGateway(PaymentGateway):
+    """
+    Local gateway for development and tests. Payments never leave the process.
+    Webhooks are plain JSON: {"id": ..., "type": "payment.succeeded", "reference": ...}, sent with an
+    `X-Stub-Secret: <PAYMENT_STUB_WEBHOOK_SECRET>` header. Without the setting every webhook is rejected.
+    Reconciliation reports every payment with PAYMENT_STUB_SETTLED_STATUS.
+    """
+    name = 'stub'
+    event_types = {
+        'payment.succeeded': 'succeeded',
+        'payment.failed': 'failed',
+        'payment.canceled': 'canceled',
+    }
+
+    def create_payment(self, intent):
+        return f'stub_{uuid.uuid4().hex}'
+
+    def parse_webhook(self, request):
+        secret = settings.PAYMENT_STUB_WEBHOOK_SECRET
+        if not secret or not hmac.compare_digest(request.headers.get('X-Stub-Secret', ''), secret):
+            raise InvalidWebhook("Webhook secret is missing or wrong.")
+        try:
+            payload = json.loads(request.body)
+            return str(payload['id']), payload['type'], payload
+        except (ValueError, KeyError, TypeError):
+            raise InvalidWebhook("Webhook body must be JSON with id and type.")
+
+    def event_status(self, payload):
+        return payload.get('reference'), self.event_types.get(payload.get('type'))
+
+    def fetch_statuses(self, references):
+        settled = getattr(settings, 'PAYMENT_STUB_SETTLED_STATUS', 'processing')
+        return {reference: settled for reference in references}
+
+
+def get_gateway(name=None):
+    """
+    Return an instance of the named gateway, the default gateway when no name is given.
+    Raises KeyError for unknown gateways.
+    """
+    name = name or settings.PAYMENT_DEFAULT_GATEWAY
+    return import_string(settings.PAYMENT_GATEWAYS[name])()
@@ -0,0 +1,110 @@
+import time
+import uuid
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from payment.gateways import get_gateway
+from payment.models import WebhookEvent
+from payment.utils import apply_statuses
+
+
+class Command(BaseCommand):
+    """
+    Worker that applies queued gateway webhooks to payment intents.
+    Each batch is claimed with a conditional UPDATE tagged with this worker's id, so several workers can run at once.
+    A failing event is retried on later batches without holding back the rest; after --max-attempts it is marked failed.
+    """
+    help = "Apply queued payment webhooks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new events.')
+        parser.add_argument('--sleep', type=float, default=1.0, help='Seconds to wait when the queue is empty.')
+        parser.add_argument('--max-attempts', type=int, default=5)
+        parser.add_argument('--lease', type=int, default=300, help='Seconds after which events claimed by another worker are claimed again.')
+        parser.add_argument('--retry-delay', type=int, default=30, help='Seconds to wait before retrying a failed event.')
+
+    def handle(self, *args, **options):
+        worker = uuid.uuid4().hex
+        total = 0
+        while True:
+            processed = self.process_batch(worker, options['batch_size'], options['max_attempts'], options['lease'], options['retry_delay'])
+            total += processed
+            if processed:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['sleep'])
+        self.stdout.write(self.style.SUCCESS(f"Processed {total} webhook events."))
+
+    def process_batch(self, worker, batch_size, max_attempts, lease, retry_delay):
+        now = timezone.now()
+        # Events claimed by a worker that died before finishing them are retried, or failed when out of attempts
+        stale = WebhookEvent.objects.filter(status='processing').filter(
+            Q(claimed_at__isnull=True) | Q(claimed_at__lt=now - timedelta(seconds=lease)),
+        )
+        stale.filter(attempts__gte=max_attempts).update(status='failed', error='Worker lease expired.')
+        stale.update(status='pending')
+
+        # Events that failed are retried once retry_delay has passed since their last attempt
+        event_ids = list(
+            WebhookEvent.objects.filter(status='pending', attempts__lt=max_attempts)
+            .filter(Q(claimed_at__isnull=True) | Q(claimed_at__lt=now - timedelta(seconds=retry_delay)))
+            .order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+        if not event_ids:
+            return 0
+        WebhookEvent.objects.filter(id__in=event_ids, status='pending').update(
+            status='processing', worker=worker, claimed_at=now, attempts=F('attempts') + 1,
+        )
+        events = list(WebhookEvent.objects.filter(id__in=event_ids, status='processing', worker=worker).order_by('id'))
+
+        by_gateway = {}
+        for event in events:
+            by_gateway.setdefault(event.gateway, []).append(event)
+
+        for gateway_name, gateway_events in by_gateway.items():
+            try:
+                gateway = get_gateway(gateway_name)
+            except KeyError as error:
+                self.release(gateway_events, error, max_attempts)
+                continue
+            statuses = {}
+            parsed = []
+            for event in gateway_events:
+                try:
+                    statuses[event.id] = gateway.event_status(event.payload)
+                    parsed.append(event)
+                except Exception as error:
+                    self.release([event], error, max_attempts)
+            try:
+                self.apply(gateway_name, parsed, statuses)
+            except Exception:
+                # Find the events that fail by applying them one at a time
+                for event in parsed:
+                    try:
+                        self.apply(gateway_name, [event], statuses)
+                    except Exception as error:
+                        self.release([event], error, max_attempts)
+        return len(events)
+
+    def apply(self, gateway_name, events, statuses):
+        """
+        Apply the payment statuses of `events` and mark them processed, all or nothing.
+        """
+        # Later events for the same payment win
+        by_reference = dict(statuses[event.id] for event in events)
+        with transaction.atomic():
+            apply_statuses(gateway_name, by_reference)
+            WebhookEvent.objects.filter(id__in=[event.id for event in events]).update(status='processed', processed_at=timezone.now(), error='')
+
+    def release(self, events, error, max_attempts):
+        """
+        Put events back for another attempt, or mark them failed when they are out of attempts.
+        """
+        ids = [event.id for event in events]
+        failed = WebhookEvent.objects.filter(id__in=ids, attempts__gte=max_attempts).update(status='failed', error=repr(error))
+        WebhookEvent.objects.filter(id__in=ids, status='processing').update(status='pending', error=repr(error))
+        self.stderr.write(f"Failed to process {len(ids)} {events[0].gateway} events, {failed} given up: {error!r}")
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from payment.gateways import get_gateway
+from payment.models import PaymentIntent
+from payment.utils import apply_statuses
+
+
+class Command(BaseCommand):
+    """
+    Settle open payment intents against the gateways' own records.
+    Intents are fetched in id-ordered batches, looked up with one gateway call per batch
+    and updated with one UPDATE per resulting status.
+    """
+    help = "Reconcile open payment intents with their gateways."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        checked = changed = 0
+        last_id = 0
+        while True:
+            rows = list(
+                PaymentIntent.objects.filter(status='processing', id__gt=last_id)
+                .exclude(gateway_reference='')
+                .order_by('id').values_list('id', 'gateway', 'gateway_reference')[:options['batch_size']]
+            )
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            references = {}
+            for _, gateway, reference in rows:
+                references.setdefault(gateway, []).append(reference)
+            for gateway, gateway_references in references.items():
+                statuses = get_gateway(gateway).fetch_statuses(gateway_references)
+                with transaction.atomic():
+                    changed += apply_statuses(gateway, statuses)
+            checked += len(rows)
+
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} open payment intents, {changed} settled."))
@@ -0,0 +1,55 @@
+# Generated by Django 5.1.1 on 2026-10-19 18:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, migrations, models
+
+
+def set_customers(apps, schema_editor):
+    """
+    Copy the customer of each intent from its order, which may be on any shard or already archived.
+    Shards whose order tables do not exist yet are skipped.
+    """
+    PaymentIntent = apps.get_model('payment', 'PaymentIntent')
+    intents = PaymentIntent.objects.using(schema_editor.connection.alias)
+    missing = dict(intents.filter(customer__isnull=True).values_list('order_id', 'id'))
+    # The databases that can hold orders, as orders.sharding.order_aliases() returned them when this was written
+    for alias in list(getattr(settings, 'ORDER_SHARD_ALIASES', [])) or [DEFAULT_DB_ALIAS]:
+        tables = connections[alias].introspection.table_names()
+        for model_name in ('Order', 'ArchivedOrder'):
+            model = apps.get_model('orders', model_name)
+            if not missing or model._meta.db_table not in tables:
+                continue
+            order_ids = list(missing)
+            for start in range(0, len(order_ids), 500):
+                for order_id, customer_id in model.objects.using(alias).filter(id__in=order_ids[start:start + 500]).values_list('id', 'customer_id'):
+                    intents.filter(order_id=order_id, customer__isnull=True).update(customer_id=customer_id)
+                    missing.pop(order_id, None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0006_user_role_index'),
+        ('orders', '0010_order_discount'),
+        ('payment', '0002_webhookevent_claimed_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paymentintent',
+            name='customer',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='payment_intents', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(set_customers, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='paymentintent',
+            name='idempotency_key',
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AddConstraint(
+            model_name='paymentintent',
+            constraint=models.UniqueConstraint(fields=('customer', 'idempotency_key'), name='unique_payment_idempotency_key'),
+        ),
+    ]
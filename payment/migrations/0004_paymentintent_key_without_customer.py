@@ -0,0 +1,21 @@
+# Generated by Django 5.1.1 on 2026-10-19 18:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0006_user_role_index'),
+        ('orders', '0011_order_status_created_at_index'),
+        ('payment', '0003_paymentintent_customer'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='paymentintent',
+            constraint=models.UniqueConstraint(condition=models.Q(('customer__isnull', True)), fields=('idempotency_key',), name='unique_payment_idempotency_key_no_customer'),
+        ),
+    ]
@@ -1,3 +1,64 @@
 from django.db import models
+from account.models import Restaurant, User
+from orders.models import Order
+from .constants import PAYMENT_STATUSES, WEBHOOK_STATUSES
 
-# Create your models here.
+
+class PaymentIntent(models.Model):
+    """
+    This model represents one attempt to collect the payment of an order through a gateway.
+    The idempotency key, unique per customer, makes retried create requests return the same intent.
+    Orders can live on a shard, so the order relation has no db constraint; load it with orders.sharding.get_order.
+    """
+    order = models.ForeignKey(Order, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    # Empty only for intents created before customers were recorded whose order could not be found
+    customer = models.ForeignKey(User, on_delete=models.CASCADE, null=True, related_name='payment_intents')
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='payment_intents')
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    currency = models.CharField(max_length=3, default='BDT')
+    status = models.CharField(max_length=20, choices=PAYMENT_STATUSES, default='processing')
+    idempotency_key = models.CharField(max_length=255)
+    gateway = models.CharField(max_length=30)
+    gateway_reference = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['customer', 'idempotency_key'], name='unique_payment_idempotency_key'),
+            # NULLs never collide in the constraint above
+            models.UniqueConstraint(fields=['idempotency_key'], condition=models.Q(customer__isnull=True), name='unique_payment_idempotency_key_no_customer'),
+        ]
+        indexes = [
+            models.Index(fields=['gateway', 'gateway_reference']),
+            models.Index(fields=['status', 'id']),
+        ]
+
+    def __str__(self):
+        return f"Payment {self.id} for order {self.order_id} ({self.status})"
+
+
+class WebhookEvent(models.Model):
+    """
+    This model is the queue of gateway webhook deliveries.
+    Webhooks are stored as they arrive and applied later by `manage.py process_webhooks`.
+    Events that keep failing end up failed; events claimed by a worker that died are claimed again after a lease.
+    """
+    gateway = models.CharField(max_length=30)
+    event_id = models.CharField(max_length=255)
+    event_type = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=WEBHOOK_STATUSES, default='pending')
+    worker = models.CharField(max_length=64, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['gateway', 'event_id'], name='unique_webhook_event')]
+        indexes = [models.Index(fields=['status', 'id'])]
+
+    def __str__(self):
+        return f"{self.gateway} {self.event_type} ({self.status})"
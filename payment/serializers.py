@@ -0,0 +1,10 @@
+from rest_framework import serializers
+from .models import PaymentIntent
+
+class PaymentIntentSerializer(serializers.ModelSerializer):
+    """
+    Serializes a payment intent with its order, amount, gateway and current status.
+    """
+    class Meta:
+        model = PaymentIntent
+        fields = ['id', 'order', 'restaurant', 'amount', 'currency', 'status', 'gateway', 'gateway_reference', 'created_at', 'updated_at']
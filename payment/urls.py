@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import PaymentIntentView,WebhookView
+
+urlpatterns = [
+    path('intent/', PaymentIntentView.as_view()),
+    path('webhook/<str:gateway>/', WebhookView.as_view()),
+]
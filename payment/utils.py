@@ -0,0 +1,26 @@
+from django.utils import timezone
+from .constants import FINAL_PAYMENT_STATUSES
+from .models import PaymentIntent
+
+
+def apply_statuses(gateway, statuses):
+    """
+    Apply {gateway_reference: status} to open payment intents of a gateway.
+    Runs one UPDATE per distinct status instead of one per intent. Returns the number of intents changed.
+    """
+    by_status = {}
+    for reference, payment_status in statuses.items():
+        if reference and payment_status:
+            by_status.setdefault(payment_status, []).append(reference)
+
+    changed = 0
+    now = timezone.now()
+    for payment_status, references in by_status.items():
+        changed += (
+            PaymentIntent.objects
+            .filter(gateway=gateway, gateway_reference__in=references)
+            .exclude(status__in=FINAL_PAYMENT_STATUSES)
+            .exclude(status=payment_status)
+            .update(status=payment_status, updated_at=now)
+        )
+    return changed
@@ -1,3 +1,99 @@
-from django.shortcuts import render
+from django.db import IntegrityError, transaction
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from orders.models import Order
+from orders.sharding import get_order
+from .gateways import InvalidWebhook, get_gateway
+from .models import PaymentIntent, WebhookEvent
+from .serializers import PaymentIntentSerializer
 
-# Create your views here.
+
+# View for starting the payment of an order.
+class PaymentIntentView(APIView):
+    """
+    API to create and list payment intents for the authenticated customer's orders.
+    Creating requires an Idempotency-Key header; retries by the same customer with the same key return the same intent.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        List the payment intents of one order.
+        """
+        order_id = request.query_params.get('order_id')
+        try:
+            order = get_order(order_id, customer=request.user)
+        except (Order.DoesNotExist, ValueError):
+            return Response({"error": "Order not found."}, status=status.HTTP_404_NOT_FOUND)
+        intents = PaymentIntent.objects.filter(order_id=order.id).order_by('-created_at')
+        return Response(PaymentIntentSerializer(intents, many=True).data, status=status.HTTP_200_OK)
+
+    def post(self, request):
+        """
+        Create a payment intent for an order and start the payment with the gateway.
+        """
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            return Response({"error": "Idempotency-Key header is required."}, status=status.HTTP_400_BAD_REQUEST)
+        order_id = request.data.get('order_id')
+
+        existing = PaymentIntent.objects.filter(customer=request.user, idempotency_key=key).first()
+        if existing:
+            return self.replay(existing, order_id)
+
+        try:
+            order = get_order(order_id, customer=request.user)
+        except (Order.DoesNotExist, ValueError, TypeError):
+            return Response({"error": "Order not found."}, status=status.HTTP_404_NOT_FOUND)
+        if PaymentIntent.objects.filter(order_id=order.id, status='succeeded').exists():
+            return Response({"error": "Order is already paid."}, status=status.HTTP_409_CONFLICT)
+
+        try:
+            gateway = get_gateway(request.data.get('gateway'))
+        except KeyError:
+            return Response({"error": "Unknown gateway."}, status=status.HTTP_400_BAD_REQUEST)
+        intent = PaymentIntent(order_id=order.id, customer=request.user, restaurant_id=order.restaurant_id, amount=order.total_price, idempotency_key=key, gateway=gateway.name)
+        try:
+            with transaction.atomic():
+                intent.save()
+        except IntegrityError:
+            # A concurrent request with the same key won the insert
+            return self.replay(PaymentIntent.objects.get(customer=request.user, idempotency_key=key), order_id)
+
+        intent.gateway_reference = gateway.create_payment(intent)
+        intent.save(update_fields=['gateway_reference', 'updated_at'])
+        return Response(PaymentIntentSerializer(intent).data, status=status.HTTP_201_CREATED)
+
+    def replay(self, intent, order_id):
+        if str(intent.order_id) != str(order_id):
+            return Response({"error": "Idempotency-Key was already used for another order."}, status=status.HTTP_409_CONFLICT)
+        return Response(PaymentIntentSerializer(intent).data, status=status.HTTP_200_OK)
+
+
+# View for receiving gateway webhooks.
+class WebhookView(APIView):
+    """
+    API for payment gateways to deliver webhooks.
+    Events are only queued here; `manage.py process_webhooks` applies them.
+    Redelivered events are ignored.
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def post(self, request, gateway):
+        try:
+            gateway = get_gateway(gateway)
+        except KeyError:
+            return Response({"error": "Unknown gateway."}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            event_id, event_type, payload = gateway.parse_webhook(request)
+        except InvalidWebhook as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        WebhookEvent.objects.bulk_create(
+            [WebhookEvent(gateway=gateway.name, event_id=event_id, event_type=event_type, payload=payload)],
+            ignore_conflicts=True,
+        )
+        return Response({"message": "Event received."}, status=status.HTTP_202_ACCEPTED)
@@ -0,0 +1,39 @@
+import os
+from django.contrib import admin
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+from .models import RequestProfile
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    """
+    Lists captured profiles per view, with a link to download the pstats file.
+    """
+    list_display = ['created_at', 'view_name', 'method', 'status_code', 'duration_ms', 'sampled', 'requested_by', 'download']
+    list_filter = ['view_name', 'sampled', 'method']
+    search_fields = ['view_name', 'path']
+    date_hierarchy = 'created_at'
+    readonly_fields = [field.name for field in RequestProfile._meta.fields] + ['download']
+
+    def has_add_permission(self, request):
+        return False
+
+    def get_urls(self):
+        urls = [
+            path('<int:profile_id>/download/', self.admin_site.admin_view(self.download_view), name='performance_requestprofile_download'),
+        ]
+        return urls + super().get_urls()
+
+    @admin.display(description='Profile')
+    def download(self, profile):
+        url = reverse('admin:performance_requestprofile_download', args=[profile.id])
+        return format_html('<a href="{}">download .prof</a>', url)
+
+    def download_view(self, request, profile_id):
+        profile = get_object_or_404(RequestProfile, id=profile_id)
+        if not os.path.exists(profile.file):
+            raise Http404("Profile file no longer exists.")
+        return FileResponse(open(profile.file, 'rb'), as_attachment=True, filename=os.path.basename(profile.file))
@@ -0,0 +1,118 @@
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from django.core.management.base import BaseCommand
+from account.models import User
+from orders.models import Order
+from orders.sharding import order_aliases
+
+# Schemas of the user table and of the order columns that matter here, keyed by email or by integer id
+VARIANTS = {
+    'email': {
+        'users': 'CREATE TABLE users (email varchar(255) NOT NULL PRIMARY KEY, role varchar(30) NOT NULL)',
+        'key_type': 'varchar(255)',
+        'key': 'email',
+    },
+    'id': {
+        'users': 'CREATE TABLE users (id integer NOT NULL PRIMARY KEY, email varchar(255) NOT NULL UNIQUE, role varchar(30) NOT NULL)',
+        'key_type': 'bigint',
+        'key': 'id',
+    },
+}
+
+
+class Command(BaseCommand):
+    """
+    Compare keying users by email with keying them by integer id on a copy of the real users and orders.
+    Both layouts are built in temporary SQLite files with the indexes Django creates, then the index sizes
+    and the time of a join over all orders and of per-customer order lookups are measured.
+    """
+    help = "Benchmark index size and join speed of email versus integer user keys."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=None, help="Use at most this many orders.")
+        parser.add_argument('--lookups', type=int, default=2000, help="Number of per-customer order lookups.")
+        parser.add_argument('--repeat', type=int, default=5, help="Runs of each query; the median is reported.")
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        users = list(User.objects.order_by('date_joined', 'email').values_list('pk', 'email', 'role'))
+        keys = {pk: (email, number) for number, (pk, email, _) in enumerate(users, start=1)}
+        orders = []
+        limit = options['orders']
+        for alias in order_aliases():
+            rows = Order.objects.using(alias).order_by().values_list('id', 'customer_id', 'total_price', 'created_at')
+            if limit is not None:
+                rows = rows[:limit - len(orders)]
+            for order_id, customer_id, total_price, created_at in rows.iterator(chunk_size=10000):
+                if customer_id in keys:
+                    orders.append((order_id, keys[customer_id], str(total_price), created_at.isoformat()))
+        if not orders:
+            self.stderr.write("No orders to benchmark with. Run generate_data first.")
+            return
+        self.stdout.write(f"{len(users)} users, {len(orders)} orders")
+
+        rng = random.Random(options['seed'])
+        customers = rng.choices([key for _, key, _, _ in orders], k=options['lookups'])
+        with tempfile.TemporaryDirectory() as directory:
+            results = {
+                name: self.measure(os.path.join(directory, f'{name}.sqlite3'), variant, users, orders, customers, options['repeat'])
+                for name, variant in VARIANTS.items()
+            }
+
+        self.stdout.write(f"{'':<32} {'email key':>12} {'id key':>12} {'change':>8}")
+        for label, unit in (('order customer index', 'KiB'), ('user primary/unique indexes', 'KiB'), ('orders table', 'KiB'),
+                            ('join all orders to users', 'ms'), (f"{options['lookups']} customer order lookups", 'ms')):
+            email, integer = results['email'][label], results['id'][label]
+            change = f'{(integer - email) * 100 / email:+.0f}%' if email else ''
+            self.stdout.write(f"{label:<32} {email:>8.1f} {unit:<3} {integer:>8.1f} {unit:<3} {change:>8}")
+
+    def measure(self, path, variant, users, orders, customers, repeat):
+        connection = sqlite3.connect(path)
+        key = variant['key']
+        pick = 0 if key == 'email' else 1
+        connection.execute(variant['users'])
+        connection.execute(
+            f"CREATE TABLE orders (id integer NOT NULL PRIMARY KEY, customer_id {variant['key_type']} NOT NULL, "
+            "total_price decimal NOT NULL, created_at datetime NOT NULL)"
+        )
+        if key == 'email':
+            connection.executemany('INSERT INTO users (email, role) VALUES (?, ?)', [(email, role) for _, email, role in users])
+        else:
+            connection.executemany('INSERT INTO users (id, email, role) VALUES (?, ?, ?)',
+                                   [(number, email, role) for number, (_, email, role) in enumerate(users, start=1)])
+        connection.executemany('INSERT INTO orders VALUES (?, ?, ?, ?)',
+                               [(order_id, customer[pick], total, created) for order_id, customer, total, created in orders])
+        connection.execute('CREATE INDEX orders_customer_id ON orders (customer_id)')
+        connection.commit()
+        connection.execute('ANALYZE')
+
+        sizes = dict(connection.execute('SELECT name, SUM(pgsize) FROM dbstat GROUP BY name'))
+        user_indexes = sum(size for name, size in sizes.items() if name.startswith('sqlite_autoindex_users'))
+        join = f'SELECT u.role, COUNT(*), SUM(o.total_price) FROM orders o JOIN users u ON u.{key} = o.customer_id GROUP BY u.role'
+        lookup = 'SELECT COUNT(*), MAX(created_at) FROM orders WHERE customer_id = ?'
+        values = [(customer[pick],) for customer in customers]
+        result = {
+            'order customer index': sizes.get('orders_customer_id', 0) / 1024,
+            'user primary/unique indexes': user_indexes / 1024,
+            'orders table': sizes.get('orders', 0) / 1024,
+            'join all orders to users': self.timed(repeat, lambda: connection.execute(join).fetchall()),
+            f'{len(customers)} customer order lookups': self.timed(repeat, lambda: [connection.execute(lookup, value).fetchone() for value in values]),
+        }
+        connection.close()
+        return result
+
+    def timed(self, repeat, run):
+        """
+        Median milliseconds of `repeat` runs, after one warm-up run.
+        """
+        run()
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+        return statistics.median(times) * 1000
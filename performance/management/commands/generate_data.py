@@ -0,0 +1,264 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+from itertools import accumulate
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils import timezone
+from account.models import Restaurant, User
+from orders.models import Cart, CartItem, Order, OrderItem
+from orders.sharding import order_aliases, shard_for_restaurant
+from restaurant.models import Category, EmployeePermission, Item
+
+CUISINES = ['Biryani', 'Kabab', 'Pizza', 'Burger', 'Chinese', 'Thai', 'Fuchka', 'Cake', 'Coffee', 'Seafood', 'Bhorta', 'Noodles']
+AREAS = ['Gulshan', 'Banani', 'Dhanmondi', 'Uttara', 'Mirpur', 'Mohammadpur', 'Motijheel', 'Bashundhara', 'Chattogram', 'Sylhet']
+CATEGORY_NAMES = ['Starters', 'Mains', 'Rice', 'Curries', 'Grill', 'Sides', 'Drinks', 'Desserts', 'Combos', 'Specials', 'Soups', 'Salads']
+
+
+class Progress:
+    """
+    Minimal progress bar on stdout.
+    """
+    width = 30
+
+    def __init__(self, stdout, label, total):
+        self.stdout, self.label, self.total = stdout, label, max(total, 1)
+        self.done = 0
+        self.start = time.monotonic()
+
+    def advance(self, count):
+        self.done += count
+        filled = int(self.width * self.done / self.total)
+        rate = self.done / max(time.monotonic() - self.start, 1e-6)
+        self.stdout.write(f'\r{self.label:<16} [{"#" * filled}{"." * (self.width - filled)}] {self.done}/{self.total} ({rate:,.0f} rows/s)', ending='')
+        self.stdout.flush()
+
+    def finish(self):
+        self.stdout.write('')
+
+
+class Command(BaseCommand):
+    """
+    Generate a reproducible, production-shaped dataset with chunked bulk_create and raw order INSERTs.
+    A few owners run large chains and most run one shop; order volume per restaurant and per customer is skewed.
+    All users share one precomputed password hash.
+    """
+    help = "Generate seeded synthetic restaurants, menus, users, carts and orders."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--restaurants', type=int, default=1000)
+        parser.add_argument('--customers', type=int, default=100000)
+        parser.add_argument('--orders', type=int, default=1000000)
+        parser.add_argument('--days', type=int, default=365, help='Spread orders over this many past days.')
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--password', default='password123')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.chunk_size = options['chunk_size']
+        self.domain = f"seed{options['seed']}.example.com"
+        if User.objects.filter(email__endswith=f'@{self.domain}').exists():
+            raise CommandError(f"Data for seed {options['seed']} already exists, use another --seed.")
+        for alias in set(order_aliases()) | {'default'}:
+            self.tune(alias)
+
+        started = time.monotonic()
+        password = make_password(options['password'])
+        restaurants = self.create_restaurants(options['restaurants'], password)
+        menus = self.create_menus(restaurants)
+        self.create_employees(restaurants, password)
+        customers = self.create_customers(options['customers'], password)
+        self.create_carts(customers, menus)
+        self.create_orders(options['orders'], options['days'], restaurants, menus, customers)
+        self.stdout.write(self.style.SUCCESS(f"Done in {time.monotonic() - started:.1f}s."))
+
+    def tune(self, alias):
+        """
+        Trade durability for speed while loading; only affects this command's connections.
+        """
+        connection = connections[alias]
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA synchronous = OFF')
+                cursor.execute('PRAGMA cache_size = -200000')
+
+    def chunks(self, rows):
+        for start in range(0, len(rows), self.chunk_size):
+            yield rows[start:start + self.chunk_size]
+
+    def bulk_insert(self, model, rows, label, using='default'):
+        progress = Progress(self.stdout, label, len(rows))
+        for chunk in self.chunks(rows):
+            with transaction.atomic(using=using):
+                model.objects.using(using).bulk_create(chunk, batch_size=self.chunk_size)
+            progress.advance(len(chunk))
+        progress.finish()
+        return rows
+
+    def user(self, email, role, password, **extra):
+        first_name = self.rng.choice(['Rahim', 'Karim', 'Ayesha', 'Nusrat', 'Tanvir', 'Farhana', 'Sakib', 'Mitu'])
+        last_name = self.rng.choice(['Hossain', 'Islam', 'Ahmed', 'Khan', 'Chowdhury', 'Rahman'])
+        fields = {'is_active': True, 'is_verified': True, **extra}
+        return User(
+            email=email, first_name=first_name, last_name=last_name, phone=f'01{self.rng.randrange(10 ** 9):09d}',
+            role=role, password=password, **fields
+        )
+
+    def create_restaurants(self, count, password):
+        # Chain sizes follow a Pareto tail: most owners have one restaurant, a few have hundreds.
+        owners, sizes, remaining = [], [], count
+        while remaining > 0:
+            size = min(remaining, int(self.rng.paretovariate(1.3)))
+            owners.append(self.user(f'owner{len(owners)}@{self.domain}', 'owner', password))
+            sizes.append(size)
+            remaining -= size
+        self.bulk_insert(User, owners, 'owners')
+
+        restaurants = []
+        for owner, size in zip(owners, sizes):
+            brand = f'{self.rng.choice(CUISINES)} {owner.last_name}'
+            for branch in range(size):
+                name = brand if size == 1 else f'{brand} {self.rng.choice(AREAS)} {branch + 1}'
+                restaurants.append(Restaurant(name=name[:100], location=self.rng.choice(AREAS), owner=owner))
+        self.bulk_insert(Restaurant, restaurants, 'restaurants')
+        # Order volume per restaurant is log-normal: a few busy kitchens, a long quiet tail.
+        self.popularity = [self.rng.lognormvariate(0, 1.2) for _ in restaurants]
+        return restaurants
+
+    def create_menus(self, restaurants):
+        categories = []
+        for restaurant in restaurants:
+            for name in self.rng.sample(CATEGORY_NAMES, self.rng.randint(3, 8)):
+                categories.append(Category(name=name, slug=name.lower(), restaurant=restaurant))
+        self.bulk_insert(Category, categories, 'categories')
+
+        items = []
+        for category in categories:
+            for index in range(self.rng.randint(3, 12)):
+                price = Decimal(self.rng.randrange(40, 1500)).quantize(Decimal('1.00'))
+                items.append(Item(
+                    category=category, restaurant_id=category.restaurant_id, name=f'{category.name} {index + 1}', details=f'{category.name} dish {index + 1}', price=price,
+                ))
+        self.bulk_insert(Item, items, 'items')
+
+        menus = {}
+        for item in items:
+            menus.setdefault(item.restaurant_id, []).append(item)
+        return menus
+
+    def create_employees(self, restaurants, password):
+        employees = []
+        for restaurant, weight in zip(restaurants, self.popularity):
+            for _ in range(min(int(weight * 2) + self.rng.randint(0, 2), 15)):
+                employees.append(self.user(
+                    f'employee{len(employees)}@{self.domain}', 'employee', password, restaurant=restaurant,
+                    is_verified=self.rng.random() < 0.9,
+                ))
+        self.bulk_insert(User, employees, 'employees')
+
+        permissions = [
+            EmployeePermission(
+                employee=employee, restaurant=employee.restaurant, can_create=self.rng.random() < 0.3,
+                can_update=self.rng.random() < 0.6, can_delete=self.rng.random() < 0.1, can_manage_orders=self.rng.random() < 0.7,
+            )
+            for employee in employees if self.rng.random() < 0.6
+        ]
+        self.bulk_insert(EmployeePermission, permissions, 'permissions')
+
+    def create_customers(self, count, password):
+        customers = [self.user(f'customer{index}@{self.domain}', 'customer', password) for index in range(count)]
+        return self.bulk_insert(User, customers, 'customers')
+
+    def create_carts(self, customers, menus):
+        carts = [Cart(customer=customer) for customer in customers if self.rng.random() < 0.2]
+        self.bulk_insert(Cart, carts, 'carts')
+        restaurant_ids = list(menus)
+        cart_items = []
+        for cart in carts:
+            menu = menus[self.rng.choice(restaurant_ids)]
+            for item in self.rng.sample(menu, min(len(menu), self.rng.randint(1, 4))):
+                cart_items.append(CartItem(cart=cart, item=item, quantity=self.rng.randint(1, 3)))
+        self.bulk_insert(CartItem, cart_items, 'cart items')
+
+    def create_orders(self, count, days, restaurants, menus, customers):
+        """
+        Orders and their lines are most of the rows, so they skip model instances and go in as plain
+        executemany INSERTs with ids allocated here.
+        """
+        restaurant_weights = list(accumulate(self.popularity))
+        # Customers follow a Zipf-like curve: regulars order far more often than one-off visitors.
+        customer_weights = list(accumulate(1 / (rank + 1) ** 0.8 for rank in range(len(customers))))
+        customer_ids = [customer.pk for customer in customers]
+        now = timezone.now()
+        seconds = days * 24 * 3600
+        aliases = {restaurant.id: shard_for_restaurant(restaurant.id) for restaurant in restaurants}
+        next_ids = {alias: [self.next_id(alias, Order), self.next_id(alias, OrderItem)] for alias in set(aliases.values())}
+        progress = Progress(self.stdout, 'orders', count)
+
+        for start in range(0, count, self.chunk_size):
+            size = min(self.chunk_size, count - start)
+            chosen_restaurants = self.rng.choices(restaurants, cum_weights=restaurant_weights, k=size)
+            chosen_customers = self.rng.choices(customer_ids, cum_weights=customer_weights, k=size)
+            by_alias = {}
+            for restaurant, customer_id in zip(chosen_restaurants, chosen_customers):
+                alias = aliases[restaurant.id]
+                orders, lines = by_alias.setdefault(alias, ([], []))
+                ids = next_ids[alias]
+                order_id = ids[0]
+                ids[0] += 1
+                menu = menus[restaurant.id]
+                total = 0
+                for item in self.rng.sample(menu, min(len(menu), self.rng.randint(1, 5))):
+                    quantity = self.rng.randint(1, 3)
+                    total += item.price * quantity
+                    lines.append({'id': ids[1], 'order_id': order_id, 'item_id': item.id, 'quantity': quantity, 'price': item.price})
+                    ids[1] += 1
+                age = seconds * self.rng.random() ** 2  # more recent orders than old ones
+                orders.append({
+                    'id': order_id, 'customer_id': customer_id, 'restaurant_id': restaurant.id, 'total_price': total,
+                    'status': 'Completed' if age > 3600 else self.rng.choice(['Pending', 'Preparing', 'Ready']),
+                    'created_at': now - timedelta(seconds=age),
+                })
+
+            for alias, (orders, lines) in by_alias.items():
+                with transaction.atomic(using=alias):
+                    self.raw_insert(alias, Order, orders)
+                    self.raw_insert(alias, OrderItem, lines)
+            progress.advance(size)
+        progress.finish()
+
+    def next_id(self, alias, model):
+        """
+        First free primary key, respecting the id range a shard's sqlite sequence starts from.
+        """
+        table = model._meta.db_table
+        connection = connections[alias]
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT MAX(id) FROM {connection.ops.quote_name(table)}')
+            current = cursor.fetchone()[0] or 0
+            if connection.vendor == 'sqlite':
+                cursor.execute('SELECT seq FROM sqlite_sequence WHERE name = %s', [table])
+                row = cursor.fetchone()
+                current = max(current, row[0] if row else 0)
+        return current + 1
+
+    def raw_insert(self, alias, model, rows):
+        """
+        INSERT plain dicts keyed by attname. Fields missing from a row get their model default.
+        """
+        connection = connections[alias]
+        fields = model._meta.concrete_fields
+        defaults = {field.attname: field.get_db_prep_save(field.get_default(), connection) for field in fields}
+        datetimes = [field.attname for field in fields if field.get_internal_type() == 'DateTimeField']
+        for row in rows:
+            for attname in datetimes:
+                if attname in row:
+                    row[attname] = connection.ops.adapt_datetimefield_value(row[attname])
+        columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+        placeholders = ', '.join(['%s'] * len(fields))
+        sql = f'INSERT INTO {connection.ops.quote_name(model._meta.db_table)} ({columns}) VALUES ({placeholders})'
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, [[row.get(field.attname, defaults[field.attname]) for field in fields] for row in rows])
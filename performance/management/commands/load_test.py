@@ -0,0 +1,241 @@
+import json
+import random
+import threading
+import time
+import uuid
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+from django.core.management.base import BaseCommand, CommandError
+from account.models import Restaurant, User
+
+JOURNEYS = ('browse', 'buyer', 'signup', 'owner')
+
+
+def percentile(values, fraction):
+    """
+    Nearest-rank percentile of sorted `values`.
+    """
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, round(fraction * len(values)) - 1))]
+
+
+class Step:
+    """
+    Latencies and outcomes of one journey step. Each virtual user keeps its own and they are merged at the end.
+    """
+
+    def __init__(self):
+        self.latencies = []
+        self.client_errors = 0
+        self.server_errors = 0
+        self.locked = 0
+        self.failed = 0
+
+    def merge(self, other):
+        self.latencies.extend(other.latencies)
+        self.client_errors += other.client_errors
+        self.server_errors += other.server_errors
+        self.locked += other.locked
+        self.failed += other.failed
+
+
+class VirtualUser:
+    """
+    Runs journeys against the server over HTTP until the deadline, like one customer, owner or visitor would.
+    """
+
+    def __init__(self, command, index, options, rng):
+        self.command = command
+        self.index = index
+        self.options = options
+        self.rng = rng
+        self.steps = {}
+        self.journeys = 0
+        self.token = None
+
+    def request(self, step, method, path, data=None, headers=None):
+        """
+        Send one request and record it under `step`. Returns the decoded body, or None when it failed.
+        """
+        headers = dict(headers or {}, Accept='application/json')
+        body = None
+        if data is not None:
+            body = json.dumps(data).encode()
+            headers['Content-Type'] = 'application/json'
+        if self.token:
+            headers['Authorization'] = f'Token {self.token}'
+        stats = self.steps.setdefault(step, Step())
+        start = time.perf_counter()
+        try:
+            with urlopen(Request(self.options['url'] + path, data=body, headers=headers, method=method), timeout=self.options['timeout']) as response:
+                content = response.read()
+            stats.latencies.append(time.perf_counter() - start)
+        except HTTPError as error:
+            content = error.read()
+            stats.latencies.append(time.perf_counter() - start)
+            if error.code >= 500:
+                stats.server_errors += 1
+                # The debug error page names the exception; SQLite lock timeouts are the interesting ones
+                if b'database is locked' in content:
+                    stats.locked += 1
+            else:
+                stats.client_errors += 1
+            return None
+        except (URLError, OSError):
+            stats.failed += 1
+            return None
+        try:
+            return json.loads(content) if content else {}
+        except ValueError:
+            return {}
+
+    def run(self, deadline):
+        weights = [self.options['mix'][journey] for journey in JOURNEYS]
+        while time.monotonic() < deadline:
+            journey = self.rng.choices(JOURNEYS, weights)[0]
+            getattr(self, journey)()
+            self.journeys += 1
+            if self.options['think_time']:
+                time.sleep(self.rng.uniform(0, self.options['think_time']))
+
+    def login(self, email):
+        data = self.request('login', 'POST', '/api/v1/user/login/', {'email': email, 'password': self.options['password']})
+        self.token = data.get('token') if data else None
+        return self.token is not None
+
+    def browse(self):
+        """
+        Anonymous visitor: read a restaurant's categories and the items of a few of them. Returns the items seen.
+        """
+        self.token = None
+        return self.browse_menu()
+
+    def browse_menu(self):
+        restaurant_id = self.rng.choice(self.command.restaurants)
+        categories = self.request('categories', 'GET', f'/api/v1/restaurant/{restaurant_id}/categories/') or []
+        items = []
+        for category in self.rng.sample(categories, min(2, len(categories))):
+            items.extend(self.request('items', 'GET', f"/api/v1/restaurant/category/{category['id']}/items/") or [])
+        return [item for item in items if item.get('is_available', True) and item.get('stock') != 0]
+
+    def buyer(self, email=None):
+        """
+        Customer: log in, browse, fill the cart, look at it and check out.
+        """
+        customers = self.command.customers
+        if not self.login(email or customers[self.index % len(customers)]):
+            return
+        items = self.browse_menu()
+        if not items:
+            return
+        for item in self.rng.sample(items, min(self.rng.randint(1, 3), len(items))):
+            self.request('cart add', 'POST', '/api/v1/order/cart/add/', {'item_id': item['id'], 'quantity': self.rng.randint(1, 2)})
+        self.request('cart view', 'GET', '/api/v1/order/cart/')
+        self.request('confirm', 'POST', '/api/v1/order/cart/confirm/', {}, {'Idempotency-Key': str(uuid.uuid4())})
+
+    def signup(self):
+        """
+        New customer: register, then go through the buyer journey.
+        """
+        self.token = None
+        email = f'load-{uuid.uuid4().hex[:12]}@{self.options["domain"]}'
+        password = self.options['password']
+        data = self.request('register', 'POST', '/api/v1/user/customer/register/', {
+            'email': email, 'phone': f'01{self.rng.randrange(10 ** 9):09d}', 'first_name': 'Load', 'last_name': 'Test',
+            'password': password, 'password2': password,
+        })
+        if data is not None:
+            self.buyer(email)
+
+    def owner(self):
+        """
+        Owner: log in and read the dashboard.
+        """
+        if self.login(self.rng.choice(self.command.owners)):
+            self.request('dashboard', 'GET', '/api/v1/restaurant/dashboard/')
+
+
+class Command(BaseCommand):
+    """
+    Drive a running server with concurrent virtual users going through whole journeys: signing up,
+    logging in, browsing menus, building carts, checking out and reading the owner dashboard.
+    Accounts and restaurants are taken from the database this command is configured with, so point it at
+    the same database as the server and fill it with `generate_data` first.
+    """
+    help = "Run concurrent user journeys against a running server and report latency and errors per step."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help="Base URL of the running server.")
+        parser.add_argument('--users', type=int, default=10, help="Number of concurrent virtual users.")
+        parser.add_argument('--duration', type=float, default=30.0, help="Seconds to run.")
+        parser.add_argument('--mix', default='browse=4,buyer=4,signup=1,owner=1',
+                            help="Relative weights of the journeys: " + ', '.join(JOURNEYS) + ".")
+        parser.add_argument('--think-time', type=float, default=0.0, help="Up to this many seconds of pause between journeys.")
+        parser.add_argument('--domain', default='seed42.example.com', help="Email domain of the accounts made by generate_data (seed<N>.example.com).")
+        parser.add_argument('--password', default='password123')
+        parser.add_argument('--timeout', type=float, default=30.0, help="Seconds before a request counts as failed.")
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        options['url'] = options['url'].rstrip('/')
+        options['mix'] = self.parse_mix(options['mix'])
+        rng = random.Random(options['seed'])
+
+        domain = f"@{options['domain']}"
+        self.restaurants = list(Restaurant.objects.filter(category__isnull=False).distinct().values_list('id', flat=True))
+        self.customers = list(User.objects.filter(role='customer', email__endswith=domain).values_list('email', flat=True))
+        self.owners = list(User.objects.filter(role='owner', email__endswith=domain).values_list('email', flat=True))
+        if not self.restaurants:
+            raise CommandError("No restaurant has a menu. Run generate_data first.")
+        if options['mix']['buyer'] and not self.customers or options['mix']['owner'] and not self.owners:
+            raise CommandError(f"No customers or owners with emails ending in {domain}. Run generate_data or pass --domain.")
+        if len(self.customers) < options['users']:
+            self.stderr.write(f"Only {len(self.customers)} customers for {options['users']} users; some will share a cart.")
+
+        users = [VirtualUser(self, index, options, random.Random(rng.random())) for index in range(options['users'])]
+        deadline = time.monotonic() + options['duration']
+        threads = [threading.Thread(target=user.run, args=(deadline,), daemon=True) for user in users]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        steps = {}
+        for user in users:
+            for name, stats in user.steps.items():
+                steps.setdefault(name, Step()).merge(stats)
+        self.report(steps, sum(user.journeys for user in users), elapsed, options)
+
+    def parse_mix(self, value):
+        mix = dict.fromkeys(JOURNEYS, 0)
+        try:
+            for part in value.split(','):
+                name, weight = part.split('=')
+                if name.strip() not in mix:
+                    raise ValueError
+                mix[name.strip()] = float(weight)
+        except ValueError:
+            raise CommandError(f"--mix must look like browse=4,buyer=4,signup=1,owner=1 using {', '.join(JOURNEYS)}.")
+        if sum(mix.values()) <= 0:
+            raise CommandError("--mix needs at least one journey with a positive weight.")
+        return mix
+
+    def report(self, steps, journeys, elapsed, options):
+        requests = sum(len(stats.latencies) + stats.failed for stats in steps.values())
+        self.stdout.write(f"{options['users']} users, {elapsed:.1f} s: {journeys} journeys ({journeys / elapsed:.1f}/s), "
+                          f"{requests} requests ({requests / elapsed:.1f}/s)")
+        self.stdout.write(f"{'step':<12} {'count':>7} {'req/s':>7} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} "
+                          f"{'4xx %':>6} {'5xx %':>6} {'lock %':>6} {'fail %':>6}")
+        for name, stats in steps.items():
+            latencies = sorted(stats.latencies)
+            count = len(latencies) + stats.failed
+            if not count:
+                continue
+            self.stdout.write(
+                f"{name:<12} {count:>7} {count / elapsed:>7.1f} "
+                + ' '.join(f'{percentile(latencies, fraction) * 1000:>8.1f}' for fraction in (0.5, 0.9, 0.99, 1.0))
+                + ' ' + ' '.join(f'{value * 100 / count:>6.1f}' for value in (stats.client_errors, stats.server_errors, stats.locked, stats.failed))
+            )
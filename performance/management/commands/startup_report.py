@@ -0,0 +1,66 @@
+import os
+import subprocess
+import sys
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from performance.warmup import PROJECT_APPS, warm_up
+
+IMPORT_SCRIPT = """
+import os, time
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', {settings_module!r})
+start = time.perf_counter()
+import django
+django.setup()
+import {modules}
+print(time.perf_counter() - start)
+"""
+
+
+class Command(BaseCommand):
+    """
+    Report what a cold worker spends before it can serve its first request:
+    import time per package (measured in a fresh interpreter with -X importtime) and the cost of each warm-up step.
+    """
+    help = "Report import time per app and warm-up cost of a cold worker."
+
+    def handle(self, *args, **options):
+        self.report_imports()
+        self.stdout.write('')
+        self.stdout.write('Warm-up steps (cold):')
+        for step, seconds in warm_up().items():
+            self.stdout.write(f'  {step:<30} {seconds * 1000:9.1f} ms')
+        self.stdout.write('Warm-up steps (warm):')
+        for step, seconds in warm_up().items():
+            self.stdout.write(f'  {step:<30} {seconds * 1000:9.1f} ms')
+
+    def report_imports(self):
+        modules = [
+            f'{app}.{module}' for app in PROJECT_APPS for module in ('models', 'views', 'serializers', 'urls')
+            if os.path.exists(os.path.join(settings.BASE_DIR, app, f'{module}.py'))
+        ]
+        script = IMPORT_SCRIPT.format(settings_module=os.environ['DJANGO_SETTINGS_MODULE'], modules=', '.join(modules))
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', script],
+            capture_output=True, text=True, cwd=settings.BASE_DIR,
+        )
+        if result.returncode != 0:
+            self.stderr.write(result.stderr)
+            return
+
+        # Lines look like "import time:  self [us] | cumulative | imported package"
+        per_package = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, _, name = line[len('import time:'):].split('|')
+            package = name.strip().split('.')[0]
+            per_package[package] = per_package.get(package, 0) + int(self_us)
+
+        total = float(result.stdout.strip().splitlines()[-1])
+        self.stdout.write(f'Startup to all apps imported: {total * 1000:.1f} ms')
+        self.stdout.write('Import time per package:')
+        for app in PROJECT_APPS:
+            self.stdout.write(f'  {app:<30} {per_package.pop(app, 0) / 1000:9.1f} ms')
+        for package in ('django', 'rest_framework'):
+            self.stdout.write(f'  {package:<30} {per_package.pop(package, 0) / 1000:9.1f} ms')
+        self.stdout.write(f'  {"other":<30} {sum(per_package.values()) / 1000:9.1f} ms')
@@ -0,0 +1,185 @@
+"""
+Request metrics shared by all worker processes.
+Every process keeps its counters and histograms in memory and writes them to its own JSON file in METRICS_DIR
+at most once per METRICS_FLUSH_INTERVAL seconds. The /metrics endpoint merges all files into the Prometheus text format.
+Files of processes that have exited are folded into one file when metrics are collected.
+"""
+import fcntl
+import json
+import os
+import re
+import threading
+import time
+from django.conf import settings
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000)
+
+# Values of processes that have exited, see retire_dead
+RETIRED_FILE = 'metrics_retired.json'
+
+METRICS = {
+    'bdfood_http_requests_total': ('counter', 'HTTP requests by route, method and status.', None),
+    'bdfood_http_request_duration_seconds': ('histogram', 'HTTP request latency in seconds.', DURATION_BUCKETS),
+    'bdfood_http_response_size_bytes': ('histogram', 'HTTP response body size in bytes.', SIZE_BUCKETS),
+}
+
+
+class MetricsStore:
+    """
+    In-process metric values, keyed by metric name and a sorted label tuple.
+    Counters hold a number, histograms hold [bucket counts..., sum, count].
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {}
+        self.last_flush = 0.0
+
+    def inc(self, name, labels, amount=1):
+        key = self.key(name, labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def observe(self, name, labels, value):
+        buckets = METRICS[name][2]
+        key = self.key(name, labels)
+        with self.lock:
+            series = self.values.get(key)
+            if series is None:
+                series = self.values[key] = [0] * (len(buckets) + 2)
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def key(self, name, labels):
+        return json.dumps([name, sorted(labels.items())])
+
+    def flush(self, force=False):
+        """
+        Write this process's values to its file if the flush interval has passed.
+        """
+        now = time.monotonic()
+        if not force and now - self.last_flush < settings.METRICS_FLUSH_INTERVAL:
+            return
+        with self.lock:
+            snapshot = json.dumps(self.values)
+            self.last_flush = now
+        directory = settings.METRICS_DIR
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'metrics_{os.getpid()}.json')
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'w') as handle:
+            handle.write(snapshot)
+        os.replace(temp_path, path)
+
+
+store = MetricsStore()
+
+
+def merge(merged, values):
+    """
+    Add the values of one file into `merged`.
+    """
+    for key, value in values.items():
+        if isinstance(value, list):
+            current = merged.setdefault(key, [0] * len(value))
+            merged[key] = [a + b for a, b in zip(current, value)]
+        else:
+            merged[key] = merged.get(key, 0) + value
+
+
+def read(path):
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return {}
+
+
+def is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def retire_dead(directory):
+    """
+    Fold the files of processes that have exited into metrics_retired.json and remove them, so files do
+    not pile up while the merged counters keep growing. A file is renamed before it is folded in, so only
+    one process can count it.
+    """
+    for filename in os.listdir(directory):
+        match = re.fullmatch(r'metrics_(\d+)\.json', filename)
+        if not match or is_running(int(match[1])):
+            continue
+        claimed = os.path.join(directory, f'{filename}.retiring')
+        try:
+            os.rename(os.path.join(directory, filename), claimed)
+        except OSError:
+            continue
+        with open(os.path.join(directory, 'retired.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            path = os.path.join(directory, RETIRED_FILE)
+            retired = read(path)
+            merge(retired, read(claimed))
+            with open(f'{path}.tmp', 'w') as handle:
+                json.dump(retired, handle)
+            os.replace(f'{path}.tmp', path)
+            os.remove(claimed)
+
+
+def collect():
+    """
+    Merge the files of every process, and of the processes that have exited, into one {key: value} dict.
+    """
+    store.flush(force=True)
+    directory = settings.METRICS_DIR
+    retire_dead(directory)
+    merged = {}
+    for filename in os.listdir(directory):
+        if filename.startswith('metrics_') and filename.endswith('.json'):
+            merge(merged, read(os.path.join(directory, filename)))
+    return merged
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in pairs) + '}'
+
+
+def render():
+    """
+    Render all metrics in the Prometheus text exposition format.
+    """
+    series = {}
+    for key, value in collect().items():
+        name, labels = json.loads(key)
+        series.setdefault(name, []).append(([tuple(pair) for pair in labels], value))
+
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in sorted(series.get(name, [])):
+            if kind == 'counter':
+                lines.append(f'{name}{format_labels(labels)} {value}')
+                continue
+            for bound, count in zip(buckets, value):
+                lines.append(f'{name}_bucket{format_labels(labels, le=bound)} {count}')
+            lines.append(f'{name}_bucket{format_labels(labels, le="+Inf")} {value[-1]}')
+            lines.append(f'{name}_sum{format_labels(labels)} {value[-2]}')
+            lines.append(f'{name}_count{format_labels(labels)} {value[-1]}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,47 @@
+import time
+from .metrics import store
+from .profiling import requested_profile, run_profiled, sampled, staff_user
+
+
+class MetricsMiddleware:
+    """
+    Records latency, response size and status of every request.
+    Requests are labelled by the matched URL pattern, not the raw path, to keep the number of series small.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        route = match.route if match else 'unmatched'
+        if route == 'metrics':
+            return response
+        labels = {'route': route, 'method': request.method}
+        store.inc('bdfood_http_requests_total', dict(labels, status=str(response.status_code)))
+        store.observe('bdfood_http_request_duration_seconds', labels, duration)
+        if not response.streaming:
+            store.observe('bdfood_http_response_size_bytes', labels, len(response.content))
+        store.flush()
+        return response
+
+
+class ProfilerMiddleware:
+    """
+    Runs a request under the profiler when a staff user asks for it, or when it is picked by sampling.
+    Every other request only pays for a header check and a counter increment.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        user = staff_user(request) if requested_profile(request) else None
+        is_sample = user is None and sampled(request)
+        if user is None and not is_sample:
+            return self.get_response(request)
+        return run_profiled(self.get_response, request, user, is_sample)
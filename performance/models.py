@@ -0,0 +1,20 @@
+from django.db import models
+
+
+class RequestProfile(models.Model):
+    """
+    This model records a request that ran under the profiler. The pstats file is stored in PROFILER_DIR.
+    """
+    view_name = models.CharField(max_length=255, db_index=True)
+    route = models.CharField(max_length=255)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=2048)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    sampled = models.BooleanField(default=False)
+    requested_by = models.CharField(max_length=255, blank=True)
+    file = models.CharField(max_length=1024)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.method} {self.view_name} ({self.duration_ms:.0f} ms)"
@@ -0,0 +1,84 @@
+"""
+On-demand request profiling.
+Staff users add `X-Profile: 1` or `?profile=1` to a request to run it under cProfile. With PROFILER_SAMPLE_RATE = N,
+one in every N requests is profiled as well. Profiles are pstats files, readable with `python -m pstats`, snakeviz or
+flameprof, and are listed in the admin. cProfile records caller/callee totals rather than stacks, so no collapsed-stack
+file is written; `flameprof --format=log <file>` derives one from the pstats file for flame graph tools.
+Only staff who asked for the profile get the X-Profile-Id header; sampled responses do not carry it.
+"""
+import cProfile
+import itertools
+import os
+import time
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+request_counter = itertools.count(1)
+
+
+def staff_user(request):
+    """
+    Return the staff user making the request, from the session or the API token, or None.
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        try:
+            result = TokenAuthentication().authenticate(request)
+        except AuthenticationFailed:
+            return None
+        user = result[0] if result else None
+    if user is not None and user.is_staff:
+        return user
+    return None
+
+
+def requested_profile(request):
+    return request.headers.get('X-Profile') == '1' or request.GET.get(settings.PROFILER_QUERY_PARAM) == '1'
+
+
+def sampled(request):
+    rate = settings.PROFILER_SAMPLE_RATE
+    return bool(rate) and next(request_counter) % rate == 0
+
+
+def profile_file(view_name):
+    directory = os.path.join(settings.PROFILER_DIR, view_name.replace(os.sep, '_'))
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f'{timezone.now():%Y%m%d-%H%M%S-%f}-{os.getpid()}.prof')
+
+
+def run_profiled(get_response, request, user, is_sample):
+    """
+    Run the request under cProfile, save the stats and record a RequestProfile.
+    """
+    from .models import RequestProfile
+
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        response = get_response(request)
+    finally:
+        profiler.disable()
+    duration_ms = (time.perf_counter() - start) * 1000
+
+    match = getattr(request, 'resolver_match', None)
+    view_name = match.view_name if match else 'unmatched'
+    path = profile_file(view_name)
+    profiler.dump_stats(path)
+    profile = RequestProfile.objects.create(
+        view_name=view_name,
+        route=match.route if match else '',
+        method=request.method,
+        path=request.get_full_path()[:2048],
+        status_code=response.status_code,
+        duration_ms=duration_ms,
+        sampled=is_sample,
+        requested_by=user.email if user else '',
+        file=path,
+    )
+    if user is not None:
+        response['X-Profile-Id'] = str(profile.id)
+    return response
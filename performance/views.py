@@ -0,0 +1,16 @@
+import hmac
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from .metrics import render
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint. Requests need `Authorization: Bearer <METRICS_TOKEN>`, or a logged-in
+    staff session in the browser. Without METRICS_TOKEN only staff can read it.
+    """
+    token = settings.METRICS_TOKEN
+    authorized = bool(token) and hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
+    if not authorized and not request.user.is_staff:
+        return HttpResponseForbidden()
+    return HttpResponse(render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,91 @@
+"""
+Warm-up of the per-process state the first request would otherwise build: compiled URL patterns,
+serializer field maps and model metadata. Databases are only checked for reachability; every
+connection opened here is closed again, as connections are per thread and not safe to share across a fork.
+Promotion evaluators and owner dashboard caches are not warmed: they are built per restaurant or per owner
+on first use, and filling them here would query every restaurant at each worker start. Add a callable to
+WARMUP_CALLABLES to warm a few of them.
+Called from bdfood/wsgi.py and bdfood/asgi.py; set BDFOOD_WARMUP=0 to skip it.
+"""
+import importlib
+import inspect
+import logging
+import time
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.urls import URLResolver, get_resolver
+from django.utils.module_loading import import_string
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+PROJECT_APPS = ['account', 'restaurant', 'orders', 'payment', 'performance', 'audit', 'promotions']
+
+
+def warm_urls():
+    """
+    Populate the resolver's reverse dict and compile every pattern's regex.
+    """
+    def walk(resolver):
+        for pattern in resolver.url_patterns:
+            pattern.pattern.regex
+            if isinstance(pattern, URLResolver):
+                walk(pattern)
+
+    resolver = get_resolver()
+    resolver.reverse_dict
+    walk(resolver)
+
+
+def warm_serializers():
+    """
+    Build the fields of every serializer in the project apps once, which fills the model metadata caches they use.
+    """
+    for app in PROJECT_APPS:
+        try:
+            module = importlib.import_module(f'{app}.serializers')
+        except ImportError:
+            continue
+        for _, serializer_class in inspect.getmembers(module, inspect.isclass):
+            if issubclass(serializer_class, serializers.BaseSerializer) and serializer_class.__module__ == module.__name__:
+                serializer_class().fields
+
+
+def warm_models():
+    for model in apps.get_models():
+        model._meta.get_fields()
+
+
+def check_databases():
+    """
+    Check that every database can be reached. The connections are not kept: they belong to this
+    thread, which does not serve requests, and must not be inherited by forked workers.
+    """
+    for alias in connections:
+        connections[alias].ensure_connection()
+
+
+def warm_up():
+    """
+    Run every warm-up step and return {step: seconds}. Failures are logged, never raised,
+    so a missing database does not stop the worker from starting. Closes the connections it opened.
+    """
+    steps = [
+        ('url resolver', warm_urls),
+        ('serializer fields', warm_serializers),
+        ('database check', check_databases),
+        ('model metadata', warm_models),
+    ]
+    steps += [(path, import_string(path)) for path in getattr(settings, 'WARMUP_CALLABLES', [])]
+
+    timings = {}
+    for name, step in steps:
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            logger.warning("Warm-up step '%s' failed.", name, exc_info=True)
+        timings[name] = time.perf_counter() - start
+    connections.close_all()
+    return timings
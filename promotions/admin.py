@@ -0,0 +1,31 @@
+from django.contrib import admin
+from .models import Coupon, Promotion
+
+# Register your models here.
+class CouponInline(admin.TabularInline):
+    model = Coupon
+    readonly_fields = ['times_redeemed']
+    ordering = ['id']
+    extra = 0
+
+
+@admin.register(Promotion)
+class PromotionAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'restaurant', 'kind', 'value', 'requires_coupon', 'is_active', 'starts_at', 'ends_at']
+    list_select_related = ['restaurant']
+    list_filter = ['kind', 'is_active']
+    search_fields = ['name']
+    autocomplete_fields = ['restaurant']
+    raw_id_fields = ['item', 'category']
+    ordering = ['id']
+    inlines = [CouponInline]
+
+
+@admin.register(Coupon)
+class CouponAdmin(admin.ModelAdmin):
+    list_display = ['code', 'promotion', 'times_redeemed', 'usage_limit', 'is_active']
+    list_select_related = ['promotion']
+    search_fields = ['=code']
+    raw_id_fields = ['promotion']
+    readonly_fields = ['times_redeemed']
+    ordering = ['id']
@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
+
+
+class PromotionsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'promotions'
+
+    def ready(self):
+        from .engine import promotion_changed
+        from .models import Promotion
+        post_save.connect(promotion_changed, sender=Promotion)
+        post_delete.connect(promotion_changed, sender=Promotion)
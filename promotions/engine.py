@@ -0,0 +1,167 @@
+"""
+Checkout discounts. The promotions of a restaurant are compiled once into an Evaluator that indexes its
+rules by item and category and is kept in process memory. Saving or deleting a promotion bumps the
+restaurant's PromotionVersion row, and every process rebuilds evaluators built for an older version on
+next use. Changes made with queryset.update() send no signal; evaluators are also rebuilt after
+PROMOTION_EVALUATOR_TTL seconds so those show up eventually.
+"""
+import time
+from collections import defaultdict
+from decimal import Decimal
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import Coupon, Promotion, PromotionVersion
+
+CENT = Decimal('0.01')
+
+# restaurant id -> (version, built at, evaluator)
+_evaluators = {}
+
+
+class CouponUnavailable(Exception):
+    """
+    Raised when a coupon has been used up or switched off since the cart was priced.
+    """
+    def __init__(self, code):
+        super().__init__(f"Coupon {code} can no longer be used.")
+        self.code = code
+
+
+class Rule:
+    """
+    A promotion reduced to the fields the evaluator needs.
+    """
+    __slots__ = ('id', 'name', 'kind', 'value', 'item_id', 'category_id', 'group', 'free', 'min_subtotal',
+                 'requires_coupon', 'starts_at', 'ends_at')
+
+    def __init__(self, promotion):
+        self.id = promotion.id
+        self.name = promotion.name
+        self.kind = promotion.kind
+        self.value = promotion.value
+        self.item_id = promotion.item_id
+        self.category_id = promotion.category_id
+        self.group = promotion.buy_quantity + promotion.free_quantity
+        self.free = promotion.free_quantity
+        self.min_subtotal = promotion.min_subtotal
+        self.requires_coupon = promotion.requires_coupon
+        self.starts_at = promotion.starts_at
+        self.ends_at = promotion.ends_at
+
+    def is_live(self, now):
+        return (self.starts_at is None or self.starts_at <= now) and (self.ends_at is None or now < self.ends_at)
+
+
+class Evaluator:
+    """
+    Applies the promotions of one restaurant to a cart.
+    """
+
+    def __init__(self, promotions):
+        self.rules = [Rule(promotion) for promotion in promotions]
+        self.by_item = defaultdict(list)
+        self.by_category = defaultdict(list)
+        self.menu_wide = []
+        for rule in self.rules:
+            if rule.item_id is not None:
+                self.by_item[rule.item_id].append(rule)
+            elif rule.category_id is not None:
+                self.by_category[rule.category_id].append(rule)
+            else:
+                self.menu_wide.append(rule)
+
+    def evaluate(self, lines, promotion_id=None, now=None):
+        """
+        Price cart `lines` of (item id, category id, quantity, unit price) in one pass.
+        `promotion_id` is the promotion of the coupon given at checkout, if any.
+        Returns (discount, applied) where applied lists {"promotion", "name", "discount"} per promotion used.
+        """
+        now = now or timezone.now()
+        live = {rule.id for rule in self.rules if rule.is_live(now) and (not rule.requires_coupon or rule.id == promotion_id)}
+        if not live:
+            return Decimal('0.00'), []
+
+        subtotal = Decimal(0)
+        matched = defaultdict(Decimal)
+        free = defaultdict(Decimal)
+        for item_id, category_id, quantity, price in lines:
+            amount = price * quantity
+            subtotal += amount
+            for rules in (self.by_item.get(item_id, ()), self.by_category.get(category_id, ()), self.menu_wide):
+                for rule in rules:
+                    if rule.id not in live:
+                        continue
+                    matched[rule.id] += amount
+                    if rule.kind == 'buy_x_get_y' and rule.group:
+                        free[rule.id] += quantity // rule.group * rule.free * price
+
+        discount = Decimal(0)
+        applied = []
+        for rule in self.rules:
+            if rule.id not in matched or subtotal < rule.min_subtotal:
+                continue
+            if rule.kind == 'percent':
+                amount = matched[rule.id] * rule.value / 100
+            elif rule.kind == 'amount':
+                amount = min(rule.value, matched[rule.id])
+            else:
+                amount = free[rule.id]
+            amount = amount.quantize(CENT)
+            if amount > 0:
+                applied.append({"promotion": rule.id, "name": rule.name, "discount": amount})
+                discount += amount
+        return min(discount, subtotal).quantize(CENT), applied
+
+
+def promotion_changed(sender, instance, **kwargs):
+    """
+    Signal receiver: make every process rebuild the evaluator of the promotion's restaurant.
+    The row is created by evaluator_for; without it no evaluator has been built that could be stale.
+    """
+    PromotionVersion.objects.filter(restaurant_id=instance.restaurant_id).update(version=F('version') + 1)
+
+
+def evaluator_for(restaurant_id):
+    """
+    Return the evaluator of a restaurant, building it when its promotions changed or it is too old.
+    Costs one primary key lookup when the evaluator is current.
+    """
+    version = PromotionVersion.objects.filter(restaurant_id=restaurant_id).values_list('version', flat=True).first()
+    if version is None:
+        PromotionVersion.objects.bulk_create([PromotionVersion(restaurant_id=restaurant_id)], ignore_conflicts=True)
+        version = PromotionVersion.objects.filter(restaurant_id=restaurant_id).values_list('version', flat=True).first()
+    cached = _evaluators.get(restaurant_id)
+    if cached is not None and cached[0] == version and time.monotonic() - cached[1] < settings.PROMOTION_EVALUATOR_TTL:
+        return cached[2]
+    # The version is read before the promotions, so a change in between only causes one more rebuild
+    promotions = Promotion.objects.filter(restaurant_id=restaurant_id, is_active=True).exclude(ends_at__lte=timezone.now()).order_by('id')
+    evaluator = Evaluator(promotions)
+    _evaluators[restaurant_id] = (version, time.monotonic(), evaluator)
+    return evaluator
+
+
+def find_coupon(code, restaurant_id):
+    """
+    Return the active coupon with `code` for a restaurant, or None.
+    """
+    return Coupon.objects.filter(code=code, is_active=True, promotion__restaurant_id=restaurant_id, promotion__is_active=True).first()
+
+
+def redeem(coupon):
+    """
+    Count one use of a coupon, raising CouponUnavailable when it is used up or switched off.
+    The limit is checked by the UPDATE itself; call inside the transaction that places the order.
+    """
+    updated = Coupon.objects.filter(id=coupon.id, is_active=True).filter(
+        Q(usage_limit__isnull=True) | Q(times_redeemed__lt=F('usage_limit')),
+    ).update(times_redeemed=F('times_redeemed') + 1)
+    if not updated:
+        raise CouponUnavailable(coupon.code)
+
+
+def release(coupon):
+    """
+    Give back a use counted by redeem() for an order that was not placed after all.
+    """
+    Coupon.objects.filter(id=coupon.id, times_redeemed__gt=0).update(times_redeemed=F('times_redeemed') - 1)
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.1 on 2026-10-19 18:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('account', '0006_user_role_index'),
+        ('restaurant', '0007_item_stock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Promotion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('kind', models.CharField(choices=[('percent', 'Percentage off'), ('amount', 'Amount off'), ('buy_x_get_y', 'Buy X get Y')], max_length=20)),
+                ('value', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('buy_quantity', models.PositiveIntegerField(default=0)),
+                ('free_quantity', models.PositiveIntegerField(default=0)),
+                ('min_subtotal', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('requires_coupon', models.BooleanField(default=False)),
+                ('is_active', models.BooleanField(default=True)),
+                ('starts_at', models.DateTimeField(blank=True, null=True)),
+                ('ends_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='restaurant.category')),
+                ('item', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='restaurant.item')),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='promotions', to='account.restaurant')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Coupon',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=50, unique=True)),
+                ('usage_limit', models.PositiveIntegerField(blank=True, null=True)),
+                ('times_redeemed', models.PositiveIntegerField(default=0)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('promotion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='coupons', to='promotions.promotion')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='promotion',
+            index=models.Index(fields=['restaurant', 'is_active'], name='promotions__restaur_6a9bdd_idx'),
+        ),
+    ]
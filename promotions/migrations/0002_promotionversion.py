@@ -0,0 +1,22 @@
+# Generated by Django 5.1.1 on 2026-10-19 18:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0006_user_role_index'),
+        ('promotions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PromotionVersion',
+            fields=[
+                ('restaurant', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='account.restaurant')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
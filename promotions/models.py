@@ -0,0 +1,66 @@
+from django.db import models
+from account.models import Restaurant
+from restaurant.models import Category, Item
+
+
+class Promotion(models.Model):
+    """
+    A discount a restaurant applies at checkout. Promotions that require a coupon only apply to orders
+    that present one of their codes, the others to every order that matches.
+    The matching lines are one item, one category, or the whole menu when neither is set.
+    - percent: `value` percent off the matching lines.
+    - amount: `value` off the matching lines, at most their subtotal.
+    - buy_x_get_y: of every `buy_quantity` + `free_quantity` units of a matching item, `free_quantity` are free.
+    """
+    KINDS = [('percent', 'Percentage off'), ('amount', 'Amount off'), ('buy_x_get_y', 'Buy X get Y')]
+
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='promotions')
+    name = models.CharField(max_length=100)
+    kind = models.CharField(max_length=20, choices=KINDS)
+    value = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    buy_quantity = models.PositiveIntegerField(default=0)
+    free_quantity = models.PositiveIntegerField(default=0)
+    # The cart subtotal at the restaurant an order needs before the promotion applies
+    min_subtotal = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    requires_coupon = models.BooleanField(default=False)
+    is_active = models.BooleanField(default=True)
+    starts_at = models.DateTimeField(null=True, blank=True)
+    ends_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['restaurant', 'is_active'])]
+
+    def __str__(self):
+        return self.name
+
+
+class Coupon(models.Model):
+    """
+    A code that unlocks a promotion. `times_redeemed` only changes through `promotions.engine.redeem`,
+    which checks it against `usage_limit` in the same UPDATE, and `promotions.engine.release`.
+    """
+    promotion = models.ForeignKey(Promotion, on_delete=models.CASCADE, related_name='coupons')
+    code = models.CharField(max_length=50, unique=True)
+    # None means the coupon can be used any number of times
+    usage_limit = models.PositiveIntegerField(null=True, blank=True)
+    times_redeemed = models.PositiveIntegerField(default=0)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.code
+
+
+class PromotionVersion(models.Model):
+    """
+    Counter bumped whenever a promotion of the restaurant is saved or deleted. Every process compares it
+    with the version its compiled evaluator was built from, see `promotions.engine.evaluator_for`.
+    """
+    restaurant = models.OneToOneField(Restaurant, on_delete=models.CASCADE, primary_key=True, related_name='+')
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Promotions of restaurant {self.restaurant_id}, version {self.version}"
@@ -0,0 +1,46 @@
+from rest_framework import serializers
+from .models import Coupon, Promotion
+
+
+class CouponSerializer(serializers.ModelSerializer):
+    """
+    Serializes a coupon code with its usage limit and how often it has been used.
+    """
+    class Meta:
+        model = Coupon
+        fields = ['id', 'code', 'usage_limit', 'times_redeemed', 'is_active', 'created_at']
+        read_only_fields = ['times_redeemed']
+
+
+class PromotionSerializer(serializers.ModelSerializer):
+    """
+    Serializes a promotion of the restaurant passed in the context, with its coupons.
+    Checks that the fields needed by its kind are set and that the item or category belongs to the restaurant.
+    """
+    coupons = CouponSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Promotion
+        fields = ['id', 'name', 'kind', 'value', 'item', 'category', 'buy_quantity', 'free_quantity', 'min_subtotal',
+                  'requires_coupon', 'is_active', 'starts_at', 'ends_at', 'created_at', 'coupons']
+
+    def validate(self, attrs):
+        data = {field: getattr(self.instance, field) for field in self.Meta.fields if self.instance is not None and hasattr(self.instance, field)}
+        data.update(attrs)
+        restaurant = self.context['restaurant']
+        if data.get('item') and data.get('category'):
+            raise serializers.ValidationError("Set either item or category, not both.")
+        if data.get('item') and data['item'].restaurant_id != restaurant.id:
+            raise serializers.ValidationError("The item does not belong to this restaurant.")
+        if data.get('category') and data['category'].restaurant_id != restaurant.id:
+            raise serializers.ValidationError("The category does not belong to this restaurant.")
+        kind, value = data.get('kind'), data.get('value') or 0
+        if kind == 'percent' and not 0 < value <= 100:
+            raise serializers.ValidationError("A percentage promotion needs a value between 0 and 100.")
+        if kind == 'amount' and value <= 0:
+            raise serializers.ValidationError("An amount promotion needs a positive value.")
+        if kind == 'buy_x_get_y' and (not data.get('buy_quantity') or not data.get('free_quantity')):
+            raise serializers.ValidationError("A buy X get Y promotion needs buy_quantity and free_quantity.")
+        if data.get('starts_at') and data.get('ends_at') and data['ends_at'] <= data['starts_at']:
+            raise serializers.ValidationError("ends_at must be after starts_at.")
+        return attrs
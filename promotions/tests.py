@@ -0,0 +1,108 @@
+from decimal import Decimal
+from django.test import TestCase
+from rest_framework.test import APIClient
+from account.models import Restaurant, User
+from orders.models import Cart, CartItem, Order
+from restaurant.models import Category, Item
+from .engine import CouponUnavailable, _evaluators, evaluator_for, redeem, release
+from .models import Coupon, Promotion
+
+
+class PromotionTestCase(TestCase):
+    """
+    A restaurant with one item and a 10 percent promotion unlocked by a coupon.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner@example.com', 'Owner', 'Test', '0100', 'pass', role='owner')
+        cls.customer = User.objects.create_user('customer@example.com', 'Customer', 'Test', '0101', 'pass', role='customer')
+        cls.restaurant = Restaurant.objects.create(name='Test', location='Cairo', owner=cls.owner)
+        category = Category.objects.create(name='Mains', slug='mains', restaurant=cls.restaurant)
+        cls.item = Item.objects.create(category=category, restaurant=cls.restaurant, name='Koshary', details='Koshary', price='20.00', stock=10)
+        cls.promotion = Promotion.objects.create(restaurant=cls.restaurant, name='Ten off', kind='percent', value=10, requires_coupon=True)
+
+    def setUp(self):
+        # Evaluators are cached per process and ids are reused between tests
+        _evaluators.clear()
+
+    def create_coupon(self, code='SAVE10', **fields):
+        return Coupon.objects.create(promotion=self.promotion, code=code, **fields)
+
+    def times_redeemed(self, coupon):
+        return Coupon.objects.values_list('times_redeemed', flat=True).get(id=coupon.id)
+
+
+class RedeemTests(PromotionTestCase):
+
+    def test_coupon_is_refused_once_its_limit_is_reached(self):
+        coupon = self.create_coupon(usage_limit=2)
+        redeem(coupon)
+        redeem(coupon)
+        with self.assertRaises(CouponUnavailable):
+            redeem(coupon)
+        self.assertEqual(self.times_redeemed(coupon), 2)
+
+    def test_limit_is_checked_against_the_stored_count(self):
+        coupon = self.create_coupon(usage_limit=1)
+        # Another checkout used it after this one loaded the coupon
+        Coupon.objects.filter(id=coupon.id).update(times_redeemed=1)
+        with self.assertRaises(CouponUnavailable):
+            redeem(coupon)
+
+    def test_coupon_without_limit_and_switched_off_coupon(self):
+        unlimited = self.create_coupon('UNLIMITED')
+        for _ in range(5):
+            redeem(unlimited)
+        self.assertEqual(self.times_redeemed(unlimited), 5)
+
+        inactive = self.create_coupon('OFF', is_active=False)
+        with self.assertRaises(CouponUnavailable):
+            redeem(inactive)
+
+    def test_release_gives_a_use_back(self):
+        coupon = self.create_coupon(usage_limit=1)
+        redeem(coupon)
+        release(coupon)
+        redeem(coupon)
+        self.assertEqual(self.times_redeemed(coupon), 1)
+
+
+class EvaluatorTests(PromotionTestCase):
+
+    def lines(self, quantity=2):
+        return [(self.item.id, self.item.category_id, quantity, Decimal('20.00'))]
+
+    def test_coupon_promotion_only_applies_with_its_coupon(self):
+        self.assertEqual(evaluator_for(self.restaurant.id).evaluate(self.lines()), (Decimal('0.00'), []))
+        discount, applied = evaluator_for(self.restaurant.id).evaluate(self.lines(), self.promotion.id)
+        self.assertEqual(discount, Decimal('4.00'))
+        self.assertEqual([promotion['promotion'] for promotion in applied], [self.promotion.id])
+
+    def test_saved_promotion_rebuilds_the_evaluator(self):
+        evaluator = evaluator_for(self.restaurant.id)
+        Promotion.objects.create(restaurant=self.restaurant, name='Five off', kind='amount', value=5)
+        self.assertIsNot(evaluator_for(self.restaurant.id), evaluator)
+        self.assertEqual(evaluator_for(self.restaurant.id).evaluate(self.lines())[0], Decimal('5.00'))
+
+
+class CheckoutCouponTests(PromotionTestCase):
+
+    def checkout(self, code):
+        client = APIClient()
+        client.force_authenticate(self.customer)
+        cart, _ = Cart.objects.get_or_create(customer=self.customer)
+        CartItem.objects.create(cart=cart, item=self.item, quantity=1)
+        return client.post('/api/v1/order/cart/confirm/', {'coupon': code}, format='json')
+
+    def test_used_up_coupon_places_no_order_and_takes_no_stock(self):
+        self.create_coupon(usage_limit=1)
+        response = self.checkout('SAVE10')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['data']['discount'], '2.00')
+
+        Cart.objects.filter(customer=self.customer).delete()
+        response = self.checkout('SAVE10')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(Item.objects.values_list('stock', flat=True).get(id=self.item.id), 9)
@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import PromotionsView,PromotionView,CouponsView
+
+urlpatterns = [
+    path('<int:restaurant_id>/', PromotionsView.as_view()),
+    path('<int:restaurant_id>/<int:promotion_id>/', PromotionView.as_view()),
+    path('<int:restaurant_id>/<int:promotion_id>/coupons/', CouponsView.as_view()),
+]
@@ -0,0 +1,99 @@
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+from account.models import Restaurant
+from audit.buffer import record, snapshot, diff
+from .models import Promotion
+from .serializers import CouponSerializer, PromotionSerializer
+
+
+def owned_restaurant(request, restaurant_id):
+    """
+    Return (restaurant, error response) for a restaurant the user owns.
+    """
+    try:
+        return Restaurant.objects.get(id=restaurant_id, owner=request.user), None
+    except Restaurant.DoesNotExist:
+        return None, Response({"error": "Restaurant not found or not owned by you."}, status=status.HTTP_404_NOT_FOUND)
+
+
+# View for the promotions of a restaurant.
+class PromotionsView(APIView):
+    """
+    API for owners to list and create the promotions of their restaurant.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, restaurant_id):
+        restaurant, error = owned_restaurant(request, restaurant_id)
+        if error:
+            return error
+        promotions = Promotion.objects.filter(restaurant=restaurant).prefetch_related('coupons').order_by('-id')
+        return Response(PromotionSerializer(promotions, many=True, context={'restaurant': restaurant}).data, status=status.HTTP_200_OK)
+
+    def post(self, request, restaurant_id):
+        restaurant, error = owned_restaurant(request, restaurant_id)
+        if error:
+            return error
+        serializer = PromotionSerializer(data=request.data, context={'restaurant': restaurant})
+        if serializer.is_valid():
+            promotion = serializer.save(restaurant=restaurant)
+            record(request.user, restaurant, 'promotion.create', promotion, diff({}, snapshot(promotion)))
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+# View for one promotion.
+class PromotionView(APIView):
+    """
+    API for owners to change or delete a promotion. Changes apply to the next checkout.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get_promotion(self, request, restaurant_id, promotion_id):
+        restaurant, error = owned_restaurant(request, restaurant_id)
+        if error:
+            return None, None, error
+        try:
+            return restaurant, Promotion.objects.get(id=promotion_id, restaurant=restaurant), None
+        except Promotion.DoesNotExist:
+            return None, None, Response({"error": "Promotion not found."}, status=status.HTTP_404_NOT_FOUND)
+
+    def put(self, request, restaurant_id, promotion_id):
+        restaurant, promotion, error = self.get_promotion(request, restaurant_id, promotion_id)
+        if error:
+            return error
+        before = snapshot(promotion)
+        serializer = PromotionSerializer(promotion, data=request.data, partial=True, context={'restaurant': restaurant})
+        if serializer.is_valid():
+            promotion = serializer.save()
+            record(request.user, restaurant, 'promotion.update', promotion, diff(before, snapshot(promotion)))
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    def delete(self, request, restaurant_id, promotion_id):
+        restaurant, promotion, error = self.get_promotion(request, restaurant_id, promotion_id)
+        if error:
+            return error
+        record(request.user, restaurant, 'promotion.delete', promotion, diff(snapshot(promotion), {}))
+        promotion.delete()
+        return Response({"message": "Promotion deleted."}, status=status.HTTP_200_OK)
+
+
+# View for the coupons of a promotion.
+class CouponsView(PromotionView):
+    """
+    API for owners to add a coupon code to a promotion.
+    """
+
+    def post(self, request, restaurant_id, promotion_id):
+        restaurant, promotion, error = self.get_promotion(request, restaurant_id, promotion_id)
+        if error:
+            return error
+        serializer = CouponSerializer(data=request.data)
+        if serializer.is_valid():
+            coupon = serializer.save(promotion=promotion)
+            record(request.user, restaurant, 'coupon.create', coupon, diff({}, snapshot(coupon)))
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
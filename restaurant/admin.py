@@ -1,7 +1,45 @@
 from django.contrib import admin
-from .models import Category,Item,EmployeePermission
+from performance.paginator import EstimatedCountPaginator
+from .models import Category,Item,EmployeePermission,MenuChange
 
 # Register your models here.
-admin.site.register(Category)
-admin.site.register(EmployeePermission)
-admin.site.register(Item)
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'restaurant']
+    list_select_related = ['restaurant']
+    search_fields = ['name']
+    autocomplete_fields = ['restaurant']
+    ordering = ['id']
+
+
+@admin.register(EmployeePermission)
+class EmployeePermissionAdmin(admin.ModelAdmin):
+    list_display = ['employee', 'restaurant', 'can_create', 'can_update', 'can_delete', 'can_manage_orders']
+    list_select_related = ['employee', 'restaurant']
+    autocomplete_fields = ['employee', 'restaurant']
+
+
+@admin.register(Item)
+class ItemAdmin(admin.ModelAdmin):
+    """
+    Items are listed with their restaurant and category in the same query. The restaurant is copied
+    from the category on save, so it is not edited here.
+    """
+    list_display = ['id', 'name', 'restaurant', 'category', 'price', 'stock', 'is_available']
+    list_select_related = ['restaurant', 'category']
+    search_fields = ['name']
+    autocomplete_fields = ['category']
+    raw_id_fields = ['source_item']
+    readonly_fields = ['restaurant']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(MenuChange)
+class MenuChangeAdmin(admin.ModelAdmin):
+    list_display = ['id', 'restaurant', 'kind', 'object_id', 'action', 'created_at']
+    list_select_related = ['restaurant']
+    raw_id_fields = ['restaurant']
+    date_hierarchy = 'created_at'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
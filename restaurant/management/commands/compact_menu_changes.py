@@ -0,0 +1,35 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+from django.utils import timezone
+from restaurant.models import MenuChange, MenuCompaction
+
+
+class Command(BaseCommand):
+    """
+    Drop menu changes older than the retention window and move the compaction watermark up.
+    Clients that last synced before the watermark get a full menu on their next sync.
+    """
+    help = "Compact the menu change log used by menu sync."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.MENU_CHANGE_RETENTION_DAYS)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        watermark = MenuChange.objects.filter(created_at__lt=cutoff).aggregate(version=Max('id'))['version']
+        if watermark is None:
+            self.stdout.write("Nothing to compact.")
+            return
+
+        # Record the watermark before deleting so a sync never reads a partly compacted log as complete
+        MenuCompaction.objects.create(version=watermark)
+        deleted = 0
+        while True:
+            ids = list(MenuChange.objects.filter(id__lte=watermark).values_list('id', flat=True)[:options['batch_size']])
+            if not ids:
+                break
+            deleted += MenuChange.objects.filter(id__in=ids).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} menu changes up to version {watermark}."))
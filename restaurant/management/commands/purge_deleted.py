@@ -0,0 +1,44 @@
+import time
+from django.core.management.base import BaseCommand
+from account.models import Restaurant
+from restaurant.models import Category
+from restaurant.purge import purge
+
+
+class Command(BaseCommand):
+    """
+    Remove soft-deleted restaurants and categories with everything that depends on them.
+    Rows are deleted in chunks, children first, each chunk in its own transaction, so the
+    database stays writable for requests while a large chain is purged.
+    """
+    help = "Purge soft-deleted restaurants and categories."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--pause', type=float, default=0.0, help='Seconds to sleep after each chunk.')
+
+    def handle(self, *args, **options):
+        self.pause = options['pause']
+        self.verbosity = options['verbosity']
+        self.totals = {}
+        started = time.monotonic()
+        for label, queryset in (
+            ('restaurants', Restaurant.all_objects.filter(is_deleted=True)),
+            ('categories', Category.all_objects.filter(is_deleted=True)),
+        ):
+            pending = queryset.count()
+            if pending:
+                self.stdout.write(f"Purging {pending} deleted {label}...")
+                purge(queryset, batch_size=options['batch_size'], progress=self.progress)
+
+        for (model, using), count in sorted(self.totals.items()):
+            self.stdout.write(f"  {model} on {using}: {count}")
+        self.stdout.write(self.style.SUCCESS(f"Deleted {sum(self.totals.values())} rows in {time.monotonic() - started:.1f}s."))
+
+    def progress(self, model, using, count):
+        key = (model._meta.label, using)
+        self.totals[key] = self.totals.get(key, 0) + count
+        if self.verbosity >= 2:
+            self.stdout.write(f"  {model._meta.label} on {using}: {self.totals[key]} deleted")
+        if self.pause:
+            time.sleep(self.pause)
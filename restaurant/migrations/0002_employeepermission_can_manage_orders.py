@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-19 17:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employeepermission',
+            name='can_manage_orders',
+            field=models.BooleanField(default=False),
+        ),
+    ]
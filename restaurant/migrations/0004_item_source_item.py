@@ -0,0 +1,24 @@
+# Generated by Django 5.1.1 on 2026-10-19 17:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0003_menu_change_log'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='source_item',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='clones', to='restaurant.item'),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='sync_price',
+            field=models.BooleanField(default=False),
+        ),
+    ]
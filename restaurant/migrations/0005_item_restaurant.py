@@ -0,0 +1,33 @@
+# Generated by Django 5.1.1 on 2026-10-19 17:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_restaurant(apps, schema_editor):
+    Category = apps.get_model('restaurant', 'Category')
+    Item = apps.get_model('restaurant', 'Item')
+    restaurant = Category.objects.filter(id=models.OuterRef('category_id')).values('restaurant_id')[:1]
+    Item.objects.using(schema_editor.connection.alias).update(restaurant_id=models.Subquery(restaurant))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0003_remove_restaurant_restaurant_id'),
+        ('restaurant', '0004_item_source_item'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='restaurant',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='items', to='account.restaurant'),
+        ),
+        migrations.RunPython(backfill_restaurant, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='item',
+            name='restaurant',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='account.restaurant'),
+        ),
+    ]
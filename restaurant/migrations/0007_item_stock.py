@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-19 17:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0006_category_is_deleted'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='is_available',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='stock',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
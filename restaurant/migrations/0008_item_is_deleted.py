@@ -0,0 +1,29 @@
+# Generated by Django 5.1.1 on 2026-10-19 18:16
+
+from django.db import migrations, models
+
+
+def mark_deleted_items(apps, schema_editor):
+    """
+    Flag the items of categories and restaurants that are already soft-deleted.
+    """
+    Item = apps.get_model('restaurant', 'Item')
+    items = Item.objects.using(schema_editor.connection.alias)
+    items.filter(models.Q(category__is_deleted=True) | models.Q(restaurant__is_deleted=True)).update(is_deleted=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0004_restaurant_is_deleted'),
+        ('restaurant', '0007_item_stock'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='is_deleted',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_deleted_items, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from account.models import User,Restaurant
+from account.managers import SoftDeleteManager
 
 
 
@@ -10,34 +11,98 @@ class Category(models.Model):
     name = models.CharField(max_length=50)
     slug = models.SlugField(max_length=50)
     restaurant=models.ForeignKey(Restaurant,on_delete=models.CASCADE)
+    # Deleted categories are hidden at once and purged in the background by `manage.py purge_deleted`.
+    is_deleted=models.BooleanField(default=False, db_index=True)
+
+    objects=SoftDeleteManager()
+    all_objects=models.Manager()
+
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if not adding:
+            # Items carry a copy of their category's restaurant, move them along with the category
+            self.items.exclude(restaurant_id=self.restaurant_id).update(restaurant_id=self.restaurant_id)
+
 class Item(models.Model):
     """
     This model represents a menu item that belongs to a category in a restaurant's menu.
     Each item has details like name, description, image, and price.
     """
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name="items")
+    # Copy of category.restaurant so restaurant-wide lookups need no join. Set from the category on save;
+    # code that bypasses save() (bulk_create, update) must set it itself.
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='items')
     name = models.CharField(max_length=255)
     details = models.TextField(max_length=500)
     image_url=models.CharField(max_length=255,null=True,blank=True)
     price = models.DecimalField(max_digits=6, decimal_places=2)
+    # Set on items copied by a menu clone. With sync_price, price changes of the source item are copied to the clone.
+    source_item = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='clones')
+    sync_price = models.BooleanField(default=False)
+    # Portions left, or None when the restaurant does not track stock for the item.
+    stock = models.PositiveIntegerField(null=True, blank=True)
+    is_available = models.BooleanField(default=True)
+    # Set together with the category or restaurant on soft delete, so menu queries need no join to filter.
+    is_deleted = models.BooleanField(default=False)
+
+    objects = SoftDeleteManager()
+    all_objects = models.Manager()
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        if self.category_id is not None:
+            self.restaurant_id = self.category.restaurant_id
+        super().save(*args, **kwargs)
+
 class EmployeePermission(models.Model):
     """
     This model stores the permissions assigned to an employee for a specific restaurant. 
-    Permissions include the ability to create, update, and delete categories or items.
+    Permissions include the ability to create, update, and delete categories or items,
+    and to work through the restaurant's kitchen order queue.
     """
     employee = models.OneToOneField(User, on_delete=models.CASCADE)
     restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE)
     can_create= models.BooleanField(default=False)
     can_update= models.BooleanField(default=False)
     can_delete= models.BooleanField(default=False)
+    can_manage_orders= models.BooleanField(default=False)
 
     def __str__(self):
         return f"Permissions for {self.employee.email} at {self.restaurant.name}"
-    
\ No newline at end of file
+    
+class MenuChange(models.Model):
+    """
+    Append-only log of menu edits. The id is the menu version clients sync from.
+    A restaurant's log only says which categories and items changed; their current state is read when syncing.
+    """
+    KINDS = [('category', 'Category'), ('item', 'Item')]
+    ACTIONS = [('upsert', 'Upsert'), ('delete', 'Delete')]
+
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='menu_changes')
+    kind = models.CharField(max_length=10, choices=KINDS)
+    object_id = models.PositiveIntegerField()
+    action = models.CharField(max_length=10, choices=ACTIONS)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['restaurant', 'id'])]
+
+    def __str__(self):
+        return f"{self.action} {self.kind} {self.object_id} at version {self.id}"
+
+class MenuCompaction(models.Model):
+    """
+    Records each compaction of the menu change log. Versions up to the latest `version`
+    are gone from the log, so clients behind it get a full snapshot.
+    """
+    version = models.PositiveBigIntegerField()
+    compacted_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Compacted up to version {self.version}"
@@ -0,0 +1,94 @@
+"""
+Bulk delete that follows on_delete rules with chunked, set-based statements instead of Django's collector.
+The collector loads every dependent row and sends delete signals per object first. This walks the same
+relations but only ever holds one chunk of primary keys. Dependents are deleted before their parents, and
+each chunk of each table runs in its own short transaction.
+No delete signals are sent. A run that stops halfway leaves whole rows only, and running it again continues.
+"""
+from django.db import DEFAULT_DB_ALIAS, models, transaction
+from django.db.models.deletion import get_candidate_relations_to_delete
+from orders.sharding import SHARDED_MODELS, order_aliases
+
+
+def child_aliases(model, using):
+    """
+    Return the aliases where rows of `model` pointing at a parent on `using` can live.
+    """
+    if model._meta.label_lower not in SHARDED_MODELS:
+        return [DEFAULT_DB_ALIAS]
+    if using in order_aliases() and using != DEFAULT_DB_ALIAS:
+        return [using]
+    return order_aliases()
+
+
+def purge(queryset, using=DEFAULT_DB_ALIAS, batch_size=1000, progress=None):
+    """
+    Delete every row of `queryset` and everything depending on it. Returns the number of rows deleted.
+    `progress(model, using, count)` is called after each deleted chunk.
+    """
+    model = queryset.model
+    deleted = 0
+    while True:
+        ids = list(queryset.using(using).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += purge_ids(model, ids, using, batch_size, progress)
+
+
+def purge_ids(model, ids, using, batch_size, progress):
+    deleted = 0
+    for relation in get_candidate_relations_to_delete(model._meta):
+        deleted += purge_relation(relation, model, ids, using, child_aliases(relation.related_model, using), batch_size, progress)
+
+    with transaction.atomic(using=using):
+        # Dependents are gone, so a plain DELETE is enough; this skips the collector
+        count = model._base_manager.using(using).filter(pk__in=ids)._raw_delete(using)
+    if progress is not None:
+        progress(model, using, count)
+    return deleted + count
+
+
+def update_chunked(queryset, using, values, batch_size):
+    while True:
+        ids = list(queryset.using(using).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return
+        with transaction.atomic(using=using):
+            queryset.model._base_manager.using(using).filter(pk__in=ids).update(**values)
+
+
+def purge_relation(relation, model, ids, using, aliases, batch_size, progress):
+    """
+    Apply the on_delete rule of one relation to the rows on `aliases` that point at `ids` of `model`.
+    """
+    on_delete = relation.on_delete
+    if on_delete is models.DO_NOTHING:
+        return 0
+    field = relation.field
+    target_values = ids
+    if not field.target_field.primary_key:
+        target_values = list(model._base_manager.using(using).filter(pk__in=ids).values_list(field.target_field.attname, flat=True))
+    deleted = 0
+    for alias in aliases:
+        dependents = relation.related_model._base_manager.filter(**{f'{field.name}__in': target_values})
+        if on_delete is models.CASCADE:
+            deleted += purge(dependents, alias, batch_size, progress)
+        elif on_delete is models.SET_NULL:
+            update_chunked(dependents, alias, {field.attname: None}, batch_size)
+        elif on_delete is models.SET_DEFAULT:
+            update_chunked(dependents, alias, {field.attname: field.get_default()}, batch_size)
+        else:
+            raise ValueError(f"Cannot purge {relation.related_model._meta.label}.{field.name}: unsupported on_delete.")
+    return deleted
+
+
+def purge_shard_dependents(model, ids, aliases, batch_size=1000):
+    """
+    Apply the on_delete rules of the sharded models pointing at `ids` of `model` on the shard `aliases`.
+    For rows deleted on 'default', whose cascade never reaches the shards.
+    """
+    deleted = 0
+    for relation in get_candidate_relations_to_delete(model._meta):
+        if relation.related_model._meta.label_lower in SHARDED_MODELS:
+            deleted += purge_relation(relation, model, ids, DEFAULT_DB_ALIAS, aliases, batch_size, None)
+    return deleted
@@ -32,11 +32,11 @@ class EmployeesSerializer(serializers.ModelSerializer):
         
 class EmployeePermissionSerializer(serializers.ModelSerializer):
     """
-    Serializes the permissions granted to an employee, including whether they can create, update, or delete items or categories.
+    Serializes the permissions granted to an employee, including whether they can create, update, or delete items or categories and manage orders.
     """
     class Meta:
         model = EmployeePermission
-        fields=['employee','restaurant','can_create','can_update','can_delete',]
+        fields=['employee','restaurant','can_create','can_update','can_delete','can_manage_orders',]
         
 class CategorySerializer(serializers.ModelSerializer):
     """
@@ -48,9 +48,9 @@ class CategorySerializer(serializers.ModelSerializer):
 
 class ItemSerializer(serializers.ModelSerializer):
     """
-    Serializes items belonging to a category, including details like name, description, image URL, price, and the category it belongs to.
+    Serializes items belonging to a category, including details like name, description, image URL, price, stock, availability and the category it belongs to.
     """
     class Meta:
         model = Item
-        fields=['id', 'name','details','image_url','price','category']
+        fields=['id', 'name','details','image_url','price','category','stock','is_available']
     
\ No newline at end of file
@@ -1,3 +1,116 @@
+from io import StringIO
+from django.core.management import call_command
+from django.db import transaction
 from django.test import TestCase
+from account.models import Restaurant, User
+from orders.models import Cart, CartItem, Order, OrderItem
+from .models import Category, Item
+from .utils import OutOfStock, release_stock, reserve_stock, soft_delete_category, soft_delete_restaurant
 
-# Create your tests here.
+
+class MenuTestCase(TestCase):
+    """
+    A restaurant with one category.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner@example.com', 'Owner', 'Test', '0100', 'pass', role='owner')
+        cls.restaurant = Restaurant.objects.create(name='Test', location='Cairo', owner=cls.owner)
+        cls.category = Category.objects.create(name='Mains', slug='mains', restaurant=cls.restaurant)
+
+    def create_item(self, name, stock=None, category=None, **fields):
+        category = category or self.category
+        return Item.objects.create(category=category, restaurant_id=category.restaurant_id, name=name, details=name, price='10.00', stock=stock, **fields)
+
+
+class StockReservationTests(MenuTestCase):
+
+    def stock(self, item):
+        return Item.all_objects.values_list('stock', flat=True).get(id=item.id)
+
+    def test_tracked_stock_is_taken(self):
+        tracked = self.create_item('Koshary', stock=5)
+        untracked = self.create_item('Bread')
+        reserve_stock([tracked, untracked], {tracked.id: 2, untracked.id: 10})
+        self.assertEqual(self.stock(tracked), 3)
+        self.assertIsNone(self.stock(untracked))
+
+    def test_short_or_unavailable_items_are_refused_before_any_update(self):
+        short = self.create_item('Koshary', stock=1)
+        unavailable = self.create_item('Falafel', is_available=False)
+        plenty = self.create_item('Bread', stock=10)
+        with self.assertRaises(OutOfStock) as raised:
+            reserve_stock([plenty, short, unavailable], {plenty.id: 1, short.id: 2, unavailable.id: 1})
+        self.assertEqual(raised.exception.items, sorted([short.id, unavailable.id]))
+        self.assertEqual(self.stock(plenty), 10)
+
+    def test_stock_taken_since_it_was_read_is_not_oversold(self):
+        first = self.create_item('Koshary', stock=5)
+        second = self.create_item('Falafel', stock=2)
+        # A concurrent checkout takes the last units after this one loaded the items
+        Item.objects.filter(id=second.id).update(stock=1)
+        with self.assertRaises(OutOfStock) as raised:
+            with transaction.atomic():
+                reserve_stock([first, second], {first.id: 1, second.id: 2})
+        self.assertEqual(raised.exception.items, [second.id])
+        self.assertEqual(self.stock(first), 5)
+        self.assertEqual(self.stock(second), 1)
+
+    def test_release_gives_stock_back(self):
+        item = self.create_item('Koshary', stock=5)
+        reserve_stock([item], {item.id: 3})
+        release_stock([item], {item.id: 3})
+        self.assertEqual(self.stock(item), 5)
+
+
+class SoftDeletePurgeTests(MenuTestCase):
+
+    def setUp(self):
+        self.customer = User.objects.create_user('customer@example.com', 'Customer', 'Test', '0101', 'pass', role='customer')
+        self.item = self.create_item('Koshary')
+        self.kept_category = Category.objects.create(name='Drinks', slug='drinks', restaurant=self.restaurant)
+        self.kept = self.create_item('Tea', category=self.kept_category)
+        # A clone in another category keeps pointing at its source until the source is purged
+        self.clone = self.create_item('Koshary copy', category=self.kept_category, source_item=self.item)
+        self.cart = Cart.objects.create(customer=self.customer)
+        CartItem.objects.create(cart=self.cart, item=self.item)
+        CartItem.objects.create(cart=self.cart, item=self.kept)
+        self.order = Order.objects.create(customer=self.customer, restaurant=self.restaurant, total_price='20.00')
+        OrderItem.objects.create(order=self.order, item=self.item, quantity=1, price='10.00')
+        OrderItem.objects.create(order=self.order, item=self.kept, quantity=1, price='10.00')
+
+    def purge(self):
+        call_command('purge_deleted', batch_size=1, stdout=StringIO())
+
+    def test_soft_deleted_category_is_hidden_until_purged(self):
+        soft_delete_category(self.category)
+        self.assertFalse(Category.objects.filter(id=self.category.id).exists())
+        self.assertFalse(Item.objects.filter(id=self.item.id).exists())
+        self.assertTrue(Item.all_objects.filter(id=self.item.id).exists())
+        self.assertEqual(self.cart.items.count(), 2)
+
+        self.purge()
+
+        self.assertFalse(Category.all_objects.filter(id=self.category.id).exists())
+        self.assertFalse(Item.all_objects.filter(id=self.item.id).exists())
+        self.assertEqual(list(self.cart.items.values_list('item_id', flat=True)), [self.kept.id])
+        self.assertEqual(list(OrderItem.objects.values_list('item_id', flat=True)), [self.kept.id])
+        self.clone.refresh_from_db()
+        self.assertIsNone(self.clone.source_item_id)
+        self.assertTrue(Item.objects.filter(id=self.kept.id).exists())
+
+    def test_purged_restaurant_takes_its_menu_and_orders(self):
+        soft_delete_restaurant(self.restaurant)
+        self.assertFalse(Restaurant.objects.filter(id=self.restaurant.id).exists())
+        self.assertFalse(Item.objects.exists())
+
+        self.purge()
+
+        self.assertFalse(Restaurant.all_objects.filter(id=self.restaurant.id).exists())
+        self.assertFalse(Category.all_objects.exists())
+        self.assertFalse(Item.all_objects.exists())
+        self.assertFalse(CartItem.objects.exists())
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(OrderItem.objects.exists())
+        self.assertTrue(User.objects.filter(id=self.customer.id).exists())
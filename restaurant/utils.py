@@ -0,0 +1,265 @@
+from itertools import islice
+from django.db import transaction
+from django.db.models import BooleanField, Case, F, IntegerField, Max, OuterRef, Subquery, Value, When
+from django.db.models.functions import Greatest
+from account.models import Restaurant
+from .models import Category, Item, MenuChange, MenuCompaction
+
+
+class OutOfStock(Exception):
+    """
+    Raised when items of an order are unavailable or short of stock. `items` holds their ids.
+    """
+    def __init__(self, items):
+        super().__init__(f"Not enough stock for items {items}.")
+        self.items = items
+
+
+def log_menu_change(restaurant_id, kind, object_ids, action):
+    """
+    Append one change per object to the menu change log of a restaurant.
+    Call inside the transaction that makes the change so the log never drifts from the menu.
+    """
+    MenuChange.objects.bulk_create([
+        MenuChange(restaurant_id=restaurant_id, kind=kind, object_id=object_id, action=action)
+        for object_id in object_ids
+    ])
+
+
+def log_category_saved(category, previous_restaurant_id=None):
+    """
+    Log a created or updated category. A category moved to another restaurant takes its items
+    with it, so both disappear from the old menu and appear in the new one.
+    """
+    log_menu_change(category.restaurant_id, 'category', [category.id], 'upsert')
+    if previous_restaurant_id is not None and previous_restaurant_id != category.restaurant_id:
+        item_ids = list(category.items.values_list('id', flat=True))
+        log_menu_change(previous_restaurant_id, 'category', [category.id], 'delete')
+        log_menu_change(previous_restaurant_id, 'item', item_ids, 'delete')
+        log_menu_change(category.restaurant_id, 'item', item_ids, 'upsert')
+
+
+def log_item_saved(item, previous_restaurant_id=None):
+    """
+    Log a created or updated item, with a tombstone on the old menu when it moved restaurants.
+    """
+    log_menu_change(item.restaurant_id, 'item', [item.id], 'upsert')
+    if previous_restaurant_id is not None and previous_restaurant_id != item.restaurant_id:
+        log_menu_change(previous_restaurant_id, 'item', [item.id], 'delete')
+
+
+def soft_delete_category(category):
+    """
+    Hide a category and its items until `manage.py purge_deleted` removes them.
+    """
+    with transaction.atomic():
+        Category.objects.filter(pk=category.pk).update(is_deleted=True)
+        Item.all_objects.filter(category=category).update(is_deleted=True)
+    category.is_deleted = True
+
+
+def soft_delete_restaurant(restaurant):
+    """
+    Hide a restaurant and its menu until `manage.py purge_deleted` removes them.
+    """
+    with transaction.atomic():
+        Restaurant.objects.filter(pk=restaurant.pk).update(is_deleted=True)
+        Category.objects.filter(restaurant=restaurant).update(is_deleted=True)
+        Item.all_objects.filter(restaurant=restaurant).update(is_deleted=True)
+    restaurant.is_deleted = True
+
+
+def compacted_version():
+    """
+    Return the version up to which the change log has been compacted, 0 when it never was.
+    """
+    return MenuCompaction.objects.aggregate(version=Max('version'))['version'] or 0
+
+
+def menu_version():
+    """
+    Return the latest menu version. Versions are shared by all restaurants.
+    """
+    latest = MenuChange.objects.aggregate(version=Max('id'))['version'] or 0
+    return max(latest, compacted_version())
+
+
+def menu_snapshot(restaurant):
+    """
+    Return (categories, items) currently on the menu of a restaurant.
+    """
+    categories = Category.objects.filter(restaurant=restaurant).order_by('id')
+    items = Item.objects.filter(restaurant=restaurant).order_by('id')
+    return categories, items
+
+
+def menu_delta(restaurant, since, version):
+    """
+    Return (categories, items, deleted) changed on a restaurant's menu in (since, version].
+    Only the last change of each object counts. Upserts carry the current row; deletes only the id.
+    Returns None when `since` is older than the compacted part of the log.
+    """
+    if since < compacted_version():
+        return None
+
+    last_action = {}
+    changes = (
+        MenuChange.objects
+        .filter(restaurant=restaurant, id__gt=since, id__lte=version)
+        .order_by('id')
+        .values_list('kind', 'object_id', 'action')
+    )
+    for kind, object_id, action in changes:
+        last_action[(kind, object_id)] = action
+
+    upserts = {'category': [], 'item': []}
+    deleted = {'categories': [], 'items': []}
+    for (kind, object_id), action in last_action.items():
+        if action == 'upsert':
+            upserts[kind].append(object_id)
+        else:
+            deleted['categories' if kind == 'category' else 'items'].append(object_id)
+
+    categories = Category.objects.filter(restaurant=restaurant, id__in=upserts['category']).order_by('id')
+    items = Item.objects.filter(restaurant=restaurant, id__in=upserts['item']).order_by('id')
+    return categories, items, deleted
+
+
+def clone_menu(source, target, sync_prices=False, batch_size=500):
+    """
+    Copy every category and item of `source` into `target` in one transaction.
+    Categories are inserted first and their new ids mapped onto the copied items.
+    Returns (categories copied, items copied).
+    """
+    categories = list(Category.objects.filter(restaurant=source).order_by('id'))
+    with transaction.atomic():
+        clones = Category.objects.bulk_create(
+            [Category(name=category.name, slug=category.slug, restaurant=target) for category in categories],
+            batch_size=batch_size,
+        )
+        category_map = {category.id: clone.id for category, clone in zip(categories, clones)}
+
+        item_ids = []
+        items = Item.objects.filter(restaurant=source).order_by('id').iterator(chunk_size=batch_size)
+        while True:
+            chunk = [
+                Item(
+                    category_id=category_map[item.category_id], restaurant=target, name=item.name, details=item.details,
+                    image_url=item.image_url, price=item.price, source_item_id=item.id, sync_price=sync_prices,
+                )
+                for item in islice(items, batch_size)
+            ]
+            if not chunk:
+                break
+            item_ids += [item.id for item in Item.objects.bulk_create(chunk)]
+
+        log_menu_change(target.id, 'category', category_map.values(), 'upsert')
+        log_menu_change(target.id, 'item', item_ids, 'upsert')
+    return len(category_map), len(item_ids)
+
+
+def sync_clone_prices(item):
+    """
+    Copy the price of an item to its clones that follow it. Returns the number of clones updated.
+    """
+    clones = list(Item.objects.filter(source_item=item, sync_price=True).exclude(price=item.price).values_list('id', 'restaurant_id'))
+    if not clones:
+        return 0
+    Item.objects.filter(id__in=[clone_id for clone_id, _ in clones]).update(price=item.price)
+    by_restaurant = {}
+    for clone_id, restaurant_id in clones:
+        by_restaurant.setdefault(restaurant_id, []).append(clone_id)
+    for restaurant_id, clone_ids in by_restaurant.items():
+        log_menu_change(restaurant_id, 'item', clone_ids, 'upsert')
+    return len(clones)
+
+
+def sync_clones_of(item_ids):
+    """
+    Copy the prices of many items to their clones that follow them, in one UPDATE.
+    Returns the number of clones updated.
+    """
+    clones = list(Item.objects.filter(source_item_id__in=item_ids, sync_price=True).exclude(price=F('source_item__price')).values_list('id', 'restaurant_id'))
+    if not clones:
+        return 0
+    source_price = Item.all_objects.filter(id=OuterRef('source_item_id')).values('price')[:1]
+    Item.objects.filter(id__in=[clone_id for clone_id, _ in clones]).update(price=Subquery(source_price))
+    by_restaurant = {}
+    for clone_id, restaurant_id in clones:
+        by_restaurant.setdefault(restaurant_id, []).append(clone_id)
+    for restaurant_id, clone_ids in by_restaurant.items():
+        log_menu_change(restaurant_id, 'item', clone_ids, 'upsert')
+    return len(clones)
+
+
+def bulk_update_items(restaurant, items, values):
+    """
+    Apply `values` (field -> value or expression) to the items of `items` that belong to the restaurant in one UPDATE.
+    Price changes are copied on to the clones of the items. Returns the ids of the items updated.
+    """
+    with transaction.atomic():
+        updated = list(items.filter(restaurant=restaurant).order_by('id').values_list('id', flat=True))
+        if updated:
+            Item.objects.filter(id__in=updated).update(**values)
+            log_menu_change(restaurant.id, 'item', updated, 'upsert')
+            if 'price' in values:
+                sync_clones_of(updated)
+    return updated
+
+
+def reserve_stock(items, quantities):
+    """
+    Take {item_id: quantity} of the loaded `items` out of stock with one conditional UPDATE per tracked item.
+    Raises OutOfStock with the items that are unavailable or short. Call inside a transaction so earlier
+    decrements roll back with it. Orders stored on a shard cannot share that transaction; give the stock back
+    with release_stock when such an order fails. Rows are updated in id order so concurrent checkouts lock them
+    in the same order, and the first statement is a write so SQLite takes the write lock up front.
+    """
+    short = [item.id for item in items if not item.is_available or (item.stock is not None and item.stock < quantities[item.id])]
+    if short:
+        raise OutOfStock(sorted(short))
+
+    for item in sorted((item for item in items if item.stock is not None), key=lambda item: item.id):
+        # Another checkout may have taken the stock since it was read
+        if not Item.objects.filter(id=item.id, is_available=True, stock__gte=quantities[item.id]).update(stock=F('stock') - quantities[item.id]):
+            short.append(item.id)
+    if short:
+        raise OutOfStock(short)
+
+
+def release_stock(items, quantities):
+    """
+    Put back stock taken by reserve_stock for an order that was not placed after all.
+    """
+    for item in sorted((item for item in items if item.stock is not None), key=lambda item: item.id):
+        Item.all_objects.filter(id=item.id, stock__isnull=False).update(stock=F('stock') + quantities[item.id])
+
+
+def update_stock(restaurant, changes):
+    """
+    Apply [{"item_id", "stock" | "add", "is_available"}] to items of a restaurant in one UPDATE.
+    `stock` sets the count (None stops tracking), `add` adds to a tracked count.
+    Returns the ids of the items updated.
+    """
+    stock, available = [], []
+    for change in changes:
+        item_id = change['item_id']
+        if 'stock' in change:
+            stock.append(When(id=item_id, then=Value(change['stock'])))
+        elif 'add' in change:
+            stock.append(When(id=item_id, stock__isnull=False, then=Greatest(F('stock') + change['add'], 0, output_field=IntegerField())))
+        if 'is_available' in change:
+            available.append(When(id=item_id, then=Value(change['is_available'])))
+
+    values = {}
+    if stock:
+        values['stock'] = Case(*stock, default=F('stock'), output_field=IntegerField())
+    if available:
+        values['is_available'] = Case(*available, default=F('is_available'), output_field=BooleanField())
+    item_ids = sorted({change['item_id'] for change in changes})
+    with transaction.atomic():
+        updated = list(Item.objects.filter(restaurant=restaurant, id__in=item_ids).values_list('id', flat=True))
+        if values and updated:
+            Item.objects.filter(id__in=updated).update(**values)
+            log_menu_change(restaurant.id, 'item', updated, 'upsert')
+    return updated
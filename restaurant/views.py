@@ -1,11 +1,23 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated,AllowAny
-from rest_framework import status
+from rest_framework import serializers,status
 from rest_framework.authtoken.models import Token
+from datetime import datetime, time
+from decimal import Decimal, InvalidOperation
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, IntegerField, OuterRef, Prefetch, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, Least, Round
+from django.utils import timezone
+from orders.models import Order
+from orders.sharding import order_aliases
+from audit.buffer import record,snapshot,diff
 from account.models import Restaurant,User
 from .serializers import RestaurantSerializer,EmployeeSerializer,EmployeesSerializer,EmployeePermissionSerializer,CategorySerializer,ItemSerializer
 from .models import EmployeePermission,Category,Item
+from .utils import log_menu_change,log_category_saved,log_item_saved,menu_version,menu_snapshot,menu_delta,clone_menu,sync_clone_prices,soft_delete_category,soft_delete_restaurant,update_stock,bulk_update_items
 
 
 class RestaurantView(APIView):
@@ -37,6 +49,21 @@ class RestaurantView(APIView):
             serializer.save(owner=request.user)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    def delete(self, request):
+        """
+        Delete one of the owner's restaurants.
+        The restaurant and its menu disappear at once; the rows that depend on it are purged in the background.
+        """
+        restaurant_id = request.data.get('restaurant_id')
+        try:
+            restaurant = Restaurant.objects.get(id=restaurant_id, owner=request.user)
+        except (Restaurant.DoesNotExist, ValueError):
+            return Response({"error": "Restaurant not found or not owned by you."}, status=status.HTTP_404_NOT_FOUND)
+
+        soft_delete_restaurant(restaurant)
+        record(request.user, restaurant, 'restaurant.delete', restaurant, {"is_deleted": [False, True]})
+        return Response({"message": "Restaurant deleted successfully."}, status=status.HTTP_200_OK)
     
     
 class EmployeeView(APIView):
@@ -76,17 +103,18 @@ class EmployeesView(APIView):
         if request.user.role != 'owner':
             return Response({"error": "Only owners can view their restaurant employees."}, status=status.HTTP_403_FORBIDDEN)
 
-        # Get all restaurants owned by the authenticated user
-        restaurants = Restaurant.objects.filter(owner=request.user)
+        # Get all restaurants owned by the authenticated user, with their employees in one extra query
+        restaurants = Restaurant.objects.filter(owner=request.user).prefetch_related(
+            Prefetch('user_set', queryset=User.objects.filter(role='employee'), to_attr='employees')
+        )
 
         data = []
         for restaurant in restaurants:
-            employees = User.objects.filter(restaurant=restaurant, role='employee')
             restaurant_data = {
                 'id': restaurant.id,
                 'name': restaurant.name,
                 'location': restaurant.location,
-                'employees': EmployeeSerializer(employees, many=True).data
+                'employees': EmployeeSerializer(restaurant.employees, many=True).data
             }
             data.append(restaurant_data)
 
@@ -111,6 +139,7 @@ class EmployeePermissionView(APIView):
         can_create=request.data.get('can_create')
         can_update=request.data.get('can_update')
         can_delete=request.data.get('can_delete')
+        can_manage_orders=request.data.get('can_manage_orders', False)
         try:
             employee = User.objects.get(email=employee_email,restaurant=restaurant_id, role='employee')
             restaurant = employee.restaurant
@@ -121,11 +150,14 @@ class EmployeePermissionView(APIView):
             return Response({"error": "You can only set permissions for your own restaurant's employees."}, status=status.HTTP_403_FORBIDDEN)
 
         permission, created = EmployeePermission.objects.get_or_create(employee=employee, restaurant=restaurant)
+        before = {} if created else snapshot(permission)
 
         permission.can_create = can_create
         permission.can_update = can_update
         permission.can_delete = can_delete
+        permission.can_manage_orders = can_manage_orders
         permission.save()  
+        record(request.user, restaurant, 'permission.set', permission, diff(before, snapshot(permission)))
 
         serializer = EmployeePermissionSerializer(permission)
         return Response({"message": "Permissions updated successfully.", "data": serializer.data}, status=status.HTTP_200_OK)
@@ -178,7 +210,10 @@ class CategoryView(APIView):
             return Response({"error": "You do not have permission to create categories."}, status=status.HTTP_403_FORBIDDEN)
 
         if serializer.is_valid():
-            serializer.save(restaurant=restaurant)
+            with transaction.atomic():
+                category = serializer.save(restaurant=restaurant)
+                log_category_saved(category)
+            record(request.user, restaurant, 'category.create', category, diff({}, snapshot(category)))
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -197,9 +232,14 @@ class CategoryView(APIView):
         if not self.has_permission(request.user, category.restaurant, 'update'):
             return Response({"error": "You do not have permission to update this category."}, status=status.HTTP_403_FORBIDDEN)
 
+        previous_restaurant_id = category.restaurant_id
+        before = snapshot(category)
         serializer = CategorySerializer(category, data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                category = serializer.save()
+                log_category_saved(category, previous_restaurant_id)
+            record(request.user, previous_restaurant_id, 'category.update', category, diff(before, snapshot(category)))
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -218,7 +258,13 @@ class CategoryView(APIView):
         if not self.has_permission(request.user, category.restaurant, 'delete'):
             return Response({"error": "You do not have permission to delete this category."}, status=status.HTTP_403_FORBIDDEN)
 
-        category.delete()
+        with transaction.atomic():
+            # Items go with their category, clients need a tombstone for each of them too
+            log_menu_change(category.restaurant_id, 'item', category.items.values_list('id', flat=True), 'delete')
+            log_menu_change(category.restaurant_id, 'category', [category.id], 'delete')
+            # Hidden now, removed with its items by `manage.py purge_deleted`
+            soft_delete_category(category)
+        record(request.user, category.restaurant_id, 'category.delete', category, diff(snapshot(category), {}))
         return Response({"message": "Category deleted successfully."}, status=status.HTTP_200_OK)
     
     
@@ -270,7 +316,10 @@ class ItemView(APIView):
             return Response({"error": "You do not have permission to create items."}, status=status.HTTP_403_FORBIDDEN)
 
         if serializer.is_valid():
-            serializer.save(category=category)
+            with transaction.atomic():
+                item = serializer.save(category=category)
+                log_item_saved(item)
+            record(request.user, restaurant, 'item.create', item, diff({}, snapshot(item)))
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -281,17 +330,28 @@ class ItemView(APIView):
         """
         item_id=request.data.get('item_id')
         try:
-            item = Item.objects.get(id=item_id)
+            item = Item.objects.select_related('restaurant').get(id=item_id)
         except Item.DoesNotExist:
             return Response({"error": "Item not found."}, status=status.HTTP_404_NOT_FOUND)
 
         # Check if the user has permission to update items
-        if not self.has_permission(request.user, item.category.restaurant, 'update'):
+        if not self.has_permission(request.user, item.restaurant, 'update'):
             return Response({"error": "You do not have permission to update this item."}, status=status.HTTP_403_FORBIDDEN)
 
+        previous_restaurant_id = item.restaurant_id
+        previous_price = item.price
+        before = snapshot(item)
         serializer = ItemSerializer(item, data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                item = serializer.save()
+                log_item_saved(item, previous_restaurant_id)
+                if item.price != previous_price:
+                    # A clone priced by hand stops following its source
+                    if item.sync_price:
+                        Item.objects.filter(id=item.id).update(sync_price=False)
+                    sync_clone_prices(item)
+            record(request.user, previous_restaurant_id, 'item.update', item, diff(before, snapshot(item)))
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -302,15 +362,20 @@ class ItemView(APIView):
         """
         item_id=request.data.get('item_id')
         try:
-            item = Item.objects.get(id=item_id)
+            item = Item.objects.select_related('restaurant').get(id=item_id)
         except Item.DoesNotExist:
             return Response({"error": "Item not found."}, status=status.HTTP_404_NOT_FOUND)
 
         # Check if the user has permission to delete items
-        if not self.has_permission(request.user, item.category.restaurant, 'delete'):
+        if not self.has_permission(request.user, item.restaurant, 'delete'):
             return Response({"error": "You do not have permission to delete this item."}, status=status.HTTP_403_FORBIDDEN)
 
-        item.delete()
+        with transaction.atomic():
+            log_menu_change(item.restaurant_id, 'item', [item.id], 'delete')
+            item_id = item.id
+            item.delete()
+        item.id = item_id
+        record(request.user, item.restaurant_id, 'item.delete', item, diff(snapshot(item), {}))
         return Response({"message": "Item deleted successfully."}, status=status.HTTP_200_OK)
     
 class CategoryListView(APIView):
@@ -358,4 +423,294 @@ class ItemsListview(APIView):
 
         items = Item.objects.filter(category=category)
         serializer = ItemSerializer(items, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class MenuSyncView(APIView):
+    """
+    API view for syncing a restaurant's menu incrementally.
+    This endpoint is publicly accessible.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, restaurant_id):
+        """
+        Return the categories and items changed since the client's `since` version, plus tombstones
+        for deleted ones. Without `since`, or when the change log no longer reaches back that far,
+        the whole menu is returned with "full": true and the client should replace its copy.
+        Clients send the returned version as `since` on the next sync.
+        """
+        try:
+            since = int(request.query_params.get('since', 0))
+        except ValueError:
+            return Response({"error": "since must be a number."}, status=status.HTTP_400_BAD_REQUEST)
+        if since < 0:
+            return Response({"error": "since must not be negative."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            restaurant = Restaurant.objects.get(id=restaurant_id)
+        except Restaurant.DoesNotExist:
+            return Response({"error": "Restaurant not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        # Read the version first, anything changed after it is sent again on the next sync
+        version = menu_version()
+        delta = menu_delta(restaurant, since, version) if since else None
+        if delta is None:
+            categories, items = menu_snapshot(restaurant)
+            deleted = {'categories': [], 'items': []}
+        else:
+            categories, items, deleted = delta
+
+        return Response({
+            "version": version,
+            "full": delta is None,
+            "categories": CategorySerializer(categories, many=True).data,
+            "items": ItemSerializer(items, many=True).data,
+            "deleted": deleted,
+        }, status=status.HTTP_200_OK)
+
+
+class MenuCloneView(APIView):
+    """
+    API view for copying a restaurant's menu to other restaurants of the same owner.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, restaurant_id):
+        """
+        Copy all categories and items of the restaurant into each restaurant in `targets`.
+        Each target is copied in its own transaction. With `sync_prices`, later price changes
+        of the source items are copied to the clones.
+        """
+        targets = request.data.get('targets')
+        try:
+            sync_prices = serializers.BooleanField().to_internal_value(request.data.get('sync_prices', False))
+        except serializers.ValidationError:
+            return Response({"error": "sync_prices must be true or false."}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(targets, list) or not targets:
+            return Response({"error": "targets must be a list of restaurant IDs."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            targets = list(dict.fromkeys(int(target) for target in targets))
+        except (ValueError, TypeError):
+            return Response({"error": "targets must be a list of restaurant IDs."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            source = Restaurant.objects.get(id=restaurant_id, owner=request.user)
+        except Restaurant.DoesNotExist:
+            return Response({"error": "Restaurant not found or not owned by you."}, status=status.HTTP_404_NOT_FOUND)
+
+        restaurants = Restaurant.objects.filter(id__in=targets, owner=request.user).exclude(id=source.id).in_bulk()
+        missing = [target for target in targets if target not in restaurants]
+        if missing:
+            return Response({"error": "Target restaurants not found or not owned by you.", "targets": missing}, status=status.HTTP_404_NOT_FOUND)
+
+        results = []
+        for target in targets:
+            categories, items = clone_menu(source, restaurants[target], sync_prices)
+            record(request.user, target, 'menu.clone', source, {"source": source.id, "categories": categories, "items": items})
+            results.append({"restaurant": target, "categories": categories, "items": items})
+        return Response({"message": "Menu cloned successfully.", "data": results}, status=status.HTTP_201_CREATED)
+
+
+def count_subquery(queryset, field):
+    """
+    Correlated COUNT(*) of `queryset` rows whose `field` is the outer restaurant, 0 when there are none.
+    """
+    counts = queryset.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(count=Count('pk')).values('count')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+class OwnerDashboardView(APIView):
+    """
+    API view summarising every restaurant of the authenticated owner.
+    Runs one query for the restaurants and their counts plus one order query per order database,
+    however many restaurants the owner has. Results are cached per owner for OWNER_DASHBOARD_CACHE_TTL seconds.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        Return employee, pending verification, category and item counts and today's orders and revenue per restaurant.
+        """
+        if request.user.role != 'owner':
+            return Response({"error": "Only owners can view the dashboard."}, status=status.HTTP_403_FORBIDDEN)
+
+        cache_key = f'owner-dashboard:{request.user.pk}'
+        data = cache.get(cache_key)
+        if data is None:
+            data = self.summarise(request.user)
+            cache.set(cache_key, data, settings.OWNER_DASHBOARD_CACHE_TTL)
+        return Response(data, status=status.HTTP_200_OK)
+
+    def summarise(self, owner):
+        employees = User.objects.filter(role='employee')
+        restaurants = list(
+            Restaurant.objects.filter(owner=owner)
+            .annotate(
+                employee_count=count_subquery(employees, 'restaurant'),
+                pending_verification_count=count_subquery(employees.filter(is_verified=False), 'restaurant'),
+                category_count=count_subquery(Category.objects.all(), 'restaurant'),
+                item_count=count_subquery(Item.objects.all(), 'restaurant'),
+            )
+            .order_by('id')
+        )
+
+        today = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+        orders_today = {}
+        for alias in order_aliases():
+            rows = (
+                Order.objects.using(alias)
+                .filter(restaurant__in=[restaurant.id for restaurant in restaurants], created_at__gte=today)
+                .values('restaurant_id')
+                .annotate(count=Count('id'), revenue=Sum('total_price'))
+                .order_by()
+            )
+            for row in rows:
+                orders_today[row['restaurant_id']] = row
+
+        data = []
+        for restaurant in restaurants:
+            today_row = orders_today.get(restaurant.id, {})
+            data.append({
+                'id': restaurant.id,
+                'name': restaurant.name,
+                'location': restaurant.location,
+                'employees': restaurant.employee_count,
+                'pending_verification': restaurant.pending_verification_count,
+                'categories': restaurant.category_count,
+                'items': restaurant.item_count,
+                'orders_today': today_row.get('count', 0),
+                'revenue_today': str(Decimal(today_row.get('revenue') or 0).quantize(Decimal('0.01'))),
+            })
+        return data
+
+
+def is_integer(value):
+    """
+    True for JSON integers. bool is a subclass of int, so true and false are rejected explicitly.
+    """
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class ItemStockView(APIView):
+    """
+    API view for restocking items and switching their availability in bulk.
+    The owner or employees with 'update' permission can use it.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, restaurant_id):
+        """
+        Apply a list of stock changes to items of the restaurant in one UPDATE.
+        Each change has `item_id` and any of `stock` (set the count, null stops tracking),
+        `add` (add to a tracked count) and `is_available`.
+        """
+        try:
+            restaurant = Restaurant.objects.get(id=restaurant_id)
+        except Restaurant.DoesNotExist:
+            return Response({"error": "Restaurant not found."}, status=status.HTTP_404_NOT_FOUND)
+        if not ItemView().has_permission(request.user, restaurant, 'update'):
+            return Response({"error": "You do not have permission to update items."}, status=status.HTTP_403_FORBIDDEN)
+
+        changes = request.data.get('items')
+        if not isinstance(changes, list) or not changes:
+            return Response({"error": "items must be a non-empty list."}, status=status.HTTP_400_BAD_REQUEST)
+        for change in changes:
+            if not isinstance(change, dict) or not is_integer(change.get('item_id')):
+                return Response({"error": "Every change needs an item_id."}, status=status.HTTP_400_BAD_REQUEST)
+            if 'stock' in change and 'add' in change:
+                return Response({"error": "Use either stock or add for an item, not both."}, status=status.HTTP_400_BAD_REQUEST)
+            if 'stock' in change and change['stock'] is not None and (not is_integer(change['stock']) or change['stock'] < 0):
+                return Response({"error": "stock must be a non-negative number or null."}, status=status.HTTP_400_BAD_REQUEST)
+            if 'add' in change and not is_integer(change['add']):
+                return Response({"error": "add must be a number."}, status=status.HTTP_400_BAD_REQUEST)
+            if 'is_available' in change and not isinstance(change['is_available'], bool):
+                return Response({"error": "is_available must be true or false."}, status=status.HTTP_400_BAD_REQUEST)
+
+        updated = update_stock(restaurant, changes)
+        record(request.user, restaurant, 'item.stock', restaurant, {"items": changes})
+        missing = sorted({change['item_id'] for change in changes} - set(updated))
+        return Response({"message": "Stock updated.", "updated": updated, "not_found": missing}, status=status.HTTP_200_OK)
+
+
+class MenuBulkView(APIView):
+    """
+    API view for set-based edits of many items at once: price adjustments, moving items to
+    another category and availability toggles. Each call runs one UPDATE over the selected items.
+    The owner or employees with 'update' permission can use it.
+    """
+    permission_classes = [IsAuthenticated]
+    OPERATIONS = ('price', 'move', 'availability')
+
+    def post(self, request, restaurant_id):
+        """
+        Apply `operation` to the items of the restaurant, narrowed by `category_id` and/or `item_ids`.
+        - price: `percent` (e.g. 10 or -15) or `amount` (added to the price); prices stay between 0 and 9999.99.
+        - move: `target_category_id`, a category of the same restaurant.
+        - availability: `is_available`.
+        """
+        try:
+            restaurant = Restaurant.objects.get(id=restaurant_id)
+        except Restaurant.DoesNotExist:
+            return Response({"error": "Restaurant not found."}, status=status.HTTP_404_NOT_FOUND)
+        if not ItemView().has_permission(request.user, restaurant, 'update'):
+            return Response({"error": "You do not have permission to update items."}, status=status.HTTP_403_FORBIDDEN)
+
+        operation = request.data.get('operation')
+        if operation not in self.OPERATIONS:
+            return Response({"error": f"operation must be one of {', '.join(self.OPERATIONS)}."}, status=status.HTTP_400_BAD_REQUEST)
+
+        items = Item.objects.all()
+        category_id = request.data.get('category_id')
+        if category_id is not None:
+            if not is_integer(category_id):
+                return Response({"error": "category_id must be a category ID."}, status=status.HTTP_400_BAD_REQUEST)
+            if not Category.objects.filter(id=category_id, restaurant=restaurant).exists():
+                return Response({"error": "Category not found in this restaurant."}, status=status.HTTP_404_NOT_FOUND)
+            items = items.filter(category_id=category_id)
+        item_ids = request.data.get('item_ids')
+        if item_ids is not None:
+            if not isinstance(item_ids, list) or not all(is_integer(item_id) for item_id in item_ids):
+                return Response({"error": "item_ids must be a list of item IDs."}, status=status.HTTP_400_BAD_REQUEST)
+            items = items.filter(id__in=item_ids)
+
+        values = getattr(self, f'{operation}_values')(request.data, restaurant)
+        if isinstance(values, Response):
+            return values
+        updated = bulk_update_items(restaurant, items, values)
+        changes = {key: value for key, value in request.data.items() if key in ('category_id', 'item_ids', 'percent', 'amount', 'target_category_id', 'is_available')}
+        record(request.user, restaurant, f'item.bulk_{operation}', restaurant, {"items": updated, **changes})
+        return Response({"message": "Items updated.", "operation": operation, "updated": len(updated)}, status=status.HTTP_200_OK)
+
+    def price_values(self, data, restaurant):
+        if ('percent' in data) == ('amount' in data):
+            return Response({"error": "Give either percent or amount."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            change = Decimal(str(data.get('percent', data.get('amount'))))
+        except InvalidOperation:
+            return Response({"error": "percent and amount must be numbers."}, status=status.HTTP_400_BAD_REQUEST)
+        if not change.is_finite():
+            return Response({"error": "percent and amount must be numbers."}, status=status.HTTP_400_BAD_REQUEST)
+        price_field = Item._meta.get_field('price')
+        # The operand is not limited to the precision of a price, so e.g. 7.5 percent is not rounded first
+        if 'percent' in data:
+            price = F('price') * Value(1 + change / 100, output_field=DecimalField())
+        else:
+            price = F('price') + Value(change, output_field=DecimalField())
+        highest = Decimal(10) ** (price_field.max_digits - price_field.decimal_places) - Decimal('0.01')
+        price = Least(Greatest(Round(price, price_field.decimal_places, output_field=price_field), Value(Decimal(0)), output_field=price_field), Value(highest), output_field=price_field)
+        # Like a price set by hand, a bulk change stops clones from following their source
+        return {'price': price, 'sync_price': False}
+
+    def move_values(self, data, restaurant):
+        if not is_integer(data.get('target_category_id')):
+            return Response({"error": "target_category_id must be a category ID."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            target = Category.objects.get(id=data['target_category_id'], restaurant=restaurant)
+        except Category.DoesNotExist:
+            return Response({"error": "Target category not found in this restaurant."}, status=status.HTTP_404_NOT_FOUND)
+        # update() skips Item.save(), so the copy of the restaurant is set here; it stays the same within a restaurant
+        return {'category_id': target.id, 'restaurant_id': restaurant.id}
+
+    def availability_values(self, data, restaurant):
+        if not isinstance(data.get('is_available'), bool):
+            return Response({"error": "is_available must be true or false."}, status=status.HTTP_400_BAD_REQUEST)
+        return {'is_available': data['is_available']}